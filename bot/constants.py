@@ -26,6 +26,15 @@ REPORT_BUG = "Сообщить о проблеме 🐛"
 # Кнопки для владельцев девайсов
 MY_VIBRO_CHAIR = "Мое виброкресло 🪑"
 
+# Системные кнопки работают даже во время описания бага
+SYSTEM_BUTTONS = frozenset({CHANGE_ROLE, BACK_TO_MENU, MASTER_ROLE, CLIENT_ROLE})
+
+# === ОТВЕТЫ ПРИ ПРИВЯЗКЕ ПРОФИЛЯ МАСТЕРА ===
+MASTER_CHOICE_ANSWERS = frozenset({"1", "2", "3"})
+NEW_PROFILE_ANSWERS = frozenset({"новый", "новая", "new"})
+NOT_ME_ANSWERS = frozenset({"нет", "не я", "no"})
+ADMIN_ANSWERS = frozenset({"админ", "администратор", "помощь", "admin"})
+
 # === ВРЕМЕННЫЕ КОНСТАНТЫ ===
 REMINDER_MINUTES_BEFORE = 15
 DEFAULT_SLOT_DURATION_MINUTES = 60
@@ -41,6 +50,9 @@ BOOKING_STATUS_PENDING = "pending"
 BOOKING_STATUS_CONFIRMED = "confirmed"
 BOOKING_STATUS_DECLINED = "declined"
 
+# Статусы, при которых слот считается занятым
+ACTIVE_BOOKING_STATUSES = frozenset({BOOKING_STATUS_PENDING, BOOKING_STATUS_CONFIRMED})
+
 # === ЛОКАЦИИ ===
 DEFAULT_LOCATIONS = [
     {"name": "Баня", "is_open": True},
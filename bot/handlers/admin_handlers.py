@@ -2,6 +2,7 @@
 Обработчики команд администратора
 """
 import logging
+import os
 from typing import Dict, Any
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -25,6 +26,8 @@ class AdminHandlers:
         """
         self.data_service = data_service
         self.master_service = MasterService(data_service)
+        # Список админов читаем из окружения один раз, а не при каждой команде
+        self.admin_ids = frozenset(os.getenv("ADMIN_IDS", "").split(","))
     
     def is_admin(self, user_id: str) -> bool:
         """
@@ -36,9 +39,7 @@ class AdminHandlers:
         Returns:
             bool: True если администратор
         """
-        import os
-        admin_ids = os.getenv("ADMIN_IDS", "").split(",")
-        return str(user_id) in admin_ids
+        return str(user_id) in self.admin_ids
     
     async def show_pending_masters(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
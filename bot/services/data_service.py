@@ -4,12 +4,17 @@
 import json
 import os
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 from bot.constants import DATABASE_FILE, BACKUP_SUFFIX, DEFAULT_LOCATIONS
 from bot.utils.validation import validate_telegram_id
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +29,11 @@ class DataService:
             db_file: Путь к файлу базы данных
         """
         self.db_file = db_file
+        
+        # Индексы мастеров по telegram_id/handle и "отпечаток" файла, из которого они построены
+        self._masters_by_id: Dict[str, Dict] = {}
+        self._masters_by_handle: Dict[str, Dict] = {}
+        self._index_stamp: Optional[Tuple[int, int, int]] = None
     
     def load_data(self) -> Dict[str, Any]:
         """
@@ -34,10 +44,11 @@ class DataService:
         """
         try:
             if os.path.exists(self.db_file):
-                with open(self.db_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    logger.debug(f"Данные загружены из {self.db_file}")
-                    return data
+                with open(self.db_file, "rb") as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
+                logger.debug(f"Данные загружены из {self.db_file}")
+                return data
         except Exception as e:
             logger.error(f"Ошибка загрузки данных: {e}")
         
@@ -59,8 +70,24 @@ class DataService:
             # Создаем папку если не существует
             os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
             
-            with open(self.db_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if orjson:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+            
+            # Пишем во временный файл и атомарно подменяем: файл никогда не бывает обрезанным
+            tmp_file = f"{self.db_file}.tmp.{os.getpid()}"
+            try:
+                with open(tmp_file, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.db_file)
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+            
+            self._rebuild_master_indexes(data, self._file_stamp())
             
             logger.debug(f"Данные сохранены в {self.db_file}")
             return True
@@ -103,14 +130,8 @@ class DataService:
         if not validate_telegram_id(telegram_id):
             return None
         
-        data = self.load_data()
-        masters = data.get("masters", [])
-        
-        for master in masters:
-            if master.get("telegram_id") == telegram_id:
-                return master
-        
-        return None
+        self._ensure_master_indexes()
+        return self._masters_by_id.get(telegram_id)
     
     def find_master_by_handle(self, telegram_handle: str) -> Optional[Dict]:
         """
@@ -125,14 +146,8 @@ class DataService:
         if not telegram_handle:
             return None
         
-        data = self.load_data()
-        masters = data.get("masters", [])
-        
-        for master in masters:
-            if master.get("telegram_handle") == telegram_handle:
-                return master
-        
-        return None
+        self._ensure_master_indexes()
+        return self._masters_by_handle.get(telegram_handle)
     
     def get_all_masters(self) -> List[Dict]:
         """
@@ -223,6 +238,50 @@ class DataService:
         
         return False
     
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Возвращает отпечаток файла базы (inode, mtime, размер).
+        
+        Returns:
+            Optional[Tuple]: Отпечаток или None, если файла нет
+        """
+        try:
+            stat = os.stat(self.db_file)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _rebuild_master_indexes(self, data: Dict[str, Any], stamp: Optional[Tuple[int, int, int]]) -> None:
+        """
+        Перестраивает индексы мастеров по данным, соответствующим файлу на диске.
+        
+        Args:
+            data: Данные базы
+            stamp: Отпечаток файла, из которого получены данные
+        """
+        by_id: Dict[str, Dict] = {}
+        by_handle: Dict[str, Dict] = {}
+        
+        # setdefault сохраняет прежнюю семантику "первый найденный мастер"
+        for master in data.get("masters", []):
+            telegram_id = master.get("telegram_id")
+            if telegram_id:
+                by_id.setdefault(telegram_id, master)
+            telegram_handle = master.get("telegram_handle")
+            if telegram_handle:
+                by_handle.setdefault(telegram_handle, master)
+        
+        self._masters_by_id = by_id
+        self._masters_by_handle = by_handle
+        self._index_stamp = stamp
+    
+    def _ensure_master_indexes(self) -> None:
+        """Перестраивает индексы мастеров, если файл базы изменился с момента построения."""
+        # Отпечаток снимается до чтения: изменение во время чтения вызовет повторную сборку
+        stamp = self._file_stamp()
+        if stamp is None or stamp != self._index_stamp:
+            self._rebuild_master_indexes(self.load_data(), stamp)
+    
     def _create_empty_structure(self) -> Dict[str, Any]:
         """
         Создает пустую структуру данных.
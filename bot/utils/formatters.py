@@ -2,10 +2,13 @@
 Утилиты для форматирования данных
 """
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List
 from bot.constants import STATUS_ICONS, STATUS_TEXTS
+from utils.formatting import MONTHS_RU_GENITIVE, WEEKDAYS_RU
 
 
+@lru_cache(maxsize=1024)
 def format_date_for_user(date_str: str) -> str:
     """
     Форматирует дату для пользователя.
@@ -20,21 +23,12 @@ def format_date_for_user(date_str: str) -> str:
         return "Неизвестная дата"
     
     try:
+        # strptime, а не fromisoformat: принимает и даты без ведущих нулей ("2025-7-5")
         date_obj = datetime.strptime(date_str, "%Y-%m-%d")
         
-        # Русские названия дней недели и месяцев
-        weekdays = [
-            "Понедельник", "Вторник", "Среда", "Четверг", 
-            "Пятница", "Суббота", "Воскресенье"
-        ]
-        months = [
-            "января", "февраля", "марта", "апреля", "мая", "июня",
-            "июля", "августа", "сентября", "октября", "ноября", "декабря"
-        ]
-        
-        weekday = weekdays[date_obj.weekday()]
+        weekday = WEEKDAYS_RU[date_obj.weekday()]
         day = date_obj.day
-        month = months[date_obj.month - 1]
+        month = MONTHS_RU_GENITIVE[date_obj.month - 1]
         
         return f"{weekday} {day} {month}"
     except ValueError:
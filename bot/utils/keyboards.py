@@ -4,7 +4,8 @@
 from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton
 from bot.constants import (
     MASTER_ROLE, CLIENT_ROLE, MY_SLOTS, ADD_SLOTS, MY_PROFILE, EDIT_PROFILE,
-    VIEW_MASTERS, VIEW_DEVICES, VIEW_FREE_SLOTS, MY_BOOKINGS, BACK_TO_MENU, CHANGE_ROLE, REPORT_BUG
+    VIEW_MASTERS, VIEW_DEVICES, VIEW_FREE_SLOTS, MY_BOOKINGS, BACK_TO_MENU, CHANGE_ROLE, REPORT_BUG,
+    ACTIVE_BOOKING_STATUSES
 )
 
 
@@ -179,7 +180,12 @@ def count_available_slots(master: dict) -> int:
     from datetime import datetime
     
     slots = master.get("time_slots", [])
-    bookings = master.get("bookings", [])
+    # Занятые слоты собираем один раз, а не перебираем записи для каждого слота
+    booked_keys = {
+        (booking.get("slot_date"), booking.get("slot_start_time"))
+        for booking in master.get("bookings", [])
+        if booking.get("status") in ACTIVE_BOOKING_STATUSES
+    }
     
     # Получаем текущее время
     now = datetime.now()
@@ -205,13 +211,7 @@ def count_available_slots(master: dict) -> int:
             continue
             
         # Проверяем, не забронирован ли слот
-        is_booked = any(
-            booking.get("slot_date") == slot.get("date") and
-            booking.get("slot_start_time") == slot.get("start_time") and
-            booking.get("status") in ["pending", "confirmed"]
-            for booking in bookings
-        )
-        if not is_booked:
+        if (slot_date, slot_start_time) not in booked_keys:
             available_count += 1
     
     return available_count
\ No newline at end of file
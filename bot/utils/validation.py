@@ -5,6 +5,15 @@ import re
 from typing import Optional
 from bot.constants import MAX_USER_INPUT_LENGTH, MIN_TELEGRAM_ID_LENGTH
 
+# Таблица удаления потенциально опасных символов для str.translate
+_DANGEROUS_CHARS_TABLE = str.maketrans('', '', '<>"\'')
+
+# Паттерны компилируются один раз при импорте модуля
+_HANDLE_RE = re.compile(r'^@[a-zA-Z0-9_]{5,32}$')
+_TIME_RE = re.compile(r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$')
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_HANDLE_EXTRACT_RE = re.compile(r'@[a-zA-Z0-9_]{5,32}')
+
 
 def validate_telegram_id(user_id: str) -> bool:
     """
@@ -35,13 +44,8 @@ def sanitize_user_input(text: str) -> str:
     if not text or not isinstance(text, str):
         return ""
     
-    # Удаляем лишние пробелы и ограничиваем длину
-    cleaned = text.strip()[:MAX_USER_INPUT_LENGTH]
-    
-    # Удаляем потенциально опасные символы
-    cleaned = re.sub(r'[<>"\']', '', cleaned)
-    
-    return cleaned
+    # Удаляем лишние пробелы, ограничиваем длину и удаляем опасные символы за один проход
+    return text.strip()[:MAX_USER_INPUT_LENGTH].translate(_DANGEROUS_CHARS_TABLE)
 
 
 def validate_telegram_handle(handle: str) -> bool:
@@ -58,8 +62,7 @@ def validate_telegram_handle(handle: str) -> bool:
         return False
     
     # Должен начинаться с @ и содержать только допустимые символы
-    pattern = r'^@[a-zA-Z0-9_]{5,32}$'
-    return bool(re.match(pattern, handle))
+    return bool(_HANDLE_RE.match(handle))
 
 
 def validate_time_format(time_str: str) -> bool:
@@ -75,8 +78,7 @@ def validate_time_format(time_str: str) -> bool:
     if not time_str or not isinstance(time_str, str):
         return False
     
-    pattern = r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$'
-    return bool(re.match(pattern, time_str))
+    return bool(_TIME_RE.match(time_str))
 
 
 def validate_date_format(date_str: str) -> bool:
@@ -92,8 +94,7 @@ def validate_date_format(date_str: str) -> bool:
     if not date_str or not isinstance(date_str, str):
         return False
     
-    pattern = r'^\d{4}-\d{2}-\d{2}$'
-    return bool(re.match(pattern, date_str))
+    return bool(_DATE_RE.match(date_str))
 
 
 def extract_telegram_handle(text: str) -> Optional[str]:
@@ -106,11 +107,11 @@ def extract_telegram_handle(text: str) -> Optional[str]:
     Returns:
         Optional[str]: Найденный handle или None
     """
-    if not text:
+    # Без '@' искать нечего — не запускаем регулярное выражение
+    if not text or '@' not in text:
         return None
     
     # Ищем паттерн @username
-    pattern = r'@[a-zA-Z0-9_]{5,32}'
-    match = re.search(pattern, text)
+    match = _HANDLE_EXTRACT_RE.search(text)
     
     return match.group(0) if match else None
\ No newline at end of file
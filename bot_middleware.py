@@ -8,7 +8,7 @@ from typing import Dict, Optional
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
-from telegram.error import RetryAfter, TimedOut, NetworkError
+from telegram.error import BadRequest, Forbidden, RetryAfter, TimedOut, NetworkError
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +44,44 @@ class RateLimiter:
 # Глобальный rate limiter
 rate_limiter = RateLimiter()
 
+class SendTokenBucket:
+    """Адаптивный token bucket для исходящих сообщений (глобальный лимит Telegram ~30 msg/s)"""
+    
+    def __init__(self, rate: float = 25.0, min_rate: float = 1.0, max_rate: float = 30.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def acquire(self):
+        """Ждёт свободный токен; ожидающие отправки обслуживаются по очереди"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                # Запас токенов не больше секунды работы на текущей скорости
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def on_success(self):
+        """Успешная отправка: плавно наращиваем скорость (аддитивно)"""
+        self.rate = min(self.max_rate, self.rate + 0.1)
+    
+    def on_throttled(self):
+        """Telegram вернул RetryAfter: вдвое снижаем скорость и обнуляем запас"""
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+
+# Общий лимит исходящих сообщений бота
+send_bucket = SendTokenBucket()
+
 def with_error_handling(func):
     """Декоратор для обработки ошибок в хендлерах"""
     @wraps(func)
@@ -101,6 +139,10 @@ async def telegram_retry(func, *args, max_retries=3, **kwargs):
                 raise
             logger.info(f"Rate limited, waiting {e.retry_after}s (attempt {attempt + 1})")
             await asyncio.sleep(e.retry_after)
+        except (BadRequest, Forbidden):
+            # Постоянные ошибки (чат не найден, бот заблокирован, ошибка разметки) не повторяем;
+            # BadRequest в PTB — подкласс NetworkError, поэтому проверяем его раньше
+            raise
         except (TimedOut, NetworkError) as e:
             if attempt == max_retries - 1:
                 raise
@@ -108,4 +150,18 @@ async def telegram_retry(func, *args, max_retries=3, **kwargs):
             logger.info(f"Network error, retrying in {wait_time}s (attempt {attempt + 1})")
             await asyncio.sleep(wait_time)
     
-    raise Exception(f"Max retries ({max_retries}) exceeded")
\ No newline at end of file
+    raise Exception(f"Max retries ({max_retries}) exceeded")
+
+async def send_message_limited(bot, chat_id, text, **kwargs):
+    """Отправляет сообщение через общий token bucket с повтором при RetryAfter и сетевых ошибках"""
+    async def attempt():
+        await send_bucket.acquire()
+        try:
+            return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        except RetryAfter:
+            send_bucket.on_throttled()
+            raise
+    
+    result = await telegram_retry(attempt)
+    send_bucket.on_success()
+    return result
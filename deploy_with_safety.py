@@ -9,7 +9,7 @@ import sys
 import os
 from datetime import datetime
 from services.backup_manager import backup_manager
-from services.safe_data_manager import safe_data_manager
+from services.safe_data_manager import get_safe_data_manager
 
 def run_command(command, description):
     """Выполняет команду с логированием."""
@@ -31,7 +31,7 @@ def check_data_integrity():
     """Проверяет целостность данных перед деплоем."""
     print("🔍 Проверка целостности данных...")
     
-    health_status = safe_data_manager.get_health_status()
+    health_status = get_safe_data_manager().get_health_status()
     
     if not health_status.get('database_valid', False):
         print("❌ База данных не прошла проверку целостности!")
@@ -209,7 +209,7 @@ def main():
     # 8. Финальные проверки
     print("\n🎉 Деплой завершен успешно!")
     
-    health_status = safe_data_manager.get_health_status()
+    health_status = get_safe_data_manager().get_health_status()
     print(f"\n📊 Финальная статистика:")
     print(f"   - Данные валидны: {'✅' if health_status.get('database_valid') else '❌'}")
     print(f"   - Резервных копий: {health_status.get('total_backups', 0)}")
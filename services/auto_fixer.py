@@ -9,7 +9,7 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import difflib
-from services.safe_data_manager import safe_data_manager
+from services.safe_data_manager import get_safe_data_manager
 
 logger = logging.getLogger(__name__)
 
@@ -104,7 +104,7 @@ class AutoFixer:
             
             if result['success']:
                 # Создаем бэкап перед изменением
-                safe_data_manager.backup_manager.create_backup("auto_fix_before")
+                get_safe_data_manager().create_manual_backup("auto_fix_before")
                 
                 # Логируем исправление
                 self._log_fix_action(bug_analysis, result)
@@ -3,21 +3,78 @@
 Менеджер резервного копирования и защиты данных пользователей
 """
 
+import gzip
+import hashlib
 import json
+import mmap
 import os
-import shutil
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import logging
 
+try:
+    import orjson
+    _ORJSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Новые бэкапы пишутся сжатыми; старые несжатые .json продолжают читаться
+COMPRESSED_SUFFIX = ".json.gz"
+BACKUP_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Схема базы фиксирована: проверяем только разделы верхнего уровня
+REQUIRED_SECTIONS = ('masters', 'bookings', 'devices', 'device_bookings')
+_REQUIRED_SECTIONS_SET = frozenset(REQUIRED_SECTIONS)
+CRITICAL_SECTIONS = ('masters', 'bookings', 'device_bookings')
+
+def loads_json(payload: bytes) -> Any:
+    """Разбирает JSON из байтов через orjson (если установлен) или стандартный json."""
+    if orjson is None:
+        return json.loads(payload)
+    return orjson.loads(payload)
+
+def load_json_file(filepath: str) -> Any:
+    """Разбирает JSON-файл данных или бэкапа, по возможности без копирования в память."""
+    if filepath.endswith('.gz'):
+        return loads_json(BackupManager.read_backup_bytes(filepath))
+    
+    with open(filepath, 'rb') as f:
+        if orjson is None or os.fstat(f.fileno()).st_size == 0:
+            return json.loads(f.read())
+        # orjson разбирает страницы mmap напрямую, без промежуточного bytes
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def dump_json_bytes(data: Any) -> bytes:
+    """Сериализует данные в UTF-8 JSON с отступом в 2 пробела, как в файле базы."""
+    if orjson is None:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return orjson.dumps(data, option=_ORJSON_DUMP_OPTIONS)
+
+def _write_file_atomic(path: str, payload: bytes) -> None:
+    """Записывает файл через временный файл и os.replace: недописанная копия не остается на месте."""
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 class BackupManager:
     """Управляет резервным копированием и версионированием данных."""
     
     def __init__(self, data_file: str = "data/database.json", backup_dir: str = "data/backups"):
         self.data_file = data_file
         self.backup_dir = backup_dir
+        # blake2b содержимого -> путь к бэкапу, чтобы не писать одинаковые копии
+        self._digest_index: Dict[str, str] = {}
         self.ensure_backup_dir()
     
     def ensure_backup_dir(self):
@@ -30,13 +87,25 @@ class BackupManager:
             logger.warning(f"Основной файл данных не найден: {self.data_file}")
             return None
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"database_backup_{timestamp}_{reason}.json"
+        timestamp = datetime.now().strftime(BACKUP_TIMESTAMP_FORMAT)
+        backup_filename = f"database_backup_{timestamp}_{reason}{COMPRESSED_SUFFIX}"
         backup_path = os.path.join(self.backup_dir, backup_filename)
         
         try:
-            shutil.copy2(self.data_file, backup_path)
-            logger.info(f"✅ Создана резервная копия: {backup_path}")
+            with open(self.data_file, 'rb') as f:
+                payload = f.read()
+            digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+            
+            existing_path = self._digest_index.get(digest)
+            if existing_path and os.path.exists(existing_path) and existing_path != backup_path:
+                # Содержимое не изменилось — жесткая ссылка вместо новой копии
+                os.link(existing_path, backup_path)
+                logger.info(f"✅ Резервная копия не изменилась, создана ссылка: {backup_path}")
+            else:
+                # mtime=0 делает сжатый файл детерминированным для одинакового содержимого
+                _write_file_atomic(backup_path, gzip.compress(payload, compresslevel=6, mtime=0))
+                logger.info(f"✅ Создана резервная копия: {backup_path}")
+            self._digest_index[digest] = backup_path
             
             # Логируем статистику данных в бэкапе
             self._log_backup_stats(backup_path, reason)
@@ -46,11 +115,27 @@ class BackupManager:
             logger.error(f"❌ Ошибка создания резервной копии: {e}")
             return None
     
+    @staticmethod
+    def read_backup_bytes(filepath: str) -> bytes:
+        """Читает содержимое файла данных или бэкапа, распаковывая сжатые копии."""
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        if filepath.endswith('.gz'):
+            return gzip.decompress(raw)
+        return raw
+    
+    @staticmethod
+    def _backup_created_at(filename: str, mtime: float) -> datetime:
+        """Время создания бэкапа из имени файла (у жестких ссылок mtime общий)."""
+        try:
+            return datetime.strptime(filename[len("database_backup_"):][:15], BACKUP_TIMESTAMP_FORMAT)
+        except ValueError:
+            return datetime.fromtimestamp(mtime)
+    
     def _log_backup_stats(self, backup_path: str, reason: str):
         """Логирует статистику сохраненных данных."""
         try:
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = loads_json(self.read_backup_bytes(backup_path))
             
             masters_count = len(data.get("masters", []))
             bookings_count = len(data.get("bookings", []))
@@ -82,16 +167,17 @@ class BackupManager:
             return backups
         
         for filename in os.listdir(self.backup_dir):
-            if filename.endswith('.json') and 'backup' in filename:
+            if filename.endswith(('.json', COMPRESSED_SUFFIX)) and 'backup' in filename:
                 filepath = os.path.join(self.backup_dir, filename)
                 try:
                     stat = os.stat(filepath)
+                    created = self._backup_created_at(filename, stat.st_mtime)
                     backups.append({
                         'filename': filename,
                         'filepath': filepath,
                         'size': stat.st_size,
-                        'created': datetime.fromtimestamp(stat.st_mtime),
-                        'age_hours': (datetime.now() - datetime.fromtimestamp(stat.st_mtime)).total_seconds() / 3600
+                        'created': created,
+                        'age_hours': (datetime.now() - created).total_seconds() / 3600
                     })
                 except Exception as e:
                     logger.error(f"Ошибка чтения информации о бэкапе {filename}: {e}")
@@ -108,14 +194,14 @@ class BackupManager:
         
         try:
             # Проверяем валидность бэкапа
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
+            payload = self.read_backup_bytes(backup_path)
+            loads_json(payload)
             
             # Создаем резервную копию текущих данных перед восстановлением
             current_backup = self.create_timestamped_backup("before_restore")
             
-            # Восстанавливаем данные
-            shutil.copy2(backup_path, self.data_file)
+            # Восстанавливаем данные: проверенное содержимое подменяет файл целиком
+            _write_file_atomic(self.data_file, payload)
             
             logger.info(f"✅ Данные восстановлены из: {backup_path}")
             logger.info(f"📦 Текущие данные сохранены в: {current_backup}")
@@ -149,6 +235,36 @@ class BackupManager:
         logger.info(f"📦 Очистка завершена: удалено {removed_count} старых бэкапов")
         return removed_count
     
+    def check_data(self, data: Any, file_size: int = 0) -> Dict:
+        """Проверяет структуру уже загруженных данных без повторного чтения файла."""
+        if not isinstance(data, dict):
+            return {
+                'valid': False,
+                'error': 'Корень базы данных должен быть объектом',
+                'stats': {}
+            }
+        
+        # Проверяем обязательные разделы (быстрый путь — все на месте)
+        if _REQUIRED_SECTIONS_SET.issubset(data):
+            missing_sections = []
+        else:
+            missing_sections = [section for section in REQUIRED_SECTIONS if section not in data]
+        
+        # Собираем статистику
+        stats = {section: len(data.get(section) or ()) for section in REQUIRED_SECTIONS}
+        stats['file_size'] = file_size
+        stats['missing_sections'] = missing_sections
+        
+        # Проверяем критические данные
+        has_critical_data = any(stats[section] > 0 for section in CRITICAL_SECTIONS)
+        
+        return {
+            'valid': len(missing_sections) == 0,
+            'has_critical_data': has_critical_data,
+            'error': f'Отсутствуют разделы: {missing_sections}' if missing_sections else None,
+            'stats': stats
+        }
+    
     def verify_data_integrity(self, filepath: str = None) -> Dict:
         """Проверяет целостность данных в файле."""
         target_file = filepath or self.data_file
@@ -161,36 +277,8 @@ class BackupManager:
             }
         
         try:
-            with open(target_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Проверяем обязательные разделы
-            required_sections = ['masters', 'bookings', 'devices', 'device_bookings']
-            missing_sections = [section for section in required_sections if section not in data]
-            
-            # Собираем статистику
-            stats = {
-                'masters': len(data.get('masters', [])),
-                'bookings': len(data.get('bookings', [])),
-                'device_bookings': len(data.get('device_bookings', [])),
-                'devices': len(data.get('devices', [])),
-                'file_size': os.path.getsize(target_file),
-                'missing_sections': missing_sections
-            }
-            
-            # Проверяем критические данные
-            has_critical_data = (
-                stats['masters'] > 0 or 
-                stats['bookings'] > 0 or 
-                stats['device_bookings'] > 0
-            )
-            
-            return {
-                'valid': len(missing_sections) == 0,
-                'has_critical_data': has_critical_data,
-                'error': f'Отсутствуют разделы: {missing_sections}' if missing_sections else None,
-                'stats': stats
-            }
+            data = load_json_file(target_file)
+            return self.check_data(data, os.path.getsize(target_file))
             
         except json.JSONDecodeError as e:
             return {
@@ -15,7 +15,7 @@ from telegram.ext import ContextTypes
 # Импорты новых компонентов (с обработкой circular imports)
 try:
     from services.gpt_bug_analyzer import gpt_bug_analyzer
-    from services.telegram_notifier import telegram_notifier
+    from services.telegram_notifier import get_telegram_notifier
     from services.auto_fixer import auto_fixer
     from services.bug_tracker import bug_tracker
 except ImportError as e:
@@ -282,7 +282,7 @@ class BugReporter:
                         bug_tracker.log_fix_attempt(bug_report['id'], fix_result, success=True)
                         
                         # Уведомляем администратора об автофиксе
-                        telegram_notifier.send_auto_fix_notification(bug_report['id'], fix_result)
+                        get_telegram_notifier().send_auto_fix_notification(bug_report['id'], fix_result)
                         
                         logger.info(f"✅ Автофикс успешен для {bug_report['id']}")
                     else:
@@ -291,12 +291,12 @@ class BugReporter:
                         # Добавляем в очередь для ручного исправления
                         bug_analysis['original_description'] = bug_report['description']
                         bug_analysis['reporter'] = f"@{bug_report.get('username', 'unknown')}"
-                        telegram_notifier.add_to_pending(bug_analysis)
+                        get_telegram_notifier().add_to_pending(bug_analysis)
                 else:
                     # Добавляем в очередь для ручного исправления
                     bug_analysis['original_description'] = bug_report['description']
                     bug_analysis['reporter'] = f"@{bug_report.get('username', 'unknown')}"
-                    telegram_notifier.add_to_pending(bug_analysis)
+                    get_telegram_notifier().add_to_pending(bug_analysis)
                     
                     logger.info(f"📝 Баг {bug_report['id']} добавлен в очередь для ручного исправления")
                     
@@ -306,7 +306,7 @@ class BugReporter:
                 # В случае ошибки все равно добавляем в очередь
                 bug_analysis['original_description'] = bug_report['description']
                 bug_analysis['reporter'] = f"@{bug_report.get('username', 'unknown')}"
-                telegram_notifier.add_to_pending(bug_analysis)
+                get_telegram_notifier().add_to_pending(bug_analysis)
             
             logger.info(f"✅ Расширенная обработка бага {bug_report['id']} завершена")
             
@@ -3,6 +3,8 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+from bot.constants import ACTIVE_BOOKING_STATUSES
+
 
 class DataManager:
     """Управляет сохранением и загрузкой данных в JSON файл."""
@@ -90,7 +92,7 @@ class DataManager:
         booked_slots = []
         for booking in self.data["bookings"]:
             if (booking["master_telegram_id"] == master_telegram_id and 
-                booking["status"] in ["pending", "confirmed"]):
+                booking["status"] in ACTIVE_BOOKING_STATUSES):
                 booked_slots.append(booking["slot_id"])
         
         # Фильтруем доступные слоты
@@ -3,28 +3,126 @@
 Безопасный менеджер данных с автоматическим резервным копированием
 """
 
-import json
+import asyncio
+import functools
 import os
+import sys
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import logging
-from .backup_manager import backup_manager
+from bot.constants import ACTIVE_BOOKING_STATUSES
+from .backup_manager import backup_manager, dump_json_bytes, load_json_file
 
 logger = logging.getLogger(__name__)
 
+# Минимальный интервал между автоматическими бэкапами при сохранении (секунды)
+BACKUP_INTERVAL_SEC = 300
+
+# Задержка отложенной записи: изменения за это время объединяются в одно сохранение
+FLUSH_DELAY_SEC = 2.0
+
+# Поля с небольшим набором часто повторяющихся значений (даты, время, статусы, локации)
+_INTERNED_SLOT_FIELDS = ("date", "start_time", "end_time", "location")
+_INTERNED_BOOKING_FIELDS = (
+    "status", "slot_date", "slot_start_time", "slot_end_time",
+    "location", "slot_location", "master_id", "device_id"
+)
+
+def _intern_fields(records: List[Dict], fields: tuple) -> None:
+    """Заменяет строковые значения полей на интернированные копии."""
+    intern = sys.intern
+    for record in records:
+        for field in fields:
+            value = record.get(field)
+            if type(value) is str:
+                record[field] = intern(value)
+
+def intern_repeated_strings(data: Dict[str, Any]) -> None:
+    """Интернирует повторяющиеся строки слотов и записей: меньше памяти, сравнение по указателю."""
+    # Разделы могут быть null в JSON
+    for owner in (*(data.get("masters") or []), *(data.get("devices") or [])):
+        _intern_fields(owner.get("time_slots") or [], _INTERNED_SLOT_FIELDS)
+        _intern_fields(owner.get("bookings") or [], _INTERNED_BOOKING_FIELDS)
+    _intern_fields(data.get("bookings") or [], _INTERNED_BOOKING_FIELDS)
+    _intern_fields(data.get("device_bookings") or [], _INTERNED_BOOKING_FIELDS)
+
+def _slot_order_key(slot: Dict) -> tuple:
+    """Ключ сортировки слота по дате и времени начала ("9:15" дополняется до "09:15")."""
+    return slot.get("date") or "", (slot.get("start_time") or "").zfill(5)
+
+def _booking_order_key(booking: Dict) -> tuple:
+    """Ключ сортировки записи по дате и времени начала слота."""
+    return booking.get("slot_date") or "", (booking.get("slot_start_time") or "").zfill(5)
+
+def sort_device_slots(data: Dict[str, Any]) -> None:
+    """Упорядочивает слоты устройств по времени один раз при загрузке, чтобы не сортировать при каждом показе.
+    
+    Слоты мастеров не трогаем: на них ссылаются по индексу в списке.
+    """
+    for device in data.get("devices") or []:
+        slots = device.get("time_slots")
+        if slots:
+            slots.sort(key=_slot_order_key)
+
 class SafeDataManager:
     """Безопасный менеджер данных с автоматическим резервным копированием."""
     
     def __init__(self, data_file: str = "data/database.json"):
         self.data_file = data_file
         self.data = None
+        self._last_backup_ts = None
+        # Индексы мастеров и записей, строятся лениво и сбрасываются при загрузке и сохранении
+        self._reset_indexes()
+        # Отложенная запись (см. schedule_flush)
+        self._flush_handle = None
+        self._flush_reason = None
+        self._flush_task = None
+        # Запись файла может идти в фоновом потоке: номер снимка не дает старому затереть новый
+        self._write_lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._written_seq = 0
+        self._writes_in_flight = 0
+        # Немедленные сохранения, пришедшие во время записи, объединяются в одну следующую
+        self._queued_save = None
+        self._active_save = None
+        # Отпечаток файла, которому соответствуют данные в памяти (см. get_data)
+        self._file_stamp_loaded = None
+        # Отпечаток файла, который не удалось перечитать: не разбираем его повторно
+        self._file_stamp_rejected = None
         self._load_data_safely()
     
+    def _reset_indexes(self) -> None:
+        """Сбрасывает ленивые индексы: данные могли измениться (новый мастер, привязка, записи)."""
+        self._masters_by_tid = None
+        self._masters_by_handle = None
+        self._devices_by_id = None
+        self._free_device_slots = None
+        self._confirmed_by_slot = None
+        self._bookings_by_client = None
+        self._confirmed_by_client = None
+        self._unverified_names = None
+        self._bookings_by_id = None
+        self._booked_slot_keys = None
+        self._booked_device_slot_keys = None
+        self._bookings_by_device = None
+        self._device_booking_positions = None
+        self._slots_by_date = None
+        self._device_slots_by_date = None
+        self._device_info_texts = None
+        self._slots_by_key = None
+        self._slot_epochs = {}
+    
     def _load_data_safely(self) -> None:
         """Безопасно загружает данные с проверкой целостности."""
+        self._reset_indexes()
         try:
-            # Проверяем целостность текущего файла
-            integrity_check = backup_manager.verify_data_integrity(self.data_file)
+            # Отпечаток снимается до чтения: изменение во время чтения вызовет повторную загрузку
+            self._file_stamp_loaded = self._file_stamp()
+            # Читаем файл один раз и проверяем целостность уже разобранных данных
+            data = load_json_file(self.data_file)
+            integrity_check = backup_manager.check_data(data, os.path.getsize(self.data_file))
             
             if not integrity_check['valid']:
                 logger.error(f"❌ Основной файл данных поврежден: {integrity_check['error']}")
@@ -36,9 +134,9 @@ class SafeDataManager:
                 self._restore_from_latest_backup()
                 return
             
-            # Загружаем данные
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            intern_repeated_strings(data)
+            sort_device_slots(data)
+            self.data = data
             
             logger.info(f"✅ Данные загружены успешно: {integrity_check['stats']}")
             
@@ -59,8 +157,11 @@ class SafeDataManager:
                 logger.info(f"📦 Найден валидный бэкап: {backup['filename']}")
                 
                 if backup_manager.restore_from_backup(backup['filepath']):
-                    with open(self.data_file, 'r', encoding='utf-8') as f:
-                        self.data = json.load(f)
+                    self._file_stamp_loaded = self._file_stamp()
+                    self.data = load_json_file(self.data_file)
+                    intern_repeated_strings(self.data)
+                    sort_device_slots(self.data)
+                    self._reset_indexes()
                     logger.info("✅ Данные восстановлены из резервной копии")
                     return
         
@@ -94,46 +195,497 @@ class SafeDataManager:
         logger.warning("⚠️ Создана пустая структура данных")
     
     def save_data(self, reason: str = "update") -> bool:
-        """Безопасно сохраняет данные с созданием резервной копии."""
+        """Безопасно сохраняет данные атомарной записью, бэкап — не чаще BACKUP_INTERVAL_SEC."""
+        # Данные могли измениться (новый мастер, привязка telegram_id) — индекс перестраиваем
+        self._reset_indexes()
+        # Полное сохранение покрывает и отложенную запись
+        self._cancel_flush()
         try:
-            # Создаем резервную копию перед сохранением
-            if self.data and reason != "emergency_recreate":
-                backup_path = backup_manager.create_timestamped_backup(f"before_{reason}")
-                if backup_path:
-                    logger.info(f"📦 Создан бэкап перед сохранением: {backup_path}")
-            
-            # Добавляем метаданные
-            if not self.data:
-                logger.error("❌ Нет данных для сохранения")
+            snapshot = self._take_snapshot(reason)
+            if snapshot is None:
                 return False
+            self._write_snapshot(*snapshot)
+            return self._check_saved(snapshot[0], reason)
             
-            self.data.setdefault("metadata", {})
-            self.data["metadata"]["last_updated"] = datetime.now().isoformat()
-            self.data["metadata"]["update_reason"] = reason
-            
-            # Сохраняем данные
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
-            
-            # Проверяем целостность сохраненного файла
-            integrity_check = backup_manager.verify_data_integrity(self.data_file)
-            if not integrity_check['valid']:
-                logger.error(f"❌ Сохраненный файл поврежден: {integrity_check['error']}")
+        except Exception as e:
+            logger.error(f"❌ Ошибка сохранения данных: {e}")
+            return False
+    
+    async def save_data_async(self, reason: str = "update") -> bool:
+        """
+        То же, что save_data, но бэкап, запись и fsync выполняются в потоке, не блокируя event loop.
+        
+        Пока идет запись, новые вызовы ждут одну общую следующую запись: ее снимок
+        снимается после окончания текущей и включает изменения всех ожидающих.
+        """
+        self._reset_indexes()
+        self._cancel_flush()
+        if self._queued_save is None:
+            self._queued_save = asyncio.ensure_future(self._run_queued_save(reason))
+        # shield: отмена одного обработчика не отменяет общую запись
+        return await asyncio.shield(self._queued_save)
+    
+    async def _run_queued_save(self, reason: str) -> bool:
+        """Дожидается текущей записи и сохраняет один снимок за всех ожидающих."""
+        previous = self._active_save
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        self._queued_save = None
+        self._active_save = asyncio.current_task()
+        try:
+            return await self._save_snapshot_async(reason)
+        finally:
+            if self._active_save is asyncio.current_task():
+                self._active_save = None
+    
+    async def _save_snapshot_async(self, reason: str) -> bool:
+        """Снимает снимок в event loop и пишет его на диск в потоке."""
+        try:
+            # Сериализуем в event loop: данные не меняются, пока снимок не готов
+            snapshot = self._take_snapshot(reason)
+            if snapshot is None:
                 return False
-            
-            logger.info(f"✅ Данные сохранены успешно (причина: {reason})")
-            return True
+            self._writes_in_flight += 1
+            try:
+                await asyncio.to_thread(self._write_snapshot, *snapshot)
+            finally:
+                self._writes_in_flight -= 1
+            return self._check_saved(snapshot[0], reason)
             
         except Exception as e:
             logger.error(f"❌ Ошибка сохранения данных: {e}")
             return False
     
+    def _take_snapshot(self, reason: str):
+        """Обновляет метаданные и сериализует данные; возвращает (payload, номер снимка, причина)."""
+        if not self.data:
+            logger.error("❌ Нет данных для сохранения")
+            return None
+        
+        self.data.setdefault("metadata", {})
+        self.data["metadata"]["last_updated"] = datetime.now().isoformat()
+        self.data["metadata"]["update_reason"] = reason
+        
+        self._snapshot_seq += 1
+        return dump_json_bytes(self.data), self._snapshot_seq, reason
+    
+    def _write_snapshot(self, payload: bytes, seq: int, reason: str) -> None:
+        """Пишет снимок на диск (при необходимости с бэкапом), пропуская устаревшие снимки."""
+        with self._write_lock:
+            if seq <= self._written_seq:
+                return
+            
+            # Периодическая резервная копия вместо копии перед каждым сохранением
+            if reason != "emergency_recreate" and self._backup_due():
+                backup_path = backup_manager.create_timestamped_backup(f"before_{reason}")
+                if backup_path:
+                    self._last_backup_ts = time.monotonic()
+                    logger.info(f"📦 Создан бэкап перед сохранением: {backup_path}")
+            
+            # Временный файл + fsync + атомарная замена
+            self._atomic_write(payload)
+            self._written_seq = seq
+            self._file_stamp_loaded = self._file_stamp()
+    
+    def _check_saved(self, payload: bytes, reason: str) -> bool:
+        """Проверяет структуру сохраненных данных в памяти, не перечитывая файл."""
+        integrity_check = backup_manager.check_data(self.data, len(payload))
+        if not integrity_check['valid']:
+            logger.error(f"❌ Сохраненный файл поврежден: {integrity_check['error']}")
+            return False
+        
+        logger.info(f"✅ Данные сохранены успешно (причина: {reason})")
+        return True
+    
+    def _backup_due(self) -> bool:
+        """Проверяет, пора ли делать очередную автоматическую резервную копию."""
+        return (
+            self._last_backup_ts is None
+            or time.monotonic() - self._last_backup_ts > BACKUP_INTERVAL_SEC
+        )
+    
+    def _atomic_write(self, payload: bytes) -> None:
+        """Записывает файл данных атомарно: читатели видят либо старую, либо новую версию."""
+        tmp_path = f"{self.data_file}.tmp.{os.getpid()}.{threading.get_ident()}"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.data_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
     def get_data(self) -> Dict[str, Any]:
-        """Возвращает текущие данные."""
+        """Возвращает данные из памяти; файл перечитывается, только если его изменил кто-то другой."""
         if self.data is None:
             self._load_data_safely()
+        elif not self._has_unsaved_changes():
+            stamp = self._file_stamp()
+            if stamp != self._file_stamp_loaded and stamp != self._file_stamp_rejected:
+                # Файл переписан в обход менеджера (DataService, админ-команды, ручное восстановление)
+                logger.info("🔄 Файл данных изменен извне, перечитываем")
+                self._reload_from_disk(stamp)
         return self.data
     
+    def _reload_from_disk(self, stamp: Optional[tuple]) -> None:
+        """
+        Перечитывает измененный извне файл, подменяя данные только валидным результатом.
+        
+        В отличие от первой загрузки, здесь не восстанавливаем бэкап и не создаем пустую
+        структуру: файл может быть записан другим процессом наполовину. При ошибке
+        оставляем данные в памяти и ждем следующего изменения файла.
+        """
+        try:
+            data = load_json_file(self.data_file)
+            integrity_check = backup_manager.check_data(data, os.path.getsize(self.data_file))
+            if not integrity_check['valid'] or not integrity_check['has_critical_data']:
+                raise ValueError(integrity_check['error'] or "нет критических данных")
+            intern_repeated_strings(data)
+            sort_device_slots(data)
+        except Exception as e:
+            logger.error(f"❌ Не удалось перечитать измененный файл данных, оставляем данные в памяти: {e}")
+            self._file_stamp_rejected = stamp
+            return
+        
+        self.data = data
+        self._file_stamp_loaded = stamp
+        self._file_stamp_rejected = None
+        self._reset_indexes()
+    
+    def _has_unsaved_changes(self) -> bool:
+        """Есть ли изменения в памяти, которые еще не записаны на диск."""
+        return (
+            self._flush_handle is not None
+            or self._writes_in_flight > 0
+            or self._queued_save is not None
+            or (self._flush_task is not None and not self._flush_task.done())
+        )
+    
+    def _file_stamp(self) -> Optional[tuple]:
+        """Отпечаток файла данных (inode, mtime, размер) или None, если файла нет."""
+        try:
+            stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def get_master_by_tid(self, telegram_id: str) -> Optional[Dict]:
+        """Находит мастера по telegram_id через индекс вместо перебора списка."""
+        # Сверяемся с файлом: при внешнем изменении данные перечитаются, а индексы сбросятся
+        self.get_data()
+        if self._masters_by_tid is None:
+            index = {}
+            for master in self.data.get("masters", []):
+                tid = master.get("telegram_id")
+                if tid:
+                    # Как и при линейном поиске, побеждает первое совпадение
+                    index.setdefault(tid, master)
+            self._masters_by_tid = index
+        return self._masters_by_tid.get(telegram_id)
+    
+    def get_device_by_id(self, device_id: str) -> Optional[Dict]:
+        """Находит устройство по id через индекс вместо перебора списка."""
+        self.get_data()
+        if self._devices_by_id is None:
+            index = {}
+            for device in self.data.get("devices", []):
+                if device.get("id"):
+                    index.setdefault(device["id"], device)
+            self._devices_by_id = index
+        return self._devices_by_id.get(device_id)
+    
+    def count_free_device_slots(self, device: Dict) -> int:
+        """Возвращает число незабронированных слотов устройства (считается за один проход по всем устройствам)."""
+        self.get_data()
+        if self._free_device_slots is None:
+            self._free_device_slots = {
+                id(entry): sum(1 for slot in entry.get("time_slots", []) if not slot.get("is_booked", False))
+                for entry in self.data.get("devices", [])
+            }
+        return self._free_device_slots.get(id(device), 0)
+    
+    def get_master_by_handle(self, handle: str) -> Optional[Dict]:
+        """Находит мастера по telegram_handle (для импортированных профилей), без учета регистра."""
+        self.get_data()
+        if self._masters_by_handle is None:
+            index = {}
+            for master in self.data.get("masters", []):
+                master_handle = master.get("telegram_handle")
+                if master_handle:
+                    # Username в Telegram не зависит от регистра: @FShubin и @fshubin — один человек
+                    index.setdefault(master_handle.lower(), master)
+            self._masters_by_handle = index
+        return self._masters_by_handle.get(handle.lower()) if handle else None
+    
+    def get_booking_by_id(self, booking_id: str) -> Optional[Dict]:
+        """Находит запись к мастеру (в профиле мастера или в общем списке) по ее id."""
+        self.get_data()
+        if self._bookings_by_id is None:
+            index = {}
+            data = self.data
+            for master in data.get("masters", []):
+                for booking in master.get("bookings", []):
+                    if booking.get("id"):
+                        index.setdefault(booking["id"], booking)
+            for booking in data.get("bookings", []):
+                if booking.get("id"):
+                    index.setdefault(booking["id"], booking)
+            self._bookings_by_id = index
+        return self._bookings_by_id.get(booking_id)
+    
+    def is_slot_booked(self, master_id: str, slot_date: str, start_time: str) -> bool:
+        """Проверяет, есть ли в общем списке записей активная запись на слот (master_id, дата, начало)."""
+        self.get_data()
+        if self._booked_slot_keys is None:
+            self._booked_slot_keys = {
+                (booking.get("master_id"), booking.get("slot_date"), booking.get("slot_start_time"))
+                for booking in self.data.get("bookings", [])
+                if booking.get("status") in ACTIVE_BOOKING_STATUSES
+            }
+        return (master_id, slot_date, start_time) in self._booked_slot_keys
+    
+    def is_device_slot_booked(self, device_id: str, slot_date: str, start_time: str) -> bool:
+        """Проверяет, есть ли активная запись на слот устройства (device_id, дата, начало)."""
+        self.get_data()
+        if self._booked_device_slot_keys is None:
+            self._booked_device_slot_keys = {
+                (booking.get("device_id"), booking.get("slot_date"), booking.get("slot_start_time"))
+                for booking in self.data.get("device_bookings", [])
+                if booking.get("status") in ACTIVE_BOOKING_STATUSES
+            }
+        return (device_id, slot_date, start_time) in self._booked_device_slot_keys
+    
+    def get_device_bookings(self, device_id: str) -> List[Dict]:
+        """Возвращает записи на устройство, упорядоченные по дате и времени (индекс строится один раз)."""
+        self.get_data()
+        if self._bookings_by_device is None:
+            bookings_by_device = {}
+            for booking in sorted(self.data.get("device_bookings", []), key=_booking_order_key):
+                bookings_by_device.setdefault(booking.get("device_id"), []).append(booking)
+            self._bookings_by_device = bookings_by_device
+        return self._bookings_by_device.get(device_id, [])
+    
+    def _get_device_booking_positions(self) -> Dict[str, int]:
+        """Индекс id записи на устройство -> позиция в списке device_bookings."""
+        self.get_data()
+        if self._device_booking_positions is None:
+            positions = {}
+            for i, booking in enumerate(self.data.get("device_bookings", [])):
+                if booking.get("id"):
+                    positions.setdefault(booking["id"], i)
+            self._device_booking_positions = positions
+        return self._device_booking_positions
+    
+    def get_device_booking_by_id(self, booking_id: str) -> Optional[Dict]:
+        """Находит запись на устройство по ее id через индекс вместо перебора списка."""
+        position = self._get_device_booking_positions().get(booking_id)
+        if position is None:
+            return None
+        return self.data["device_bookings"][position]
+    
+    def remove_device_booking(self, booking_id: str) -> Optional[Dict]:
+        """
+        Удаляет запись на устройство из памяти (без записи на диск) и возвращает ее.
+        
+        На место удаленной ставится последняя запись списка: читатели
+        упорядочивают записи сами (см. get_device_bookings), а сдвиг списка не нужен.
+        """
+        positions = self._get_device_booking_positions()
+        position = positions.pop(booking_id, None)
+        if position is None:
+            return None
+        
+        device_bookings = self.data["device_bookings"]
+        booking = device_bookings[position]
+        last = device_bookings.pop()
+        if last is not booking:
+            device_bookings[position] = last
+            if positions.get(last.get("id")) == len(device_bookings):
+                positions[last["id"]] = position
+        
+        self._booked_device_slot_keys = None
+        self._bookings_by_device = None
+        return booking
+    
+    def get_slots_on_date(self, slot_date: str) -> List[tuple]:
+        """Возвращает пары (мастер, слот) на дату в порядке списка мастеров."""
+        self.get_data()
+        if self._slots_by_date is None:
+            slots_by_date = {}
+            for master in self.data.get("masters", []):
+                for slot in master.get("time_slots", []):
+                    slots_by_date.setdefault(slot.get("date"), []).append((master, slot))
+            self._slots_by_date = slots_by_date
+        return self._slots_by_date.get(slot_date, [])
+    
+    def slot_start_epoch(self, slot: Dict) -> Optional[float]:
+        """
+        Возвращает начало слота в секундах эпохи (None, если дата или время некорректны).
+        
+        Результат разбора хранится в кэше менеджера, а не в самом слоте, чтобы не попадать в файл.
+        """
+        # Храним и сам слот: id() освобожденного словаря может достаться новому
+        cached = self._slot_epochs.get(id(slot))
+        if cached is not None and cached[0] is slot:
+            return cached[1]
+        try:
+            start_ts = datetime.strptime(f"{slot['date']} {slot['start_time']}", "%Y-%m-%d %H:%M").timestamp()
+        except (KeyError, TypeError, ValueError):
+            return None
+        self._slot_epochs[id(slot)] = (slot, start_ts)
+        return start_ts
+    
+    def get_device_info_text(self, device: Dict, render: Callable[[Dict], str]) -> str:
+        """Возвращает текст карточки устройства, собирая его через render один раз до изменения данных."""
+        self.get_data()
+        if self._device_info_texts is None:
+            self._device_info_texts = {}
+        # Храним само устройство: id() освободившегося объекта может достаться другому
+        cached = self._device_info_texts.get(id(device))
+        if cached is not None and cached[0] is device:
+            return cached[1]
+        text = render(device)
+        self._device_info_texts[id(device)] = (device, text)
+        return text
+    
+    def get_device_slots_on_date(self, device: Dict, slot_date: str) -> List[Dict]:
+        """Возвращает слоты устройства на дату (в порядке времени начала)."""
+        self.get_data()
+        if self._device_slots_by_date is None:
+            index = {}
+            for entry in self.data.get("devices", []):
+                for slot in entry.get("time_slots", []):
+                    index.setdefault((id(entry), slot.get("date")), []).append(slot)
+            self._device_slots_by_date = index
+        return self._device_slots_by_date.get((id(device), slot_date), [])
+    
+    def find_slot(self, owner: Dict, slot_date: str, start_time: str) -> Optional[Dict]:
+        """Находит слот мастера или устройства по (дата, время начала)."""
+        self.get_data()
+        if self._slots_by_key is None:
+            index = {}
+            # Ключ по id(owner): мастера и устройства лежат в разных списках
+            for owner_list in (self.data.get("masters", []), self.data.get("devices", [])):
+                for entity in owner_list:
+                    for slot in entity.get("time_slots", []):
+                        key = (id(entity), slot.get("date"), slot.get("start_time"))
+                        # Как и при линейном поиске, побеждает первое совпадение
+                        index.setdefault(key, slot)
+            self._slots_by_key = index
+        return self._slots_by_key.get((id(owner), slot_date, start_time))
+    
+    def get_unverified_master_names(self) -> List[tuple]:
+        """Пары (имя в нижнем регистре, мастер) для мастеров с еще не привязанным (fake) telegram_id."""
+        self.get_data()
+        if self._unverified_names is None:
+            names = []
+            for master in self.data.get("masters", []):
+                # Fake ID — не цифровой или короче 8 символов
+                telegram_id = master.get("telegram_id", "")
+                if not (telegram_id.isdigit() and len(telegram_id) >= 8):
+                    names.append((master.get("name", "").lower(), master))
+            self._unverified_names = names
+        return self._unverified_names
+    
+    def _build_booking_indexes(self) -> None:
+        """Строит индексы записей к мастерам за один проход по данным."""
+        confirmed_by_slot = {}
+        bookings_by_client = {}
+        confirmed_by_client = {}
+        # Ключ по id(master): у импортированных мастеров telegram_id может совпадать
+        for master in self.data.get("masters", []):
+            for booking in master.get("bookings", []):
+                if booking.get("status") == "confirmed":
+                    key = (id(master), booking.get("slot_date"), booking.get("slot_start_time"))
+                    # Как и при линейном поиске, побеждает первое совпадение
+                    confirmed_by_slot.setdefault(key, booking)
+                client_id = booking.get("client_id")
+                if client_id:
+                    bookings_by_client.setdefault(client_id, []).append((master, booking))
+                    if booking.get("status") == "confirmed":
+                        client_key = (id(master), client_id)
+                        confirmed_by_client[client_key] = confirmed_by_client.get(client_key, 0) + 1
+        self._confirmed_by_slot = confirmed_by_slot
+        self._bookings_by_client = bookings_by_client
+        self._confirmed_by_client = confirmed_by_client
+    
+    def get_confirmed_booking(self, master: Dict, slot_date: str, start_time: str) -> Optional[Dict]:
+        """Находит подтвержденную запись на слот мастера по (дата, время начала)."""
+        self.get_data()
+        if self._confirmed_by_slot is None:
+            self._build_booking_indexes()
+        return self._confirmed_by_slot.get((id(master), slot_date, start_time))
+    
+    def get_client_bookings(self, client_id: str) -> List[tuple]:
+        """Возвращает пары (мастер, запись) для всех записей клиента к мастерам."""
+        self.get_data()
+        if self._bookings_by_client is None:
+            self._build_booking_indexes()
+        return self._bookings_by_client.get(client_id, [])
+    
+    def count_confirmed_client_bookings(self, master: Dict, client_id: str) -> int:
+        """Возвращает число подтвержденных записей клиента к мастеру."""
+        self.get_data()
+        if self._confirmed_by_client is None:
+            self._build_booking_indexes()
+        return self._confirmed_by_client.get((id(master), client_id), 0)
+    
+    def mark_dirty(self, reason: str = "update") -> bool:
+        """Отмечает изменение данных в памяти: индексы сбрасываются, запись на диск откладывается."""
+        self._reset_indexes()
+        return self.schedule_flush(reason)
+    
+    def schedule_flush(self, reason: str = "update") -> bool:
+        """Откладывает сохранение на FLUSH_DELAY_SEC, объединяя несколько изменений в одну запись."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне event loop откладывать некому — пишем сразу
+            return self.save_data(reason)
+        
+        self._flush_reason = reason
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(FLUSH_DELAY_SEC, self._start_background_flush)
+        return True
+    
+    def _start_background_flush(self) -> None:
+        """Срабатывание таймера отложенной записи: пишем в потоке, не блокируя event loop."""
+        reason = self._flush_reason or "update"
+        self._flush_handle = None
+        self._flush_reason = None
+        self._flush_task = asyncio.ensure_future(self.save_data_async(reason))
+    
+    def flush_pending(self) -> bool:
+        """Немедленно выполняет отложенное сохранение, если оно запланировано."""
+        # Фоновая запись могла не успеть начаться до остановки loop — сохраняем синхронно
+        flush_in_flight = self._flush_task is not None and not self._flush_task.done()
+        if self._flush_handle is None and not flush_in_flight:
+            return True
+        return self.save_data(self._flush_reason or "update")
+    
+    def _cancel_flush(self) -> None:
+        """Снимает запланированную отложенную запись."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+            self._flush_reason = None
+    
+    def append_slots(self, telegram_id: str, slots: List[Dict]) -> bool:
+        """Добавляет слоты мастеру в памяти и планирует отложенную запись на диск."""
+        master = self.get_master_by_tid(telegram_id)
+        if master is None:
+            logger.warning(f"⚠️ Мастер не найден для добавления слотов: {telegram_id}")
+            return False
+        
+        master.setdefault("time_slots", []).extend(slots)
+        self._slots_by_date = None
+        self._slots_by_key = None
+        return self.schedule_flush("append_slots")
+    
     def add_master(self, master_data: Dict) -> bool:
         """Безопасно добавляет мастера."""
         try:
@@ -179,11 +731,10 @@ class SafeDataManager:
             if not self.data:
                 self._load_data_safely()
             
-            masters = self.data.get("masters", [])
-            for master in masters:
-                if master.get("telegram_id") == telegram_id:
-                    master.update(update_data)
-                    return self.save_data("update_master")
+            master = self.get_master_by_tid(telegram_id)
+            if master is not None:
+                master.update(update_data)
+                return self.save_data("update_master")
             
             logger.warning(f"⚠️ Мастер не найден для обновления: {telegram_id}")
             return False
@@ -216,7 +767,12 @@ class SafeDataManager:
     
     def create_manual_backup(self, reason: str = "manual") -> Optional[str]:
         """Создает ручную резервную копию."""
-        return backup_manager.create_timestamped_backup(reason)
+        backup_path = backup_manager.create_timestamped_backup(reason)
+        if backup_path:
+            self._last_backup_ts = time.monotonic()
+        return backup_path
 
-# Глобальный экземпляр безопасного менеджера данных
-safe_data_manager = SafeDataManager()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_safe_data_manager() -> SafeDataManager:
+    """Возвращает общий экземпляр менеджера данных, загружая базу при первом обращении."""
+    return SafeDataManager()
\ No newline at end of file
@@ -3,6 +3,7 @@ Telegram Notifier - отправляет уведомления о багах с
 """
 
 import asyncio
+import functools
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -13,6 +14,15 @@ from telegram.error import TelegramError
 
 logger = logging.getLogger(__name__)
 
+# Ответы на действия админа с багом (bug_<action>_<id>)
+_ACTION_TEMPLATES = {
+    "fix": "✅ Баг #{} отмечен для исправления",
+    "info": "ℹ️ Запрос дополнительной информации по багу #{}",
+    "postpone": "⏰ Баг #{} отложен",
+    "details": "📋 Подробная информация по багу #{}",
+    "reject": "❌ Баг #{} отклонен",
+}
+
 class TelegramNotifier:
     def __init__(self, admin_id: int = 78273571):
         # Используем тот же токен что и основной бот
@@ -217,32 +227,16 @@ class TelegramNotifier:
             return {"success": False, "message": "Unauthorized"}
         
         try:
-            action_parts = callback_data.split("_", 2)
-            if len(action_parts) < 3:
+            if not callback_data.startswith("bug_"):
                 return {"success": False, "message": "Invalid callback format"}
             
-            action_type = action_parts[1]  # fix, info, postpone, etc.
-            bug_id = action_parts[2]
-            
-            response_message = ""
+            # bug_<action>_<id>: fix, info, postpone, etc.
+            action_type, separator, bug_id = callback_data[4:].partition("_")
+            if not separator:
+                return {"success": False, "message": "Invalid callback format"}
             
-            if action_type == "fix":
-                response_message = f"✅ Баг #{bug_id} отмечен для исправления"
-                # Здесь можно добавить логику для автоматического исправления
-                
-            elif action_type == "info":
-                response_message = f"ℹ️ Запрос дополнительной информации по багу #{bug_id}"
-                # Логика для запроса дополнительной информации у пользователя
-                
-            elif action_type == "postpone":
-                response_message = f"⏰ Баг #{bug_id} отложен"
-                
-            elif action_type == "details":
-                response_message = f"📋 Подробная информация по багу #{bug_id}"
-                # Можно отправить дополнительную информацию
-                
-            elif action_type == "reject":
-                response_message = f"❌ Баг #{bug_id} отклонен"
+            template = _ACTION_TEMPLATES.get(action_type)
+            response_message = template.format(bug_id) if template else ""
             
             # Логируем действие
             logger.info(f"🎯 Админ действие: {action_type} для бага {bug_id}")
@@ -278,5 +272,7 @@ class TelegramNotifier:
         """Возвращает количество багов в очереди"""
         return len(self.pending_notifications)
 
-# Создаем глобальный экземпляр
-telegram_notifier = TelegramNotifier()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_telegram_notifier() -> TelegramNotifier:
+    """Возвращает общий экземпляр нотификатора, создавая Bot при первом обращении."""
+    return TelegramNotifier()
\ No newline at end of file
@@ -22,16 +22,26 @@ logger = logging.getLogger(__name__)
 MASTER_ROLE = "Я мну 🐙"
 CLIENT_ROLE = "Хочу, чтобы меня помяли 🙏"
 
+# Неизменяемые клавиатура и ответы создаются один раз
+START_MARKUP = ReplyKeyboardMarkup(
+    [[MASTER_ROLE, CLIENT_ROLE]], resize_keyboard=True, one_time_keyboard=True
+)
+MASTER_ROLE_REPLY = (
+    "Великолепно! Ты выбрал стать мастером! 🌊\n\n"
+    "Расскажи о себе: имя, опыт, услуги, свободное время и локации."
+)
+CLIENT_ROLE_REPLY = (
+    "Чудесно! Добро пожаловать в заповедник исцеления! 🌿\n\n"
+    "Здесь ты найдешь мастеров для восстановления сил."
+)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Отправляет приветственное сообщение с кнопками выбора роли."""
-    reply_keyboard = [[MASTER_ROLE, CLIENT_ROLE]]
-    markup = ReplyKeyboardMarkup(reply_keyboard, resize_keyboard=True, one_time_keyboard=True)
-
     await update.message.reply_text(
         f"Привет, {update.effective_user.mention_html()}! 🐙\n\n"
         "Я мудрый Осьминог, хранитель этого места.\n"
         "Чтобы начать, выбери, кто ты:",
-        reply_markup=markup,
+        reply_markup=START_MARKUP,
         parse_mode='HTML'
     )
 
@@ -43,15 +53,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     logger.info(f"Получено сообщение от {user_id}: '{text}'")
     
     if text == MASTER_ROLE:
-        await update.message.reply_text(
-            "Великолепно! Ты выбрал стать мастером! 🌊\n\n"
-            "Расскажи о себе: имя, опыт, услуги, свободное время и локации."
-        )
+        await update.message.reply_text(MASTER_ROLE_REPLY)
     elif text == CLIENT_ROLE:
-        await update.message.reply_text(
-            "Чудесно! Добро пожаловать в заповедник исцеления! 🌿\n\n"
-            "Здесь ты найдешь мастеров для восстановления сил."
-        )
+        await update.message.reply_text(CLIENT_ROLE_REPLY)
     else:
         await update.message.reply_text(
             f"Я получил твое сообщение: '{text}'\n"
@@ -102,6 +102,111 @@ class TestBotHandlers:
         assert "sk-1234567890abcdef" not in formatted
         assert "***HIDDEN***" in formatted
 
+@pytest.fixture
+def test_manager(tmp_path, monkeypatch):
+    """Менеджер данных на временном файле вместо общей базы бота."""
+    import json
+    import working_bot
+    from services.safe_data_manager import SafeDataManager
+    
+    db_file = tmp_path / "database.json"
+    db_file.write_text(json.dumps({
+        "masters": [
+            {"telegram_id": "555", "name": "Мастер", "bookings": [
+                {"id": "own1", "master_id": "555", "status": "confirmed", "client_id": "1"},
+                {"id": "own2", "master_id": "555", "status": "pending", "client_id": "2"},
+            ]},
+            {"telegram_id": "777", "name": "Другой мастер", "bookings": [
+                {"id": "other1", "master_id": "777", "status": "pending", "client_id": "3"},
+            ]},
+        ],
+        "bookings": [],
+        "devices": [],
+        "device_bookings": [],
+    }), encoding="utf-8")
+    manager = SafeDataManager(str(db_file))
+    manager._backup_due = lambda: False
+    monkeypatch.setattr(working_bot, "get_safe_data_manager", lambda: manager)
+    return manager
+
+class TestBookingLookup:
+    """Тесты поиска и обработки записей мастера"""
+    
+    def test_find_master_booking_by_id_checks_owner(self, test_manager):
+        """Запись находится по id только для мастера-владельца"""
+        from working_bot import find_master_booking
+        
+        master, other = test_manager.data["masters"]
+        assert find_master_booking(master, "own1")["id"] == "own1"
+        assert find_master_booking(master, "other1") is None
+        assert find_master_booking(other, "other1")["id"] == "other1"
+    
+    def test_find_master_booking_numeric_fallback(self, test_manager):
+        """Числовая ссылка старых кнопок — индекс в списке записей мастера"""
+        from working_bot import find_master_booking
+        
+        master = test_manager.data["masters"][0]
+        assert find_master_booking(master, "1")["id"] == "own2"
+        assert find_master_booking(master, "5") is None
+        assert find_master_booking(master, "missing") is None
+    
+    @pytest.mark.asyncio
+    async def test_confirm_of_processed_booking_is_ignored(self, test_manager, monkeypatch):
+        """Повторное подтверждение уже обработанной записи ничего не меняет и не уведомляет гостя"""
+        import working_bot
+        
+        send = AsyncMock()
+        monkeypatch.setattr(working_bot, "send_message_limited", send)
+        update = MagicMock()
+        update.callback_query.from_user.id = 555
+        update.callback_query.edit_message_text = AsyncMock()
+        
+        await working_bot.handle_booking_response(update, MagicMock(), "confirm_booking_own1")
+        
+        update.callback_query.edit_message_text.assert_awaited_once_with("Эта запись уже обработана.")
+        assert test_manager.data["masters"][0]["bookings"][0]["status"] == "confirmed"
+        send.assert_not_awaited()
+
+class TestWebhookServer:
+    """Тесты HTTP сервера webhook"""
+    
+    @pytest.fixture
+    async def webhook_url(self, monkeypatch):
+        """Запускает webhook-сервер на свободном порту без обработчиков очереди"""
+        import working_bot
+        
+        monkeypatch.setattr(working_bot, "WEBHOOK_SECRET", "secret")
+        monkeypatch.setattr(working_bot, "UPDATE_QUEUE_MAXSIZE", 1)
+        monkeypatch.setattr(working_bot, "UPDATE_WORKERS", 0)
+        runner = await working_bot.start_simple_webhook_server(MagicMock(), 0)
+        port = runner.addresses[0][1]
+        yield f"http://127.0.0.1:{port}/webhook"
+        await working_bot.stop_simple_webhook_server()
+    
+    @pytest.mark.asyncio
+    async def test_wrong_secret_is_rejected(self, webhook_url):
+        """Запрос без верного секрета получает 401"""
+        import aiohttp
+        
+        async with aiohttp.ClientSession() as session:
+            async with session.post(webhook_url, json={"update_id": 1}) as response:
+                assert response.status == 401
+            headers = {"X-Telegram-Bot-Api-Secret-Token": "wrong"}
+            async with session.post(webhook_url, json={"update_id": 1}, headers=headers) as response:
+                assert response.status == 401
+    
+    @pytest.mark.asyncio
+    async def test_full_queue_returns_429(self, webhook_url):
+        """При переполненной очереди обновлений Telegram получает 429"""
+        import aiohttp
+        
+        headers = {"X-Telegram-Bot-Api-Secret-Token": "secret"}
+        async with aiohttp.ClientSession() as session:
+            async with session.post(webhook_url, json={"update_id": 1}, headers=headers) as response:
+                assert response.status == 200
+            async with session.post(webhook_url, json={"update_id": 2}, headers=headers) as response:
+                assert response.status == 429
+
 class TestDataValidation:
     """Тесты валидации данных"""
     
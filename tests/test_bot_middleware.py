@@ -0,0 +1,81 @@
+"""
+Тесты ограничения и повтора исходящих сообщений
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+import bot_middleware
+from bot_middleware import SendTokenBucket, send_message_limited
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    """Отдельный token bucket и отправка без реальных пауз."""
+    bucket = SendTokenBucket(rate=20.0)
+    monkeypatch.setattr(bot_middleware, "send_bucket", bucket)
+    monkeypatch.setattr(bot_middleware.asyncio, "sleep", AsyncMock())
+    return bucket
+
+
+def make_bot(*side_effect):
+    bot = MagicMock()
+    bot.send_message = AsyncMock(side_effect=side_effect)
+    return bot
+
+
+def test_bucket_halves_on_throttle_and_recovers():
+    """RetryAfter вдвое снижает скорость (не ниже min_rate), успехи плавно ее наращивают."""
+    bucket = SendTokenBucket(rate=20.0, min_rate=4.0, max_rate=21.0)
+
+    bucket.on_throttled()
+    assert bucket.rate == 10.0
+    assert bucket.tokens == 0
+
+    bucket.on_throttled()
+    bucket.on_throttled()
+    assert bucket.rate == 4.0
+
+    for _ in range(200):
+        bucket.on_success()
+    assert bucket.rate == 21.0
+
+
+async def test_retry_after_is_retried_and_throttles(bucket):
+    """RetryAfter: ждем и повторяем, скорость bucket снижается."""
+    bot = make_bot(RetryAfter(3), "sent")
+
+    assert await send_message_limited(bot, 1, "текст") == "sent"
+    assert bot.send_message.await_count == 2
+    bot_middleware.asyncio.sleep.assert_any_await(3)
+    # Одно снижение вдвое и одно наращивание после успеха
+    assert bucket.rate == pytest.approx(10.1)
+
+
+@pytest.mark.parametrize("error", [TimedOut(), NetworkError("connection reset")])
+async def test_transient_errors_are_retried(bucket, error):
+    """Сетевые ошибки повторяются с паузой."""
+    bot = make_bot(error, "sent")
+
+    assert await send_message_limited(bot, 1, "текст") == "sent"
+    assert bot.send_message.await_count == 2
+
+
+@pytest.mark.parametrize("error", [BadRequest("Chat not found"), Forbidden("bot was blocked by the user")])
+async def test_permanent_errors_are_not_retried(bucket, error):
+    """BadRequest (подкласс NetworkError) и Forbidden не повторяются и не тратят токены."""
+    bot = make_bot(error, "sent")
+
+    with pytest.raises(type(error)):
+        await send_message_limited(bot, 1, "текст")
+    assert bot.send_message.await_count == 1
+    bot_middleware.asyncio.sleep.assert_not_awaited()
+
+
+async def test_gives_up_after_max_retries(bucket):
+    """После трех неудачных попыток ошибка пробрасывается."""
+    bot = make_bot(TimedOut(), TimedOut(), TimedOut())
+
+    with pytest.raises(TimedOut):
+        await send_message_limited(bot, 1, "текст")
+    assert bot.send_message.await_count == 3
@@ -1,182 +1,180 @@
 """
 Тесты для сервиса данных
 """
-import unittest
-import tempfile
-import os
 import json
+import pytest
 from bot.services.data_service import DataService
 
 
-class TestDataService(unittest.TestCase):
-    """Тесты для DataService."""
-    
-    def setUp(self):
-        """Настройка для каждого теста."""
-        # Создаем временный файл для тестов
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
-        
-        self.data_service = DataService(self.temp_file.name)
-    
-    def tearDown(self):
-        """Очистка после каждого теста."""
-        # Удаляем временный файл
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
-    
-    def test_create_empty_structure(self):
-        """Тест создания пустой структуры данных."""
-        data = self.data_service.load_data()
-        
-        self.assertIn("masters", data)
-        self.assertIn("bookings", data)
-        self.assertIn("locations", data)
-        self.assertIn("settings", data)
-        
-        self.assertEqual(data["masters"], [])
-        self.assertEqual(data["bookings"], [])
-        self.assertIsInstance(data["locations"], list)
-        self.assertIsInstance(data["settings"], dict)
-    
-    def test_save_and_load_data(self):
-        """Тест сохранения и загрузки данных."""
-        test_data = {
-            "masters": [{"name": "Test Master", "telegram_id": "12345678"}],
-            "bookings": [],
-            "locations": [],
-            "settings": {}
-        }
-        
-        # Сохраняем данные
-        result = self.data_service.save_data(test_data)
-        self.assertTrue(result)
-        
-        # Загружаем данные
-        loaded_data = self.data_service.load_data()
-        self.assertEqual(loaded_data["masters"][0]["name"], "Test Master")
-        self.assertEqual(loaded_data["masters"][0]["telegram_id"], "12345678")
-    
-    def test_find_master_by_id(self):
-        """Тест поиска мастера по ID."""
-        # Сначала добавляем тестового мастера
-        test_data = {
-            "masters": [
-                {"name": "Master 1", "telegram_id": "12345678"},
-                {"name": "Master 2", "telegram_id": "87654321"}
-            ],
-            "bookings": [],
-            "locations": [],
-            "settings": {}
-        }
-        self.data_service.save_data(test_data)
-        
-        # Ищем существующего мастера
-        master = self.data_service.find_master_by_id("12345678")
-        self.assertIsNotNone(master)
-        self.assertEqual(master["name"], "Master 1")
-        
-        # Ищем несуществующего мастера
-        master = self.data_service.find_master_by_id("99999999")
-        self.assertIsNone(master)
-        
-        # Некорректный ID
-        master = self.data_service.find_master_by_id("invalid")
-        self.assertIsNone(master)
-    
-    def test_find_master_by_handle(self):
-        """Тест поиска мастера по handle."""
-        test_data = {
-            "masters": [
-                {"name": "Master 1", "telegram_id": "12345678", "telegram_handle": "@master1"},
-                {"name": "Master 2", "telegram_id": "87654321", "telegram_handle": "@master2"}
-            ],
-            "bookings": [],
-            "locations": [],
-            "settings": {}
-        }
-        self.data_service.save_data(test_data)
-        
-        # Ищем существующего мастера
-        master = self.data_service.find_master_by_handle("@master1")
-        self.assertIsNotNone(master)
-        self.assertEqual(master["name"], "Master 1")
-        
-        # Ищем несуществующего мастера
-        master = self.data_service.find_master_by_handle("@nonexistent")
-        self.assertIsNone(master)
-    
-    def test_add_master(self):
-        """Тест добавления мастера."""
-        master_data = {
-            "name": "New Master",
-            "telegram_id": "12345678",
-            "telegram_handle": "@newmaster"
-        }
-        
-        # Добавляем мастера
-        result = self.data_service.add_master(master_data)
-        self.assertTrue(result)
-        
-        # Проверяем, что мастер добавлен
-        master = self.data_service.find_master_by_id("12345678")
-        self.assertIsNotNone(master)
-        self.assertEqual(master["name"], "New Master")
-        self.assertIn("created_at", master)
-        self.assertTrue(master["is_active"])
-        
-        # Попытка добавить дубликат
-        result = self.data_service.add_master(master_data)
-        self.assertFalse(result)
-    
-    def test_link_telegram_id(self):
-        """Тест привязки telegram ID."""
-        test_data = {
-            "masters": [
-                {"name": "Master 1", "telegram_id": "fake123", "telegram_handle": "@master1"}
-            ],
-            "bookings": [],
-            "locations": [],
-            "settings": {}
-        }
-        self.data_service.save_data(test_data)
-        
-        # Привязываем настоящий ID
-        result = self.data_service.link_telegram_id("@master1", "87654321")
-        self.assertTrue(result)
-        
-        # Проверяем обновление
-        master = self.data_service.find_master_by_id("87654321")
-        self.assertIsNotNone(master)
-        self.assertEqual(master["name"], "Master 1")
-        self.assertIn("verified_at", master)
-        
-        # Попытка привязать к несуществующему handle
-        result = self.data_service.link_telegram_id("@nonexistent", "11111111")
-        self.assertFalse(result)
-    
-    def test_get_all_masters(self):
-        """Тест получения всех активных мастеров."""
-        test_data = {
-            "masters": [
-                {"name": "Active Master", "telegram_id": "12345678", "is_active": True},
-                {"name": "Inactive Master", "telegram_id": "87654321", "is_active": False},
-                {"name": "Default Master", "telegram_id": "11111111"}  # is_active по умолчанию True
-            ],
-            "bookings": [],
-            "locations": [],
-            "settings": {}
-        }
-        self.data_service.save_data(test_data)
-        
-        masters = self.data_service.get_all_masters()
-        self.assertEqual(len(masters), 2)  # Только активные
-        
-        master_names = [master["name"] for master in masters]
-        self.assertIn("Active Master", master_names)
-        self.assertIn("Default Master", master_names)
-        self.assertNotIn("Inactive Master", master_names)
-
-
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+def make_data(masters=None):
+    """Собирает структуру базы с заданными мастерами."""
+    return {
+        "masters": masters or [],
+        "bookings": [],
+        "locations": [],
+        "settings": {}
+    }
+
+
+@pytest.fixture(scope="module")
+def db_file(tmp_path_factory):
+    """Один временный файл базы на весь модуль."""
+    return str(tmp_path_factory.mktemp("data") / "database.json")
+
+
+@pytest.fixture(scope="module")
+def data_service(db_file):
+    """Один DataService на весь модуль."""
+    return DataService(db_file)
+
+
+@pytest.fixture(autouse=True)
+def reset_database(data_service):
+    """Сброс базы к пустой структуре перед каждым тестом."""
+    data_service.save_data(make_data())
+
+
+def test_create_empty_structure(data_service):
+    """Тест создания пустой структуры данных."""
+    data = data_service.load_data()
+
+    assert "masters" in data
+    assert "bookings" in data
+    assert "locations" in data
+    assert "settings" in data
+
+    assert data["masters"] == []
+    assert data["bookings"] == []
+    assert isinstance(data["locations"], list)
+    assert isinstance(data["settings"], dict)
+
+
+def test_missing_file_returns_empty_structure(tmp_path):
+    """Тест пустой структуры по умолчанию, если файла базы нет."""
+    data = DataService(str(tmp_path / "missing.json")).load_data()
+
+    assert data["masters"] == []
+    assert data["bookings"] == []
+    assert isinstance(data["locations"], list)
+    assert isinstance(data["settings"], dict)
+
+
+def test_save_and_load_data(data_service):
+    """Тест сохранения и загрузки данных."""
+    test_data = make_data([{"name": "Test Master", "telegram_id": "12345678"}])
+
+    # Сохраняем данные
+    assert data_service.save_data(test_data) is True
+
+    # Загружаем данные
+    loaded_data = data_service.load_data()
+    assert loaded_data["masters"][0]["name"] == "Test Master"
+    assert loaded_data["masters"][0]["telegram_id"] == "12345678"
+
+
+def test_find_master_by_id(data_service):
+    """Тест поиска мастера по ID."""
+    data_service.save_data(make_data([
+        {"name": "Master 1", "telegram_id": "12345678"},
+        {"name": "Master 2", "telegram_id": "87654321"}
+    ]))
+
+    # Ищем существующего мастера
+    master = data_service.find_master_by_id("12345678")
+    assert master is not None
+    assert master["name"] == "Master 1"
+
+    # Ищем несуществующего мастера
+    assert data_service.find_master_by_id("99999999") is None
+
+    # Некорректный ID
+    assert data_service.find_master_by_id("invalid") is None
+
+
+def test_find_master_by_handle(data_service):
+    """Тест поиска мастера по handle."""
+    data_service.save_data(make_data([
+        {"name": "Master 1", "telegram_id": "12345678", "telegram_handle": "@master1"},
+        {"name": "Master 2", "telegram_id": "87654321", "telegram_handle": "@master2"}
+    ]))
+
+    # Ищем существующего мастера
+    master = data_service.find_master_by_handle("@master1")
+    assert master is not None
+    assert master["name"] == "Master 1"
+
+    # Ищем несуществующего мастера
+    assert data_service.find_master_by_handle("@nonexistent") is None
+
+
+def test_find_master_sees_external_changes(data_service, db_file):
+    """Тест обновления индекса мастеров после записи файла в обход сервиса."""
+    data_service.save_data(make_data([{"name": "Master 1", "telegram_id": "12345678"}]))
+    assert data_service.find_master_by_id("12345678") is not None
+
+    # Другой процесс/менеджер перезаписывает базу
+    with open(db_file, "w", encoding="utf-8") as f:
+        json.dump(make_data([{"name": "Master 2", "telegram_id": "87654321"}]), f)
+
+    assert data_service.find_master_by_id("12345678") is None
+    master = data_service.find_master_by_id("87654321")
+    assert master is not None
+    assert master["name"] == "Master 2"
+
+
+def test_add_master(data_service):
+    """Тест добавления мастера."""
+    master_data = {
+        "name": "New Master",
+        "telegram_id": "12345678",
+        "telegram_handle": "@newmaster"
+    }
+
+    # Добавляем мастера
+    assert data_service.add_master(master_data) is True
+
+    # Проверяем, что мастер добавлен
+    master = data_service.find_master_by_id("12345678")
+    assert master is not None
+    assert master["name"] == "New Master"
+    assert "created_at" in master
+    assert master["is_active"] is True
+
+    # Попытка добавить дубликат
+    assert data_service.add_master(master_data) is False
+
+
+def test_link_telegram_id(data_service):
+    """Тест привязки telegram ID."""
+    data_service.save_data(make_data([
+        {"name": "Master 1", "telegram_id": "fake123", "telegram_handle": "@master1"}
+    ]))
+
+    # Привязываем настоящий ID
+    assert data_service.link_telegram_id("@master1", "87654321") is True
+
+    # Проверяем обновление
+    master = data_service.find_master_by_id("87654321")
+    assert master is not None
+    assert master["name"] == "Master 1"
+    assert "verified_at" in master
+
+    # Попытка привязать к несуществующему handle
+    assert data_service.link_telegram_id("@nonexistent", "11111111") is False
+
+
+def test_get_all_masters(data_service):
+    """Тест получения всех активных мастеров."""
+    data_service.save_data(make_data([
+        {"name": "Active Master", "telegram_id": "12345678", "is_active": True},
+        {"name": "Inactive Master", "telegram_id": "87654321", "is_active": False},
+        {"name": "Default Master", "telegram_id": "11111111"}  # is_active по умолчанию True
+    ]))
+
+    masters = data_service.get_all_masters()
+    assert len(masters) == 2  # Только активные
+
+    master_names = [master["name"] for master in masters]
+    assert "Active Master" in master_names
+    assert "Default Master" in master_names
+    assert "Inactive Master" not in master_names
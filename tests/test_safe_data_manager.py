@@ -0,0 +1,148 @@
+"""
+Тесты безопасного менеджера данных: сохранение, перечитывание файла, индексы записей
+"""
+import asyncio
+import json
+import pytest
+from services.safe_data_manager import SafeDataManager
+
+
+def make_data(device_bookings=None):
+    """Собирает валидную базу с одним мастером (без критических данных менеджер ищет бэкапы)."""
+    return {
+        "masters": [{"telegram_id": "555", "name": "Мастер", "telegram_handle": "@master", "bookings": []}],
+        "bookings": [],
+        "devices": [{"id": "vibro_chair", "time_slots": []}],
+        "device_bookings": device_bookings or [],
+    }
+
+
+def make_device_booking(booking_id, start_time):
+    """Запись на виброкресло с заданным id и временем начала."""
+    return {
+        "id": booking_id,
+        "device_id": "vibro_chair",
+        "slot_date": "2025-08-02",
+        "slot_start_time": start_time,
+        "status": "confirmed",
+    }
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = tmp_path / "database.json"
+    write_json(path, make_data())
+    return str(path)
+
+
+@pytest.fixture
+def manager(db_file):
+    """Менеджер на временном файле; автоматические бэкапы отключены."""
+    m = SafeDataManager(db_file)
+    m._backup_due = lambda: False
+    return m
+
+
+async def test_concurrent_async_saves_share_one_snapshot(manager):
+    """Одновременные save_data_async объединяются в одну запись."""
+    snapshots = []
+    take_snapshot = manager._take_snapshot
+    manager._take_snapshot = lambda reason: (snapshots.append(reason), take_snapshot(reason))[1]
+
+    results = await asyncio.gather(*(manager.save_data_async(f"r{i}") for i in range(5)))
+
+    assert results == [True] * 5
+    assert snapshots == ["r0"]
+    assert manager._queued_save is None
+    assert manager._active_save is None
+
+
+async def test_save_during_write_gets_one_trailing_snapshot(manager):
+    """Сохранения, пришедшие во время записи, ждут одну следующую запись с их изменениями."""
+    snapshots = []
+    take_snapshot = manager._take_snapshot
+    manager._take_snapshot = lambda reason: (snapshots.append(reason), take_snapshot(reason))[1]
+
+    first = asyncio.ensure_future(manager.save_data_async("first"))
+    # Даем первой записи начаться (снимок снят, запись ушла в поток)
+    while not snapshots:
+        await asyncio.sleep(0)
+    manager.data["masters"][0]["name"] = "Новое имя"
+    rest = [asyncio.ensure_future(manager.save_data_async(r)) for r in ("a", "b", "c")]
+
+    assert await asyncio.gather(first, *rest) == [True] * 4
+    assert snapshots == ["first", "a"]
+    with open(manager.data_file, encoding="utf-8") as f:
+        assert json.load(f)["masters"][0]["name"] == "Новое имя"
+
+
+def test_stale_snapshot_does_not_overwrite_newer(manager):
+    """Снимок с меньшим номером не затирает уже записанный более новый."""
+    manager._write_snapshot(b'{"seq": 2}', 2, "new")
+    manager._write_snapshot(b'{"seq": 1}', 1, "old")
+
+    with open(manager.data_file, encoding="utf-8") as f:
+        assert json.load(f) == {"seq": 2}
+
+
+def test_external_change_is_reloaded(manager, db_file):
+    """Файл, измененный в обход менеджера, перечитывается при следующем обращении."""
+    data = make_data()
+    data["masters"][0]["name"] = "Из другого процесса"
+    write_json(db_file, data)
+
+    assert manager.get_data()["masters"][0]["name"] == "Из другого процесса"
+
+
+def test_broken_external_change_keeps_memory_data(manager, db_file, monkeypatch):
+    """Недописанный файл не подменяет данные и не запускает восстановление из бэкапа."""
+    before = manager.get_data()
+    monkeypatch.setattr(manager, "_restore_from_latest_backup", lambda: pytest.fail("восстановление из бэкапа"))
+    monkeypatch.setattr(manager, "_create_empty_structure", lambda: pytest.fail("пересоздание базы"))
+    with open(db_file, "w", encoding="utf-8") as f:
+        f.write('{"masters": [')
+
+    assert manager.get_data() is before
+    # Файл не перезаписан: другой процесс может его дописать
+    with open(db_file, encoding="utf-8") as f:
+        assert f.read() == '{"masters": ['
+
+    # Дописанный файл подхватывается
+    data = make_data()
+    data["masters"][0]["name"] = "Дописан"
+    write_json(db_file, data)
+    assert manager.get_data()["masters"][0]["name"] == "Дописан"
+
+
+def test_remove_device_booking_swaps_last_into_place(manager):
+    """Удаление ставит последнюю запись на место удаленной и поддерживает индекс."""
+    manager.data["device_bookings"] = [
+        make_device_booking(booking_id, f"1{i}:00") for i, booking_id in enumerate("abcd")
+    ]
+    manager.mark_dirty()
+    assert manager.is_device_slot_booked("vibro_chair", "2025-08-02", "11:00")
+
+    removed = manager.remove_device_booking("b")
+
+    assert removed["id"] == "b"
+    assert [b["id"] for b in manager.data["device_bookings"]] == ["a", "d", "c"]
+    assert manager.get_device_booking_by_id("b") is None
+    assert manager.get_device_booking_by_id("d")["slot_start_time"] == "13:00"
+    assert not manager.is_device_slot_booked("vibro_chair", "2025-08-02", "11:00")
+
+
+def test_remove_last_and_unknown_device_booking(manager):
+    """Удаление последней записи и неизвестного id."""
+    manager.data["device_bookings"] = [make_device_booking("a", "10:00"), make_device_booking("b", "11:00")]
+    manager.mark_dirty()
+
+    assert manager.remove_device_booking("missing") is None
+    assert manager.remove_device_booking("b")["id"] == "b"
+    assert manager.remove_device_booking("a")["id"] == "a"
+    assert manager.data["device_bookings"] == []
+    assert manager.get_device_booking_by_id("a") is None
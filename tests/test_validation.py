@@ -1,9 +1,9 @@
 """
 Тесты для модуля валидации
 """
-import unittest
+import pytest
 from bot.utils.validation import (
-    validate_telegram_id, 
+    validate_telegram_id,
     sanitize_user_input,
     validate_telegram_handle,
     validate_time_format,
@@ -12,102 +12,105 @@ from bot.utils.validation import (
 )
 
 
-class TestValidation(unittest.TestCase):
-    """Тесты функций валидации."""
-    
-    def test_validate_telegram_id(self):
-        """Тест валидации telegram ID."""
-        # Корректные ID
-        self.assertTrue(validate_telegram_id("12345678"))
-        self.assertTrue(validate_telegram_id("123456789"))
-        self.assertTrue(validate_telegram_id("78273571"))
-        
-        # Некорректные ID
-        self.assertFalse(validate_telegram_id("1234567"))  # Слишком короткий
-        self.assertFalse(validate_telegram_id("abc123"))   # Не только цифры
-        self.assertFalse(validate_telegram_id(""))         # Пустой
-        self.assertFalse(validate_telegram_id(None))       # None
-        self.assertFalse(validate_telegram_id(123))        # Не строка
-    
-    def test_sanitize_user_input(self):
-        """Тест очистки пользовательского ввода."""
-        # Обычный текст
-        result = sanitize_user_input("  Привет мир  ")
-        self.assertEqual(result, "Привет мир")
-        
-        # Удаление опасных символов
-        result = sanitize_user_input("Текст с <script> и 'кавычками'")
-        self.assertEqual(result, "Текст с script и кавычками")
-        
-        # Ограничение длины (используем короткий текст для теста)
-        long_text = "a" * 3000
-        result = sanitize_user_input(long_text)
-        self.assertLessEqual(len(result), 2000)
-        
-        # Пустой ввод
-        self.assertEqual(sanitize_user_input(""), "")
-        self.assertEqual(sanitize_user_input(None), "")
-    
-    def test_validate_telegram_handle(self):
-        """Тест валидации telegram handle."""
-        # Корректные handles
-        self.assertTrue(validate_telegram_handle("@username"))
-        self.assertTrue(validate_telegram_handle("@test_user123"))
-        self.assertTrue(validate_telegram_handle("@ivanslyozkin"))
-        
-        # Некорректные handles
-        self.assertFalse(validate_telegram_handle("username"))    # Без @
-        self.assertFalse(validate_telegram_handle("@usr"))        # Слишком короткий
-        self.assertFalse(validate_telegram_handle("@user-name"))  # Недопустимый символ
-        self.assertFalse(validate_telegram_handle(""))           # Пустой
-        self.assertFalse(validate_telegram_handle(None))         # None
-    
-    def test_validate_time_format(self):
-        """Тест валидации формата времени."""
-        # Корректное время
-        self.assertTrue(validate_time_format("14:30"))
-        self.assertTrue(validate_time_format("00:00"))
-        self.assertTrue(validate_time_format("23:59"))
-        self.assertTrue(validate_time_format("9:15"))
-        
-        # Некорректное время
-        self.assertFalse(validate_time_format("25:00"))  # Неверный час
-        self.assertFalse(validate_time_format("14:60"))  # Неверные минуты
-        self.assertFalse(validate_time_format("1430"))   # Без двоеточия
-        self.assertFalse(validate_time_format(""))       # Пустое
-        self.assertFalse(validate_time_format(None))     # None
-    
-    def test_validate_date_format(self):
-        """Тест валидации формата даты."""
-        # Корректные даты
-        self.assertTrue(validate_date_format("2025-07-31"))
-        self.assertTrue(validate_date_format("2025-12-31"))
-        self.assertTrue(validate_date_format("2025-01-01"))
-        
-        # Некорректные даты
-        self.assertFalse(validate_date_format("25-07-31"))    # Неверный год
-        self.assertFalse(validate_date_format("2025/07/31"))  # Неверный разделитель
-        self.assertFalse(validate_date_format("31-07-2025"))  # Неверный порядок
-        self.assertFalse(validate_date_format(""))           # Пустое
-        self.assertFalse(validate_date_format(None))         # None
-    
-    def test_extract_telegram_handle(self):
-        """Тест извлечения telegram handle из текста."""
-        # Успешное извлечение
-        text1 = "Меня зовут Иван, мой телеграм @ivanslyozkin"
-        self.assertEqual(extract_telegram_handle(text1), "@ivanslyozkin")
-        
-        text2 = "Пишите @test_user для связи"
-        self.assertEqual(extract_telegram_handle(text2), "@test_user")
-        
-        # Не найдено
-        text3 = "Обычный текст без handles"
-        self.assertIsNone(extract_telegram_handle(text3))
-        
-        # Пустой ввод
-        self.assertIsNone(extract_telegram_handle(""))
-        self.assertIsNone(extract_telegram_handle(None))
+@pytest.mark.parametrize("user_id, expected", [
+    # Корректные ID
+    ("12345678", True),
+    ("123456789", True),
+    ("78273571", True),
+    # Некорректные ID
+    ("1234567", False),  # Слишком короткий
+    ("abc123", False),   # Не только цифры
+    ("", False),         # Пустой
+    (None, False),       # None
+    (123, False),        # Не строка
+])
+def test_validate_telegram_id(user_id, expected):
+    """Тест валидации telegram ID."""
+    assert validate_telegram_id(user_id) is expected
 
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+@pytest.mark.parametrize("text, expected", [
+    # Обычный текст
+    ("  Привет мир  ", "Привет мир"),
+    # Удаление опасных символов
+    ("Текст с <script> и 'кавычками'", "Текст с script и кавычками"),
+    # Пустой ввод
+    ("", ""),
+    (None, ""),
+])
+def test_sanitize_user_input(text, expected):
+    """Тест очистки пользовательского ввода."""
+    assert sanitize_user_input(text) == expected
+
+
+def test_sanitize_user_input_length_limit():
+    """Тест ограничения длины пользовательского ввода."""
+    long_text = "a" * 3000
+    assert len(sanitize_user_input(long_text)) <= 2000
+
+
+@pytest.mark.parametrize("handle, expected", [
+    # Корректные handles
+    ("@username", True),
+    ("@test_user123", True),
+    ("@ivanslyozkin", True),
+    # Некорректные handles
+    ("username", False),    # Без @
+    ("@usr", False),        # Слишком короткий
+    ("@user-name", False),  # Недопустимый символ
+    ("", False),            # Пустой
+    (None, False),          # None
+])
+def test_validate_telegram_handle(handle, expected):
+    """Тест валидации telegram handle."""
+    assert validate_telegram_handle(handle) is expected
+
+
+@pytest.mark.parametrize("time_str, expected", [
+    # Корректное время
+    ("14:30", True),
+    ("00:00", True),
+    ("23:59", True),
+    ("9:15", True),
+    # Некорректное время
+    ("25:00", False),  # Неверный час
+    ("14:60", False),  # Неверные минуты
+    ("1430", False),   # Без двоеточия
+    ("", False),       # Пустое
+    (None, False),     # None
+])
+def test_validate_time_format(time_str, expected):
+    """Тест валидации формата времени."""
+    assert validate_time_format(time_str) is expected
+
+
+@pytest.mark.parametrize("date_str, expected", [
+    # Корректные даты
+    ("2025-07-31", True),
+    ("2025-12-31", True),
+    ("2025-01-01", True),
+    # Некорректные даты
+    ("25-07-31", False),    # Неверный год
+    ("2025/07/31", False),  # Неверный разделитель
+    ("31-07-2025", False),  # Неверный порядок
+    ("", False),            # Пустое
+    (None, False),          # None
+])
+def test_validate_date_format(date_str, expected):
+    """Тест валидации формата даты."""
+    assert validate_date_format(date_str) is expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Успешное извлечение
+    ("Меня зовут Иван, мой телеграм @ivanslyozkin", "@ivanslyozkin"),
+    ("Пишите @test_user для связи", "@test_user"),
+    # Не найдено
+    ("Обычный текст без handles", None),
+    # Пустой ввод
+    ("", None),
+    (None, None),
+])
+def test_extract_telegram_handle(text, expected):
+    """Тест извлечения telegram handle из текста."""
+    assert extract_telegram_handle(text) == expected
@@ -0,0 +1,124 @@
+"""
+Утилиты для бота Octopus Concierge
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Дни недели на русском
+WEEKDAYS_RU = (
+    "Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"
+)
+
+# Месяцы на русском в родительном падеже
+MONTHS_RU_GENITIVE = (
+    "января", "февраля", "марта", "апреля", "мая", "июня",
+    "июля", "августа", "сентября", "октября", "ноября", "декабря"
+)
+
+# Строка списка слотов: тот же формат, что и у format_slot_for_user, с номером
+_SLOT_LINE_TEMPLATE = "%d. %s с %s до %s (%s)"
+_BOOKED_SLOT_TEMPLATE = "%s - забронирован (%s)"
+
+# Символы, при которых Telegram-у нужен разбор Markdown
+_MARKDOWN_CHARS = frozenset("*_`[")
+
+def markdown_parse_mode(text: str) -> Optional[str]:
+    """
+    Возвращает parse_mode для текста сообщения.
+    
+    Args:
+        text: Текст сообщения
+        
+    Returns:
+        "Markdown", если в тексте есть символы разметки, иначе None
+    """
+    return None if _MARKDOWN_CHARS.isdisjoint(text) else "Markdown"
+
+@lru_cache(maxsize=1024)
+def format_date_for_user(date_str: str) -> str:
+    """
+    Форматирует дату из ISO формата в удобный для пользователя.
+    
+    Args:
+        date_str: Дата в формате "2025-08-02"
+        
+    Returns:
+        Строка вида "Суббота 2 августа"
+    """
+    try:
+        # strptime принимает и даты без ведущих нулей ("2025-7-5"); результат кэшируется
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        
+        weekday = WEEKDAYS_RU[date_obj.weekday()]
+        day = date_obj.day
+        month = MONTHS_RU_GENITIVE[date_obj.month - 1]
+        
+        return f"{weekday} {day} {month}"
+        
+    except Exception as e:
+        # В случае ошибки возвращаем исходную дату
+        return date_str
+
+def format_slot_for_user(slot: Dict) -> str:
+    """
+    Форматирует слот для отображения пользователю.
+    
+    Args:
+        slot: Словарь с данными слота
+        
+    Returns:
+        Строка вида "Суббота 2 августа с 14:00 до 15:00 (баня)"
+    """
+    return _format_slot(
+        slot.get("date", ""),
+        slot.get("start_time", ""),
+        slot.get("end_time", ""),
+        slot.get("location", "")
+    )
+
+@lru_cache(maxsize=1024)
+def _format_slot(date_str: str, start_time: str, end_time: str, location: str) -> str:
+    """Кэшируемое форматирование слота по примитивным полям (сам словарь не хэшируется)."""
+    return f"{format_date_for_user(date_str)} с {start_time} до {end_time} ({location})"
+
+def format_slots_list(slots: List[Dict], show_status: bool = False) -> str:
+    """
+    Форматирует список слотов для отображения.
+    
+    Args:
+        slots: Список слотов
+        show_status: Показывать ли статус слота
+        
+    Returns:
+        Отформатированная строка
+    """
+    if not slots:
+        return "Нет доступных слотов"
+    
+    format_date = format_date_for_user
+    rows = [
+        (
+            i,
+            format_date(slot.get("date", "")),
+            slot.get("start_time", ""),
+            slot.get("end_time", ""),
+            slot.get("location", ""),
+        )
+        for i, slot in enumerate(slots, 1)
+    ]
+    
+    if not show_status:
+        return "\n".join(map(_SLOT_LINE_TEMPLATE.__mod__, rows))
+    
+    formatted_slots = []
+    for row, slot in zip(rows, slots):
+        slot_text = _SLOT_LINE_TEMPLATE % row
+        if slot.get("status", "свободен") == "booked":
+            slot_text = _BOOKED_SLOT_TEMPLATE % (slot_text, slot.get("client_name", "клиент"))
+        else:
+            slot_text += " - свободен"
+        formatted_slots.append(slot_text)
+    
+    return "\n".join(formatted_slots)
@@ -2,19 +2,46 @@
 Утилиты для работы с московским временем
 """
 
+import time
 from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
+from utils.formatting import MONTHS_RU_GENITIVE
+
 # Московский часовой пояс (UTC+3)
 MOSCOW_TZ = timezone(timedelta(hours=3))
 
+# Дни недели для уведомлений (со строчной буквы, в отличие от WEEKDAYS_RU)
+_WEEKDAY_NAMES_RU = (
+    "понедельник", "вторник", "среда", "четверг", "пятница", "суббота", "воскресенье"
+)
+
 def moscow_now() -> datetime:
     """Возвращает текущее время в московском часовом поясе"""
     return datetime.now(MOSCOW_TZ)
 
+# Смещение в днях для относительных дат
+_RELATIVE_DAY_OFFSETS = {
+    "сегодня": 0, "today": 0,
+    "завтра": 1, "tomorrow": 1,
+    "послезавтра": 2, "day after tomorrow": 2,
+    "вчера": -1, "yesterday": -1,
+}
+
+# (секунда эпохи, дата) — дата пересчитывается не чаще раза в секунду.
+# Кортеж заменяется целиком, поэтому чтение безопасно и без блокировки.
+_today_cache = (None, None)
+
 def moscow_today() -> date:
     """Возвращает сегодняшнюю дату по московскому времени"""
-    return moscow_now().date()
+    global _today_cache
+    second = int(time.time())
+    cached_second, cached_date = _today_cache
+    if second != cached_second:
+        cached_date = datetime.fromtimestamp(second, MOSCOW_TZ).date()
+        _today_cache = (second, cached_date)
+    return cached_date
 
 def moscow_tomorrow() -> date:
     """Возвращает завтрашнюю дату по московскому времени"""
@@ -67,12 +94,14 @@ def get_relative_date_info() -> dict:
     """
     Возвращает информацию об относительных датах для GPT
     """
+    # Все значения выводятся из одного снимка времени
     moscow_time = moscow_now()
+    today = moscow_time.date()
     
     return {
         "current_moscow_time": moscow_time.strftime("%Y-%m-%d %H:%M"),
-        "current_date": moscow_today().strftime("%Y-%m-%d"),
-        "tomorrow_date": moscow_tomorrow().strftime("%Y-%m-%d"),
+        "current_date": today.isoformat(),
+        "tomorrow_date": (today + timedelta(days=1)).isoformat(),
         "current_weekday": moscow_time.strftime("%A"),
         "current_hour": moscow_time.hour,
         "timezone": "Europe/Moscow"
@@ -89,25 +118,17 @@ def parse_relative_date(relative_text: str, reference_time: Optional[datetime] =
     Returns:
         Дата в формате YYYY-MM-DD или None если не удалось распарсить
     """
+    offset = _RELATIVE_DAY_OFFSETS.get(relative_text.lower().strip())
+    if offset is None:
+        return None
+    
     if not reference_time:
         reference_time = moscow_now()
     elif reference_time.tzinfo is None:
         # Если время без часового пояса, считаем что это московское время
         reference_time = reference_time.replace(tzinfo=MOSCOW_TZ)
     
-    reference_date = reference_time.date()
-    relative_text_lower = relative_text.lower().strip()
-    
-    if relative_text_lower in ["сегодня", "today"]:
-        return reference_date.strftime("%Y-%m-%d")
-    elif relative_text_lower in ["завтра", "tomorrow"]:
-        return (reference_date + timedelta(days=1)).strftime("%Y-%m-%d")
-    elif relative_text_lower in ["послезавтра", "day after tomorrow"]:
-        return (reference_date + timedelta(days=2)).strftime("%Y-%m-%d")
-    elif relative_text_lower in ["вчера", "yesterday"]:
-        return (reference_date - timedelta(days=1)).strftime("%Y-%m-%d")
-    
-    return None
+    return (reference_time.date() + timedelta(days=offset)).isoformat()
 
 def format_moscow_time_for_user(dt: Optional[datetime] = None) -> str:
     """
@@ -139,6 +160,7 @@ def get_moscow_today():
     """Алиас для moscow_today()"""  
     return moscow_today()
 
+@lru_cache(maxsize=512)
 def format_date_for_notification(date_str: str) -> str:
     """
     Форматирует дату для уведомлений в формате "2 августа (суббота)"
@@ -150,27 +172,14 @@ def format_date_for_notification(date_str: str) -> str:
         Строка в формате "день месяц (день недели)"
     """
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        
-        # Названия месяцев на русском
-        month_names = {
-            1: "января", 2: "февраля", 3: "марта", 4: "апреля", 
-            5: "мая", 6: "июня", 7: "июля", 8: "августа",
-            9: "сентября", 10: "октября", 11: "ноября", 12: "декабря"
-        }
-        
-        # Названия дней недели на русском
-        weekday_names = {
-            0: "понедельник", 1: "вторник", 2: "среда", 3: "четверг",
-            4: "пятница", 5: "суббота", 6: "воскресенье"
-        }
-        
-        day = date_obj.day
-        month = month_names[date_obj.month]
-        weekday = weekday_names[date_obj.weekday()]
-        
-        return f"{day} {month} ({weekday})"
-        
-    except (ValueError, KeyError):
+        # strptime принимает и даты без ведущих нулей ("2025-7-5"); результат кэшируется
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
         # Если не удалось распарсить, возвращаем оригинальную строку
-        return date_str
\ No newline at end of file
+        return date_str
+    
+    day = date_obj.day
+    month = MONTHS_RU_GENITIVE[date_obj.month - 1]
+    weekday = _WEEKDAY_NAMES_RU[date_obj.weekday()]
+    
+    return f"{day} {month} ({weekday})"
\ No newline at end of file
@@ -3,21 +3,42 @@
 Рабочая версия бота с полным функционалом (без GPT для упрощения)
 """
 import asyncio
+import hmac
 import logging
 import os
 import json
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from telegram import ReplyKeyboardMarkup, Update, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
+from telegram.helpers import escape_markdown
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+try:
+    from cachetools import TTLCache
+except ImportError:  # cachetools не установлен — состояния хранятся в обычном словаре
+    TTLCache = None
+try:
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+except ImportError:  # SQLAlchemy не установлен — напоминания хранятся только в памяти
+    SQLAlchemyJobStore = None
+try:
+    import h2  # noqa: F401
+    TELEGRAM_HTTP_VERSION = "2"
+except ImportError:  # h2 не установлен — запросы к Bot API идут по HTTP/1.1
+    TELEGRAM_HTTP_VERSION = "1.1"
 from services.gpt_service import GPTService
 from bot.services.data_service import DataService
 from bot.handlers.admin_handlers import AdminHandlers
 from services.bug_reporter import bug_reporter
-from services.safe_data_manager import safe_data_manager
-from formatting_utils import format_date_for_user, format_slot_for_user, format_slots_list
-from bot_middleware import with_error_handling, with_rate_limiting, telegram_retry
+from services.safe_data_manager import get_safe_data_manager
+from services.backup_manager import loads_json, dump_json_bytes
+from utils import format_date_for_user, format_slot_for_user, format_slots_list, markdown_parse_mode, WEEKDAYS_RU
+from bot_middleware import with_error_handling, with_rate_limiting, telegram_retry, send_message_limited
 from secure_logger import setup_secure_logging, secure_log_user_action
 from health_check import init_health_checker
 from emergency_restore import emergency_restore
@@ -35,66 +56,265 @@ logger = logging.getLogger(__name__)
 from bot.constants import (
     MASTER_ROLE, CLIENT_ROLE, MY_SLOTS, ADD_SLOTS, MY_PROFILE, EDIT_PROFILE,
     VIEW_MASTERS, VIEW_DEVICES, VIEW_FREE_SLOTS, MY_BOOKINGS, 
-    BACK_TO_MENU, CHANGE_ROLE, REPORT_BUG, MY_VIBRO_CHAIR
+    BACK_TO_MENU, CHANGE_ROLE, REPORT_BUG, MY_VIBRO_CHAIR,
+    SYSTEM_BUTTONS, MASTER_CHOICE_ANSWERS, NEW_PROFILE_ANSWERS, NOT_ME_ANSWERS, ADMIN_ANSWERS,
+    ACTIVE_BOOKING_STATUSES, STATUS_ICONS, STATUS_TEXTS
 )
 
-# Хранилище состояний пользователей
-user_states = {}
+# Хранилище состояний пользователей: ограничено по размеру и времени жизни,
+# состояние неактивного пользователя через час сбрасывается
+USER_STATES_MAXSIZE = 10000
+USER_STATES_TTL_SEC = 3600
+user_states = TTLCache(maxsize=USER_STATES_MAXSIZE, ttl=USER_STATES_TTL_SEC) if TTLCache else {}
+
+# Инициализация планировщика для напоминаний.
+# Задачи хранятся в SQLite, чтобы запланированные напоминания переживали перезапуск бота.
+REMINDERS_DB_URL = os.getenv("REMINDERS_DB_URL", "sqlite:///data/reminders.sqlite")
+
+# Секрет webhook (secret_token в setWebhook): Telegram присылает его в заголовке каждого запроса
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+
+# Telegram ID владельца виброкресла (@fshubin), если известен заранее: тогда его не ищем в базе
+PHIL_TG_ID = os.getenv("PHIL_TG_ID") or None
+
+# Владельцы девайсов, которым приходят уведомления о новых записях (device_id -> @username)
+DEVICE_OWNER_HANDLES = {"vibro_chair": "@fshubin"}
+# Заранее известные telegram_id владельцев (device_id -> ID)
+DEVICE_OWNER_IDS = {"vibro_chair": PHIL_TG_ID}
+# Множества для проверки, является ли пользователь владельцем какого-либо девайса
+_DEVICE_OWNER_HANDLES_LOWER = frozenset(handle.lower() for handle in DEVICE_OWNER_HANDLES.values())
+_DEVICE_OWNER_ID_SET = frozenset(str(owner_id) for owner_id in DEVICE_OWNER_IDS.values() if owner_id)
+
+# Telegram ID админов для диагностических команд
+_ADMIN_IDS = frozenset({78273571})
+
+def create_scheduler() -> AsyncIOScheduler:
+    """Создает планировщик с постоянным хранилищем задач (если доступен SQLAlchemy)."""
+    job_defaults = {"misfire_grace_time": 3600, "coalesce": True}
+    if SQLAlchemyJobStore is None:
+        logger.warning("⚠️ SQLAlchemy не установлен, напоминания хранятся только в памяти")
+        return AsyncIOScheduler(job_defaults=job_defaults)
+    return AsyncIOScheduler(
+        jobstores={"default": SQLAlchemyJobStore(url=REMINDERS_DB_URL)},
+        job_defaults=job_defaults
+    )
+
+scheduler = create_scheduler()
+
+def start_scheduler() -> bool:
+    """Запускает планировщик один раз: второй экземпляр запуска отправлял бы каждое напоминание дважды."""
+    if scheduler.running:
+        logger.warning("⚠️ Планировщик уже запущен, повторный запуск пропущен")
+        return False
+    scheduler.start()
+    return True
 
-# Инициализация планировщика для напоминаний
-scheduler = AsyncIOScheduler()
 application_instance = None  # Будет установлен в main()
 health_checker = None  # Будет установлен в main()
+webhook_runner = None  # aiohttp AppRunner webhook-сервера (production)
+
+# Очередь входящих обновлений webhook: при переполнении отвечаем 429, и Telegram повторит позже
+UPDATE_QUEUE_MAXSIZE = 1000
+UPDATE_WORKERS = 4
+_update_queue = None  # Создается в start_simple_webhook_server() внутри работающего event loop
+_update_workers = []
+
+# Очередь исходящих напоминаний: задачи планировщика только ставят сообщения в очередь,
+# а несколько обработчиков отправляют их в Telegram
+SEND_QUEUE_MAXSIZE = 1000
+SEND_WORKERS = 3
+_send_queue = None  # Создается в start_send_workers() внутри работающего event loop
+_send_workers = []
+
+# Сколько сообщений со слотами мастера отправляем в Telegram одновременно
+SLOT_MESSAGES_CONCURRENCY = 5
 
 # Инициализация сервисов
 gpt_service = GPTService()
 data_service = DataService()
 admin_handlers = AdminHandlers(data_service)
 
+# Сколько запросов к GPT выполняем одновременно и сколько ждем ответа
+GPT_CONCURRENCY = 4
+GPT_TIMEOUT_SEC = 20
+_gpt_semaphore = None  # Создается при первом вызове внутри работающего event loop
+
+def _release_gpt_slot(future) -> None:
+    """Освобождает место в лимите GPT, когда поток с запросом действительно завершился."""
+    _gpt_semaphore.release()
+    # Ошибку запроса, который уже никто не ждет (таймаут), забираем, чтобы asyncio не ругался
+    if not future.cancelled():
+        future.exception()
+
+async def run_gpt(func, *args):
+    """
+    Выполняет синхронный вызов GPT в пуле потоков с ограничением параллелизма и таймаутом.
+    
+    Поток нельзя прервать, поэтому по таймауту вызывающий получает TimeoutError, а место
+    в лимите GPT_CONCURRENCY остается занятым, пока запрос в потоке не завершится.
+    """
+    global _gpt_semaphore
+    if _gpt_semaphore is None:
+        _gpt_semaphore = asyncio.Semaphore(GPT_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    await _gpt_semaphore.acquire()
+    try:
+        future = loop.run_in_executor(None, func, *args)
+    except BaseException:
+        _gpt_semaphore.release()
+        raise
+    future.add_done_callback(_release_gpt_slot)
+    # shield: таймаут отменяет только ожидание, а не future, за которым следит лимит
+    return await asyncio.wait_for(asyncio.shield(future), timeout=GPT_TIMEOUT_SEC)
+
 def get_user_state(user_id: str):
     """Получает состояние пользователя или создает новое."""
-    if user_id not in user_states:
-        user_states[user_id] = {"role": None, "awaiting": None}
-    return user_states[user_id]
+    user_state = user_states.get(user_id)
+    if user_state is None:
+        user_state = {"role": None, "awaiting": None}
+    # Повторная запись продлевает время жизни состояния активного пользователя
+    user_states[user_id] = user_state
+    return user_state
 
 def load_data():
-    """Загружает данные из JSON файла через безопасный менеджер."""
-    return safe_data_manager.get_data()
+    """Возвращает данные безопасного менеджера; измененный извне файл перечитывается при обращении."""
+    return get_safe_data_manager().get_data()
+
+def get_master_by_tid(telegram_id: str):
+    """Находит мастера по telegram_id через индекс безопасного менеджера."""
+    return get_safe_data_manager().get_master_by_tid(telegram_id)
+
+def get_device_by_id(device_id: str):
+    """Находит устройство по id через индекс безопасного менеджера."""
+    return get_safe_data_manager().get_device_by_id(device_id)
+
+def get_master_by_handle(handle: str):
+    """Возвращает мастера по telegram_handle или None."""
+    return get_safe_data_manager().get_master_by_handle(handle)
+
+def resolve_device_owner_id(device_id: str):
+    """Возвращает telegram_id владельца девайса или None, если владелец не задан или не найден."""
+    owner_id = DEVICE_OWNER_IDS.get(device_id)
+    if owner_id:
+        return owner_id
+    owner_handle = DEVICE_OWNER_HANDLES.get(device_id)
+    if not owner_handle:
+        return None
+    owner = get_master_by_handle(owner_handle)
+    return owner.get("telegram_id") if owner else None
+
+def get_confirmed_booking(master: dict, slot: dict):
+    """Возвращает подтвержденную запись на слот мастера или None."""
+    return get_safe_data_manager().get_confirmed_booking(master, slot['date'], slot['start_time'])
+
+def _manager_for_save(data):
+    """Возвращает менеджер для сохранения: пишутся его текущие данные, а не переданный data.
+
+    data может оказаться деревом, прочитанным до перечитывания файла; такое расхождение логируем.
+    """
+    manager = get_safe_data_manager()
+    if data is not manager.data:
+        logger.warning("Сохранение получило устаревшие данные; записываются текущие данные менеджера")
+    return manager
 
 def save_data(data, reason="update"):
     """Сохраняет данные через безопасный менеджер."""
-    safe_data_manager.data = data
-    return safe_data_manager.save_data(reason)
+    return _manager_for_save(data).save_data(reason)
+
+async def save_data_async(data, reason="update"):
+    """Сохраняет данные немедленно, но запись на диск выполняется в потоке, а не в event loop."""
+    return await _manager_for_save(data).save_data_async(reason)
+
+def mark_data_dirty(data, reason="update"):
+    """Отмечает изменение данных; серия изменений сохраняется на диск одной отложенной записью."""
+    return _manager_for_save(data).mark_dirty(reason)
+
+def slot_start_epoch(slot: dict):
+    """Возвращает начало слота в секундах эпохи (разбор кэшируется безопасным менеджером)."""
+    return get_safe_data_manager().slot_start_epoch(slot)
+
+def find_master_booking(master: dict, booking_ref: str):
+    """Находит запись мастера по id из callback_data; числовые ссылки старых кнопок — индекс в списке."""
+    booking = get_safe_data_manager().get_booking_by_id(booking_ref)
+    if booking is not None:
+        # Чужую запись по подобранному id не отдаем
+        return booking if booking.get("master_id") == master.get("telegram_id") else None
+    if booking_ref.isdigit():
+        bookings = master.get("bookings", [])
+        booking_index = int(booking_ref)
+        if booking_index < len(bookings):
+            return bookings[booking_index]
+    return None
+
+def booking_start_epoch(booking: dict):
+    """Возвращает начало записи в секундах эпохи из slot_start_ts; для старых записей вычисляет и сохраняет."""
+    start_ts = booking.get("slot_start_ts")
+    if start_ts is None:
+        try:
+            start_ts = datetime.strptime(
+                f"{booking['slot_date']} {booking['slot_start_time']}", "%Y-%m-%d %H:%M"
+            ).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return None
+        booking["slot_start_ts"] = start_ts
+    return start_ts
+
+# Клавиатуры неизменяемы, поэтому собираем их один раз при загрузке модуля
+MAIN_KEYBOARD = ReplyKeyboardMarkup([[MASTER_ROLE, CLIENT_ROLE]], resize_keyboard=True, one_time_keyboard=True)
+
+MASTER_KEYBOARD = ReplyKeyboardMarkup([
+    [MY_SLOTS, ADD_SLOTS],
+    [MY_PROFILE, EDIT_PROFILE],
+    [VIEW_MASTERS, VIEW_FREE_SLOTS],
+    [CHANGE_ROLE, REPORT_BUG]
+], resize_keyboard=True)
+
+CLIENT_KEYBOARD = ReplyKeyboardMarkup([
+    [VIEW_MASTERS, VIEW_DEVICES],
+    [VIEW_FREE_SLOTS, MY_BOOKINGS],
+    [CHANGE_ROLE, REPORT_BUG]
+], resize_keyboard=True)
+
+DEVICE_OWNER_KEYBOARD = ReplyKeyboardMarkup([
+    [MY_VIBRO_CHAIR, VIEW_DEVICES],
+    [VIEW_MASTERS, VIEW_FREE_SLOTS],
+    [MY_BOOKINGS, CHANGE_ROLE],
+    [REPORT_BUG]
+], resize_keyboard=True)
+
+BACK_TO_MASTERS_MARKUP = InlineKeyboardMarkup([[
+    InlineKeyboardButton("🔙 К списку мастеров", callback_data="back_to_masters")
+]])
+
+# Статичные ряды "Назад": кнопки неизменяемы, поэтому ряд можно добавлять в любую клавиатуру
+BACK_TO_CLIENT_ROW = (InlineKeyboardButton("⬅️ Назад", callback_data="back_to_client_menu"),)
+BACK_TO_DEVICE_MENU_ROW = (InlineKeyboardButton("⬅️ Назад", callback_data="back_to_device_menu"),)
+BACK_TO_DEVICES_LIST_ROW = (InlineKeyboardButton("⬅️ К списку девайсов", callback_data="devices_list"),)
+
+# Уведомление Филу о новой записи на виброкресло
+VIBRO_BOOKING_NOTICE_TEMPLATE = (
+    "🪑 **Новая запись на виброкресло!**\n\n"
+    "👤 **Клиент:** {guest}\n"
+    "📅 **Дата:** {date}\n"
+    "🕐 **Время:** {start}-{end}\n\n"
+    "📋 Для управления записями используй кнопку 'Мое виброкресло 🪑' в боте."
+)
 
 def get_main_keyboard():
     """Клавиатура выбора роли."""
-    return ReplyKeyboardMarkup([[MASTER_ROLE, CLIENT_ROLE]], resize_keyboard=True, one_time_keyboard=True)
+    return MAIN_KEYBOARD
 
 def get_master_keyboard():
     """Клавиатура для мастера."""
-    return ReplyKeyboardMarkup([
-        [MY_SLOTS, ADD_SLOTS],
-        [MY_PROFILE, EDIT_PROFILE],
-        [VIEW_MASTERS, VIEW_FREE_SLOTS],
-        [CHANGE_ROLE, REPORT_BUG]
-    ], resize_keyboard=True)
+    return MASTER_KEYBOARD
 
 def get_client_keyboard():
     """Клавиатура для гостя."""
-    return ReplyKeyboardMarkup([
-        [VIEW_MASTERS, VIEW_DEVICES],
-        [VIEW_FREE_SLOTS, MY_BOOKINGS],
-        [CHANGE_ROLE, REPORT_BUG]
-    ], resize_keyboard=True)
+    return CLIENT_KEYBOARD
 
 def get_device_owner_keyboard():
     """Клавиатура для владельца девайса (Фила)."""
-    return ReplyKeyboardMarkup([
-        [MY_VIBRO_CHAIR, VIEW_DEVICES],
-        [VIEW_MASTERS, VIEW_FREE_SLOTS],
-        [MY_BOOKINGS, CHANGE_ROLE],
-        [REPORT_BUG]
-    ], resize_keyboard=True)
+    return DEVICE_OWNER_KEYBOARD
 
 def generate_reminder_text(is_master: bool, master_name: str, client_name: str, slot_time: str, slot_location: str) -> str:
     """Генерирует текст напоминания в стиле заповедного осьминога."""
@@ -115,73 +335,140 @@ def generate_reminder_text(is_master: bool, master_name: str, client_name: str,
             f"Приготовься принять дары исцеления от заповедного целителя! 🐙💫"
         )
 
-async def send_reminder(user_id: str, reminder_text: str):
-    """Отправляет напоминание пользователю."""
+async def _deliver_reminder(user_id: str, reminder_text: str):
+    """Отправляет напоминание пользователю, выжидая RetryAfter от Telegram."""
     try:
         if application_instance:
-            await application_instance.bot.send_message(chat_id=user_id, text=reminder_text)
+            await send_message_limited(application_instance.bot, user_id, reminder_text)
             logger.info(f"Напоминание отправлено пользователю {user_id}")
     except Exception as e:
         logger.error(f"Ошибка отправки напоминания пользователю {user_id}: {e}")
 
-def schedule_single_reminder(booking_data: dict, reminder_time: datetime, reminder_type: str, is_equipment: bool = False):
-    """Планирует одно напоминание с персональным GPT-сообщением."""
+async def _sender_worker():
+    """Разбирает очередь напоминаний, сглаживая всплески одновременных задач планировщика."""
+    while True:
+        user_id, reminder_text = await _send_queue.get()
+        try:
+            await _deliver_reminder(user_id, reminder_text)
+        finally:
+            _send_queue.task_done()
+
+def start_send_workers():
+    """Создает очередь отправки и запускает обработчики в текущем event loop."""
+    global _send_queue
+    if _send_queue is not None:
+        return
+    _send_queue = asyncio.Queue(maxsize=SEND_QUEUE_MAXSIZE)
+    for _ in range(SEND_WORKERS):
+        _send_workers.append(asyncio.create_task(_sender_worker()))
+    logger.info(f"📨 Запущено обработчиков очереди отправки: {SEND_WORKERS}")
+
+async def stop_send_workers():
+    """Останавливает обработчики очереди отправки."""
+    global _send_queue
+    for task in _send_workers:
+        task.cancel()
+    await asyncio.gather(*_send_workers, return_exceptions=True)
+    _send_workers.clear()
+    _send_queue = None
+
+async def send_notification(bot, chat_id, text: str, **kwargs):
+    """Отправляет необязательное уведомление; ошибка только логируется (для запуска в фоне)."""
+    try:
+        await send_message_limited(bot, chat_id, text, **kwargs)
+    except Exception as e:
+        logger.error(f"Не удалось отправить уведомление пользователю {chat_id}: {e}")
+
+async def send_reminder(user_id: str, reminder_text: str):
+    """Ставит напоминание в очередь отправки (или отправляет сразу, если очередь не запущена)."""
+    if _send_queue is None:
+        await _deliver_reminder(user_id, reminder_text)
+        return
+    await _send_queue.put((user_id, reminder_text))
+
+async def send_reminder_pair(master_id: str, master_text: str, client_id: str, client_text: str):
+    """Отправляет напоминания мастеру и клиенту из одной задачи планировщика."""
+    await asyncio.gather(
+        send_reminder(master_id, master_text),
+        send_reminder(client_id, client_text)
+    )
+
+# Типы напоминаний и их смещение относительно начала сеанса
+REMINDER_OFFSETS = (
+    ("1_hour", timedelta(hours=1)),
+    ("15_min", timedelta(minutes=15)),
+)
+
+# Тексты GPT-напоминаний не детерминированы, поэтому храним их ограниченное время
+# (без cachetools кэш отключен и каждый текст генерируется заново)
+REMINDER_TEXTS_MAXSIZE = 512
+REMINDER_TEXTS_TTL_SEC = 3600
+_reminder_texts = TTLCache(maxsize=REMINDER_TEXTS_MAXSIZE, ttl=REMINDER_TEXTS_TTL_SEC) if TTLCache else None
+_reminder_texts_lock = threading.Lock()  # Кэш читается из потоков пула GPT
+
+def _cached_personalized_reminder(is_master: bool, master_name: str, client_name: str,
+                                  slot_time: str, slot_location: str, reminder_type: str) -> str:
+    """Запоминает GPT-напоминание на REMINDER_TEXTS_TTL_SEC, чтобы одинаковые запросы не уходили в API повторно."""
+    key = (is_master, master_name, client_name, slot_time, slot_location, reminder_type)
+    if _reminder_texts is not None:
+        with _reminder_texts_lock:
+            text = _reminder_texts.get(key)
+        if text is not None:
+            return text
+    
+    text = gpt_service.generate_personalized_reminder(
+        is_master=is_master,
+        master_name=master_name,
+        client_name=client_name,
+        slot_time=slot_time,
+        slot_location=slot_location,
+        reminder_type=reminder_type
+    )
+    if _reminder_texts is not None:
+        with _reminder_texts_lock:
+            _reminder_texts[key] = text
+    return text
+
+async def _gen_reminder_async(is_master: bool, booking_data: dict, reminder_type: str) -> str:
+    """Генерирует текст напоминания через GPT в пуле потоков, не блокируя event loop."""
+    return await run_gpt(
+        _cached_personalized_reminder,
+        is_master,
+        booking_data['master_name'],
+        booking_data['client_name'],
+        f"{booking_data['slot_start_time']}-{booking_data['slot_end_time']}",
+        booking_data.get('slot_location', 'Заповедник'),
+        reminder_type
+    )
+
+def schedule_single_reminder(booking_data: dict, reminder_time: datetime, reminder_type: str,
+                             reminder_texts: dict, is_equipment: bool = False):
+    """Планирует одно напоминание с заранее сгенерированными GPT-сообщениями."""
     try:
         booking_id = booking_data.get('id', 'unknown')
         
-        # Генерируем персональные напоминания через GPT
         if is_equipment:
             # Для оборудования только напоминание клиенту
-            client_reminder = gpt_service.generate_personalized_reminder(
-                is_master=False,
-                master_name=booking_data['master_name'],
-                client_name=booking_data['client_name'],
-                slot_time=f"{booking_data['slot_start_time']}-{booking_data['slot_end_time']}",
-                slot_location=booking_data.get('slot_location', 'Заповедник'),
-                reminder_type=reminder_type
-            )
-            
             scheduler.add_job(
                 send_reminder,
                 'date', 
                 run_date=reminder_time,
-                args=[booking_data['client_id'], client_reminder],
-                id=f"reminder_client_{booking_id}_{reminder_type}"
+                args=[booking_data['client_id'], reminder_texts[(reminder_type, False)]],
+                id=f"reminder_client_{booking_id}_{reminder_type}",
+                replace_existing=True
             )
         else:
-            # Для мастеров - напоминания обеим сторонам
-            master_reminder = gpt_service.generate_personalized_reminder(
-                is_master=True,
-                master_name=booking_data['master_name'],
-                client_name=booking_data['client_name'],
-                slot_time=f"{booking_data['slot_start_time']}-{booking_data['slot_end_time']}",
-                slot_location=booking_data.get('slot_location', 'Заповедник'),
-                reminder_type=reminder_type
-            )
-            
-            client_reminder = gpt_service.generate_personalized_reminder(
-                is_master=False,
-                master_name=booking_data['master_name'],
-                client_name=booking_data['client_name'],
-                slot_time=f"{booking_data['slot_start_time']}-{booking_data['slot_end_time']}",
-                slot_location=booking_data.get('slot_location', 'Заповедник'),
-                reminder_type=reminder_type
-            )
-            
+            # Для мастеров - одна задача, которая напоминает обеим сторонам
             scheduler.add_job(
-                send_reminder,
+                send_reminder_pair,
                 'date',
                 run_date=reminder_time,
-                args=[booking_data['master_id'], master_reminder],
-                id=f"reminder_master_{booking_id}_{reminder_type}"
-            )
-            
-            scheduler.add_job(
-                send_reminder,
-                'date', 
-                run_date=reminder_time,
-                args=[booking_data['client_id'], client_reminder],
-                id=f"reminder_client_{booking_id}_{reminder_type}"
+                args=[
+                    booking_data['master_id'], reminder_texts[(reminder_type, True)],
+                    booking_data['client_id'], reminder_texts[(reminder_type, False)]
+                ],
+                id=f"reminder_pair_{booking_id}_{reminder_type}",
+                replace_existing=True
             )
         
         logger.info(f"Напоминание {reminder_type} запланировано на {reminder_time} для {booking_id}")
@@ -189,26 +476,34 @@ def schedule_single_reminder(booking_data: dict, reminder_time: datetime, remind
     except Exception as e:
         logger.error(f"Ошибка планирования напоминания {reminder_type}: {e}")
 
-def schedule_reminder(booking_data: dict, is_equipment: bool = False):
+async def schedule_reminder(booking_data: dict, is_equipment: bool = False):
     """Планирует напоминания за 1 час и 15 минут до сеанса."""
     try:
-        # Парсим время сеанса
-        slot_datetime_str = f"{booking_data['slot_date']} {booking_data['slot_start_time']}"
-        slot_datetime = datetime.strptime(slot_datetime_str, "%Y-%m-%d %H:%M")
-        
-        # Вычисляем время напоминаний
-        reminder_1hour = slot_datetime - timedelta(hours=1)
-        reminder_15min = slot_datetime - timedelta(minutes=15)
+        # Время сеанса сохранено в записи при создании
+        start_ts = booking_start_epoch(booking_data)
+        if start_ts is None:
+            raise ValueError(f"некорректное время сеанса: {booking_data.get('slot_date')} {booking_data.get('slot_start_time')}")
+        slot_datetime = datetime.fromtimestamp(start_ts)
         
+        # Оставляем только напоминания, время которых ещё не прошло
         current_time = datetime.now()
+        due_reminders = [
+            (reminder_type, slot_datetime - offset)
+            for reminder_type, offset in REMINDER_OFFSETS
+            if slot_datetime - offset > current_time
+        ]
         
-        # Планируем напоминание за 1 час (если ещё не прошло)
-        if reminder_1hour > current_time:
-            schedule_single_reminder(booking_data, reminder_1hour, "1_hour", is_equipment)
+        # Все тексты (до 4 штук) генерируем одним параллельным пакетом
+        roles = (False,) if is_equipment else (True, False)
+        text_keys = [(reminder_type, is_master) for reminder_type, _ in due_reminders for is_master in roles]
+        texts = await asyncio.gather(*(
+            _gen_reminder_async(is_master, booking_data, reminder_type)
+            for reminder_type, is_master in text_keys
+        ))
+        reminder_texts = dict(zip(text_keys, texts))
         
-        # Планируем напоминание за 15 минут (если ещё не прошло)
-        if reminder_15min > current_time:
-            schedule_single_reminder(booking_data, reminder_15min, "15_min", is_equipment)
+        for reminder_type, reminder_time in due_reminders:
+            schedule_single_reminder(booking_data, reminder_time, reminder_type, reminder_texts, is_equipment)
         
         logger.info(f"Напоминания запланированы для бронирования {booking_data.get('id', 'unknown')}")
         
@@ -219,21 +514,24 @@ async def test_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     """Создает тестовое напоминание через 1 минуту для демонстрации."""
     user_id = str(update.effective_user.id)
     
+    # Одна отметка времени на весь тест: время слота и напоминания согласованы
+    now = datetime.now()
+    
     # Создаем тестовые данные
     test_booking = {
-        'booking_id': f'test_{user_id}_{datetime.now().timestamp()}',
+        'booking_id': f'test_{user_id}_{now.timestamp()}',
         'master_id': user_id,
         'client_id': user_id,
         'master_name': 'Мастер Ваня',
         'client_name': update.effective_user.first_name or 'Гость',
-        'date': datetime.now().strftime('%Y-%m-%d'),
-        'start_time': (datetime.now() + timedelta(minutes=1, seconds=15)).strftime('%H:%M'),
-        'end_time': (datetime.now() + timedelta(minutes=2, seconds=15)).strftime('%H:%M'),
+        'date': now.strftime('%Y-%m-%d'),
+        'start_time': (now + timedelta(minutes=1, seconds=15)).strftime('%H:%M'),
+        'end_time': (now + timedelta(minutes=2, seconds=15)).strftime('%H:%M'),
         'location': 'Тестовая локация'
     }
     
     # Планируем напоминание через 1 минуту
-    reminder_time = datetime.now() + timedelta(minutes=1)
+    reminder_time = now + timedelta(minutes=1)
     
     reminder_text = generate_reminder_text(
         is_master=True,
@@ -248,7 +546,8 @@ async def test_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         'date',
         run_date=reminder_time,
         args=[user_id, reminder_text],
-        id=f"test_reminder_{user_id}"
+        id=f"test_reminder_{user_id}",
+        replace_existing=True
     )
     
     await update.message.reply_text(
@@ -258,26 +557,14 @@ async def test_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
 async def show_slots_with_management(update: Update, context: ContextTypes.DEFAULT_TYPE, master: dict):
     """Показывает слоты мастера с кнопками управления."""
-    from datetime import datetime
-    
     all_slots = master.get("time_slots", [])
     
-    # Фильтруем только будущие слоты
-    now = datetime.now()
-    slots = []
-    for slot in all_slots:
-        slot_date = slot.get("date")
-        slot_start_time = slot.get("start_time")
-        
-        if not slot_date or not slot_start_time:
-            continue
-            
-        try:
-            slot_datetime = datetime.strptime(f"{slot_date} {slot_start_time}", "%Y-%m-%d %H:%M")
-            if slot_datetime > now:
-                slots.append(slot)
-        except ValueError:
-            continue
+    # Фильтруем только будущие слоты по заранее разобранному времени начала
+    now_ts = time.time()
+    slots = [
+        slot for slot in all_slots
+        if (start_ts := slot_start_epoch(slot)) is not None and start_ts > now_ts
+    ]
     
     if not slots:
         await update.message.reply_text(
@@ -287,6 +574,8 @@ async def show_slots_with_management(update: Update, context: ContextTypes.DEFAU
         )
         return
     
+    # Сначала готовим тексты и кнопки всех слотов (только вычисления)
+    prepared = []
     for i, slot in enumerate(slots):
         slot_text = (
             f"📅 **Слот {i+1}:**\n"
@@ -297,14 +586,7 @@ async def show_slots_with_management(update: Update, context: ContextTypes.DEFAU
         keyboard = []
         
         # Проверяем есть ли запись на этот слот
-        bookings = master.get("bookings", [])
-        slot_booking = None
-        for booking in bookings:
-            if (booking.get("slot_date") == slot['date'] and 
-                booking.get("slot_start_time") == slot['start_time'] and
-                booking.get("status") == "confirmed"):
-                slot_booking = booking
-                break
+        slot_booking = get_confirmed_booking(master, slot)
         
         if slot_booking:
             slot_text += f"👤 **Забронирован:** {slot_booking.get('client_name', 'Неизвестный')}\n"
@@ -319,8 +601,16 @@ async def show_slots_with_management(update: Update, context: ContextTypes.DEFAU
                 InlineKeyboardButton("✏️ Изменить время", callback_data=f"edit_slot_{i}")
             ])
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(slot_text, parse_mode='Markdown', reply_markup=reply_markup)
+        prepared.append((slot_text, InlineKeyboardMarkup(keyboard)))
+    
+    # Затем отправляем сообщения параллельно, ограничивая число одновременных запросов
+    semaphore = asyncio.Semaphore(SLOT_MESSAGES_CONCURRENCY)
+    
+    async def send_slot_message(slot_text, reply_markup):
+        async with semaphore:
+            await telegram_retry(update.message.reply_text, slot_text, parse_mode='Markdown', reply_markup=reply_markup)
+    
+    await asyncio.gather(*(send_slot_message(text, markup) for text, markup in prepared))
 
 async def edit_profile_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Запрашивает новое описание профиля мастера."""
@@ -346,8 +636,8 @@ async def process_add_slots(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.message.reply_text("🤔 Осьминог размышляет над твоими словами...")
     
     try:
-        # Используем GPT для парсинга слотов
-        new_slots = gpt_service.parse_time_slots(slots_text)
+        # Используем GPT для парсинга слотов (в пуле потоков, чтобы не блокировать event loop)
+        new_slots = await run_gpt(gpt_service.parse_time_slots, slots_text)
         
         if not new_slots:
             await update.message.reply_text(
@@ -360,15 +650,8 @@ async def process_add_slots(update: Update, context: ContextTypes.DEFAULT_TYPE)
             user_states[user_id] = {"role": "master", "awaiting": None}
             return
         
-        # Загружаем данные и находим мастера
-        data = load_data()
-        master = None
-        for m in data.get("masters", []):
-            if m.get("telegram_id") == user_id:
-                master = m
-                break
-        
-        if not master:
+        # Добавляем слоты мастеру; запись на диск откладывается и объединяется с соседними
+        if not get_safe_data_manager().append_slots(user_id, new_slots):
             await update.message.reply_text(
                 "Ошибка: профиль мастера не найден.", 
                 reply_markup=get_master_keyboard()
@@ -376,15 +659,6 @@ async def process_add_slots(update: Update, context: ContextTypes.DEFAULT_TYPE)
             user_states[user_id] = {"role": "master", "awaiting": None}
             return
         
-        # Добавляем новые слоты
-        if "time_slots" not in master:
-            master["time_slots"] = []
-        
-        master["time_slots"].extend(new_slots)
-        
-        # Сохраняем данные
-        save_data(data)
-        
         # Формируем ответ с красивым отображением
         formatted_slots = []
         for slot in new_slots:
@@ -422,36 +696,36 @@ async def process_decline_reason(update: Update, context: ContextTypes.DEFAULT_T
     user_state = get_user_state(user_id)
     reason = update.message.text
     
-    # Извлекаем индекс бронирования
+    # Извлекаем id бронирования
     awaiting = user_state.get("awaiting", "")
-    booking_index = int(awaiting.split("_")[2])
+    booking_ref = awaiting[len("decline_reason_"):]
     
     data = load_data()
-    master = None
-    for m in data.get("masters", []):
-        if m.get("telegram_id") == user_id:
-            master = m
-            break
+    master = get_master_by_tid(user_id)
     
     if not master:
         await update.message.reply_text("Ошибка: мастер не найден.", reply_markup=get_master_keyboard())
         user_states[user_id] = {"role": "master", "awaiting": None}
         return
     
-    bookings = master.get("bookings", [])
-    if booking_index >= len(bookings):
+    booking = find_master_booking(master, booking_ref)
+    if booking is None:
         await update.message.reply_text("Ошибка: запись не найдена.", reply_markup=get_master_keyboard())
         user_states[user_id] = {"role": "master", "awaiting": None}
         return
     
-    booking = bookings[booking_index]
+    if booking.get("status") != "pending":
+        await update.message.reply_text("Эта запись уже обработана.", reply_markup=get_master_keyboard())
+        user_states[user_id] = {"role": "master", "awaiting": None}
+        return
+    
     client_id = booking.get("client_id")
     client_name = booking.get("client_name", "Гость")
     
     # Отклоняем запись
     booking["status"] = "declined"
     booking["decline_reason"] = reason
-    save_data(data)
+    mark_data_dirty(data)
     
     slot_text = f"{format_date_for_user(booking.get('slot_date', ''))} с {booking.get('slot_start_time')} до {booking.get('slot_end_time')}"
     
@@ -474,10 +748,11 @@ async def process_decline_reason(update: Update, context: ContextTypes.DEFAULT_T
             f"Не расстраивайся! В заповеднике много других мастеров ждут тебя 🌊"
         )
         
-        await application_instance.bot.send_message(
-            chat_id=client_id,
-            text=decline_message,
-            parse_mode='Markdown'
+        await send_message_limited(
+            application_instance.bot,
+            client_id,
+            decline_message,
+            parse_mode=markdown_parse_mode(decline_message)
         )
         
     except Exception as e:
@@ -495,7 +770,9 @@ async def process_new_profile(update: Update, context: ContextTypes.DEFAULT_TYPE
     master_name = update.effective_user.first_name or "Мастер"
     
     try:
-        extracted_data, new_fantasy_description = gpt_service.process_master_profile(new_profile_text)
+        extracted_data, new_fantasy_description = await run_gpt(
+            gpt_service.process_master_profile, new_profile_text
+        )
         
         # Обновляем имя, если GPT извлек его из профиля
         if extracted_data.get("name"):
@@ -514,26 +791,27 @@ async def process_new_profile(update: Update, context: ContextTypes.DEFAULT_TYPE
     data = load_data()
     
     # Находим и обновляем мастера
-    for master in data.get("masters", []):
-        if master.get("telegram_id") == user_id:
-            master["original_description"] = new_profile_text
-            master["fantasy_description"] = new_fantasy_description
-            master["name"] = master_name
-            # Обновляем услуги и слоты если GPT их извлек
-            if extracted_data.get("services"):
-                master["services"] = extracted_data["services"]
-            if extracted_data.get("time_slots"):
-                # Добавляем новые слоты к существующим
-                existing_slots = master.get("time_slots", [])
-                for new_slot in extracted_data["time_slots"]:
-                    # Проверяем, нет ли уже такого слота
-                    if not any(s["date"] == new_slot["date"] and s["start_time"] == new_slot["start_time"] 
-                              for s in existing_slots):
-                        existing_slots.append(new_slot)
-                master["time_slots"] = existing_slots
-            break
-    
-    save_data(data)
+    master = get_master_by_tid(user_id)
+    if master:
+        master["original_description"] = new_profile_text
+        master["fantasy_description"] = new_fantasy_description
+        master["name"] = master_name
+        # Обновляем услуги и слоты если GPT их извлек
+        if extracted_data.get("services"):
+            master["services"] = extracted_data["services"]
+        if extracted_data.get("time_slots"):
+            # Добавляем новые слоты к существующим
+            existing_slots = master.get("time_slots", [])
+            existing_keys = {(s["date"], s["start_time"]) for s in existing_slots}
+            for new_slot in extracted_data["time_slots"]:
+                # Проверяем, нет ли уже такого слота
+                key = (new_slot["date"], new_slot["start_time"])
+                if key not in existing_keys:
+                    existing_slots.append(new_slot)
+                    existing_keys.add(key)
+            master["time_slots"] = existing_slots
+    
+    mark_data_dirty(data)
     
     await update.message.reply_text(
         f"✨ Профиль обновлен, {master_name}!\n\n"
@@ -547,6 +825,197 @@ async def process_new_profile(update: Update, context: ContextTypes.DEFAULT_TYPE
     user_state = get_user_state(user_id)
     user_state["awaiting"] = None
 
+# === ОБРАБОТЧИКИ INLINE КНОПОК ===
+# Каждый обработчик получает update, context и payload — часть callback_data после префикса
+# (для точных совпадений payload — вся строка callback_data).
+
+# device_id может содержать "_", поэтому дату и время отделяем с конца строки
+_DEVICE_SLOTS_RE = re.compile(r"(.+)_(\d{4}-\d{2}-\d{2})")
+_CONFIRM_DEVICE_BOOKING_RE = re.compile(r"(.+)_(\d{4}-\d{2}-\d{2})_(\d{1,2}:\d{2})")
+
+async def _on_select_master(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_master_details(update, context, payload)
+
+async def _on_book_slot(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # book_slot_<master_id>_<index>: индекс всегда последний
+    master_id, _, slot_index = payload.rpartition("_")
+    await process_booking_request(update, context, master_id, slot_index)
+
+async def _on_back_to_masters(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_masters_list(update, context)
+
+async def _on_back_to_client_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    query = update.callback_query
+    user_id = str(query.from_user.id)
+    user_states[user_id] = {"role": "client", "awaiting": None}
+    await query.edit_message_text("🌊 Главное меню гостя:", reply_markup=get_client_keyboard())
+
+async def _on_slots_date(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_slots_by_date(update, context, payload)
+
+async def _on_slots_custom_date(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await update.callback_query.edit_message_text(
+        "📅 **Выбор даты**\n\n"
+        "Введи дату в формате ДД.ММ.ГГГГ\n"
+        "Например: 15.01.2025\n\n"
+        "Или используй кнопки выше для быстрого выбора.",
+        reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton("⬅️ Назад к датам", callback_data="slots_menu")]
+        ]),
+        parse_mode='Markdown'
+    )
+
+async def _on_slots_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_free_slots_menu(update, context)
+
+async def _on_book_time(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # book_time_<master_id>_<HH:MM>_<YYYY-MM-DD>: время и дата всегда в конце
+    master_id, slot_time, slot_date = payload.rsplit("_", 2)
+    await process_time_booking_request(update, context, master_id, slot_time, slot_date)
+
+async def _on_my_bookings(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_client_bookings(update, context)
+
+async def _on_device_info(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_device_details(update, context, payload)
+
+async def _on_devices_list(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_devices_list(update, context)
+
+async def _on_book_device(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await show_device_booking_slots(update, context, payload)
+
+async def _on_device_slots(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # device_slots_vibro_chair_2025-08-02 -> ("vibro_chair", "2025-08-02")
+    match = _DEVICE_SLOTS_RE.fullmatch(payload)
+    if not match:
+        logger.warning(f"Некорректный callback device_slots_: {payload}")
+        return
+    device_id, date_str = match.groups()
+    await show_device_day_slots(update, context, device_id, date_str)
+
+async def _on_confirm_device_booking(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # confirm_device_booking_vibro_chair_2025-08-02_09:00 -> ("vibro_chair", "2025-08-02", "09:00")
+    match = _CONFIRM_DEVICE_BOOKING_RE.fullmatch(payload)
+    if not match:
+        logger.warning(f"Некорректный callback confirm_device_booking_: {payload}")
+        return
+    device_id, date_str, start_time = match.groups()
+    await process_device_booking(update, context, device_id, date_str, start_time)
+
+async def _on_booking_response(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # Подтверждение/отклонение записи мастером
+    await handle_booking_response(update, context, update.callback_query.data)
+
+async def _get_callback_master(query):
+    """Находит мастера, нажавшего кнопку управления слотом, или сообщает об ошибке."""
+    master = get_master_by_tid(str(query.from_user.id))
+    if not master:
+        await query.edit_message_text("❌ Ошибка: профиль мастера не найден.")
+    return master
+
+async def _on_delete_slot(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    query = update.callback_query
+    master = await _get_callback_master(query)
+    if master:
+        await delete_slot(query, master, int(payload), load_data())
+
+async def _on_cancel_booking(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    query = update.callback_query
+    master = await _get_callback_master(query)
+    if master:
+        await cancel_booking(query, master, int(payload), load_data())
+
+async def _on_edit_slot(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    query = update.callback_query
+    master = await _get_callback_master(query)
+    if master:
+        await edit_slot_request(query, master, int(payload))
+
+async def _on_bug_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await update.callback_query.edit_message_text("❌ Отменено. Если возникнут проблемы, используй /bug")
+
+async def _on_bug_type(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # bug_critical -> critical, bug_problem -> problem и т.д.
+    await bug_reporter.handle_bug_type_selection(update, context, payload[len("bug_"):])
+
+async def _on_bug_my_reports(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    # Временная заглушка - показываем что функция не готова
+    await update.callback_query.edit_message_text(
+        "📋 **Мои отчеты**\n\n"
+        "⚠️ Функция в разработке\n\n"
+        "Пока все отчеты отправляются напрямую админу для быстрого реагирования.\n"
+        "Система истории отчетов будет добавлена в следующих версиях.",
+        reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton("⬅️ Назад", callback_data="bug_cancel")]
+        ]),
+        parse_mode='Markdown'
+    )
+
+async def _on_cancel_vibro(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    await handle_vibro_booking_cancel(update, context, payload)
+
+async def _on_back_to_device_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, payload: str):
+    query = update.callback_query
+    user_id = str(query.from_user.id)
+    user_state = user_states.get(user_id, {})
+    
+    if user_state.get("is_device_owner"):
+        await query.edit_message_text(
+            "🪑 **Меню владельца виброкресла**\n\n"
+            "Выбери действие:",
+            reply_markup=get_device_owner_keyboard()
+        )
+    else:
+        await query.edit_message_text(
+            "🌊 Главное меню гостя:",
+            reply_markup=get_client_keyboard()
+        )
+
+# Кнопки с фиксированным callback_data
+_CB_EXACT_HANDLERS = {
+    "back_to_masters": _on_back_to_masters,
+    "back_to_client_menu": _on_back_to_client_menu,
+    "slots_custom_date": _on_slots_custom_date,
+    "slots_menu": _on_slots_menu,
+    "my_bookings": _on_my_bookings,
+    "devices_list": _on_devices_list,
+    "bug_cancel": _on_bug_cancel,
+    "bug_critical": _on_bug_type,
+    "bug_normal": _on_bug_type,
+    "bug_suggestion": _on_bug_type,
+    "bug_problem": _on_bug_type,
+    "bug_my_reports": _on_bug_my_reports,
+    "back_to_device_menu": _on_back_to_device_menu,
+}
+
+# Кнопки с параметрами: первое слово callback_data -> (префикс, обработчик).
+# Внутри группы более длинные префиксы идут первыми.
+_CB_PREFIX_HANDLERS = {
+    "select": (("select_master_", _on_select_master),),
+    "book": (
+        ("book_slot_", _on_book_slot),
+        ("book_time_", _on_book_time),
+        ("book_device_", _on_book_device),
+    ),
+    "slots": (("slots_date_", _on_slots_date),),
+    "device": (
+        ("device_info_", _on_device_info),
+        ("device_slots_", _on_device_slots),
+    ),
+    "confirm": (
+        ("confirm_device_booking_", _on_confirm_device_booking),
+        ("confirm_booking_", _on_booking_response),
+    ),
+    "decline": (("decline_booking_", _on_booking_response),),
+    "delete": (("delete_slot_", _on_delete_slot),),
+    "cancel": (
+        ("cancel_booking_", _on_cancel_booking),
+        ("cancel_vibro_", _on_cancel_vibro),
+    ),
+    "edit": (("edit_slot_", _on_edit_slot),),
+}
+
 @with_rate_limiting
 @with_error_handling
 async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -559,223 +1028,62 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
     # Логируем callback действие
     secure_log_user_action(logger, update.effective_user.id, "callback_query", callback_data=callback_data)
     
-    # Обработка кнопок для клиентов
-    if callback_data.startswith("select_master_"):
-        master_id = callback_data.split("_", 2)[2]
-        await show_master_details(update, context, master_id)
-        return
-    
-    elif callback_data.startswith("book_slot_"):
-        parts = callback_data.split("_")
-        master_id = parts[2]
-        slot_index = parts[3]
-        await process_booking_request(update, context, master_id, slot_index)
-        return
-    
-    elif callback_data == "back_to_masters":
-        await show_masters_list(update, context)
-        return
-    
-    elif callback_data == "back_to_client_menu":
-        user_id = str(query.from_user.id)
-        user_states[user_id] = {"role": "client", "awaiting": None}
-        await query.edit_message_text("🌊 Главное меню гостя:", reply_markup=get_client_keyboard())
-        return
-    
-    # Обработка просмотра слотов по времени
-    elif callback_data.startswith("slots_date_"):
-        selected_date = callback_data.split("_", 2)[2]
-        await show_slots_by_date(update, context, selected_date)
-        return
-    
-    elif callback_data == "slots_custom_date":
-        await query.edit_message_text(
-            "📅 **Выбор даты**\n\n"
-            "Введи дату в формате ДД.ММ.ГГГГ\n"
-            "Например: 15.01.2025\n\n"
-            "Или используй кнопки выше для быстрого выбора.",
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("⬅️ Назад к датам", callback_data="slots_menu")]
-            ]),
-            parse_mode='Markdown'
-        )
-        return
-    
-    elif callback_data == "slots_menu":
-        await show_free_slots_menu(update, context)
-        return
-    
-    elif callback_data.startswith("book_time_"):
-        parts = callback_data.split("_")
-        master_id = parts[2]
-        slot_time = parts[3]
-        slot_date = parts[4]
-        await process_time_booking_request(update, context, master_id, slot_time, slot_date)
-        return
-    
-    elif callback_data == "my_bookings":
-        await show_client_bookings(update, context)
-        return
-    
-    # Обработка девайсов
-    elif callback_data.startswith("device_info_"):
-        device_id = callback_data.split("_", 2)[2]
-        await show_device_details(update, context, device_id)
-        return
-    
-    elif callback_data == "devices_list":
-        await show_devices_list(update, context)
-        return
-    
-    elif callback_data.startswith("book_device_"):
-        device_id = callback_data.split("_", 2)[2]
-        await show_device_booking_slots(update, context, device_id)
-        return
-    
-    elif callback_data.startswith("device_slots_"):
-        # Правильно парсим device_slots_vibro_chair_2025-08-02
-        # Используем split с ограничением, чтобы корректно извлечь device_id и дату
-        prefix = "device_slots_"
-        remainder = callback_data[len(prefix):]
-        # Дата всегда в конце в формате YYYY-MM-DD, найдем её
-        parts = remainder.rsplit("_", 1)  # Разделяем справа на 2 части
-        device_id = parts[0]  # vibro_chair
-        date_str = parts[1]   # 2025-08-02
-        await show_device_day_slots(update, context, device_id, date_str)
-        return
-    
-    elif callback_data.startswith("confirm_device_booking_"):
-        # Правильно парсим confirm_device_booking_vibro_chair_2025-08-02_09:00
-        prefix = "confirm_device_booking_"
-        remainder = callback_data[len(prefix):]
-        # Время всегда в конце в формате HH:MM, найдем его
-        parts = remainder.rsplit("_", 1)  # Разделяем справа на 2 части: "vibro_chair_2025-08-02" и "09:00"
-        start_time = parts[1]  # 09:00
-        date_and_device = parts[0]  # vibro_chair_2025-08-02
-        # Теперь разделяем дату и device_id
-        date_parts = date_and_device.rsplit("_", 1)  # Разделяем справа: "vibro_chair" и "2025-08-02"
-        device_id = date_parts[0]  # vibro_chair
-        date_str = date_parts[1]   # 2025-08-02
-        await process_device_booking(update, context, device_id, date_str, start_time)
-        return
-    
-    # Обработка подтверждения/отклонения записей мастерами
-    elif callback_data.startswith("confirm_booking_") or callback_data.startswith("decline_booking_"):
-        await handle_booking_response(update, context, callback_data)
-        return
-    
-    # Обработка кнопок управления слотами мастеров
-    user_id = str(query.from_user.id)
-    data = load_data()
-    
-    # Находим мастера
-    master = None
-    for m in data.get("masters", []):
-        if m.get("telegram_id") == user_id:
-            master = m
-            break
-    
-    if not master:
-        await query.edit_message_text("❌ Ошибка: профиль мастера не найден.")
+    handler = _CB_EXACT_HANDLERS.get(callback_data)
+    if handler:
+        await handler(update, context, callback_data)
         return
     
-    if callback_data.startswith("delete_slot_"):
-        slot_index = int(callback_data.split("_")[-1])
-        await delete_slot(query, master, slot_index, data)
-    
-    elif callback_data.startswith("cancel_booking_"):
-        slot_index = int(callback_data.split("_")[-1])
-        await cancel_booking(query, master, slot_index, data)
-    
-    elif callback_data.startswith("edit_slot_"):
-        slot_index = int(callback_data.split("_")[-1])
-        await edit_slot_request(query, master, slot_index)
-    
-    # Обработка багрепортов
-    elif callback_data.startswith("bug_"):
-        if callback_data == "bug_cancel":
-            await query.edit_message_text("❌ Отменено. Если возникнут проблемы, используй /bug")
-        elif callback_data in ["bug_critical", "bug_normal", "bug_suggestion", "bug_problem"]:
-            bug_type = callback_data.split("_")[1] if callback_data != "bug_problem" else "problem"
-            await bug_reporter.handle_bug_type_selection(update, context, bug_type)
-        elif callback_data == "bug_my_reports":
-            # Временная заглушка - показываем что функция не готова
-            await query.edit_message_text(
-                "📋 **Мои отчеты**\n\n"
-                "⚠️ Функция в разработке\n\n"
-                "Пока все отчеты отправляются напрямую админу для быстрого реагирования.\n"
-                "Система истории отчетов будет добавлена в следующих версиях.",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("⬅️ Назад", callback_data="bug_cancel")]
-                ]),
-                parse_mode='Markdown'
-            )
-    
-    # Обработка отмены записей на виброкресло
-    elif callback_data.startswith("cancel_vibro_"):
-        booking_id = callback_data.replace("cancel_vibro_", "")
-        await handle_vibro_booking_cancel(update, context, booking_id)
-        return
+    for prefix, handler in _CB_PREFIX_HANDLERS.get(callback_data.partition("_")[0], ()):
+        if callback_data.startswith(prefix):
+            await handler(update, context, callback_data[len(prefix):])
+            return
     
-    # Обработка возврата в меню владельца девайса
-    elif callback_data == "back_to_device_menu":
-        user_id = str(query.from_user.id)
-        user_state = user_states.get(user_id, {})
-        
-        if user_state.get("is_device_owner"):
-            await query.edit_message_text(
-                "🪑 **Меню владельца виброкресла**\n\n"
-                "Выбери действие:",
-                reply_markup=get_device_owner_keyboard()
-            )
-        else:
-            await query.edit_message_text(
-                "🌊 Главное меню гостя:",
-                reply_markup=get_client_keyboard()
-            )
-        return
+    logger.warning(f"Неизвестный callback: {callback_data}")
 
 async def handle_booking_response(update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str) -> None:
     """Обрабатывает подтверждение или отклонение записи мастером."""
     query = update.callback_query
     user_id = str(query.from_user.id)
     
-    # Определяем действие и индекс бронирования
+    # Определяем действие и id бронирования
     if callback_data.startswith("confirm_booking_"):
         action = "confirm"
-        booking_index = int(callback_data.split("_")[2])
+        booking_ref = callback_data[len("confirm_booking_"):]
     elif callback_data.startswith("decline_booking_"):
         action = "decline"
-        booking_index = int(callback_data.split("_")[2])
+        booking_ref = callback_data[len("decline_booking_"):]
     else:
         await query.edit_message_text("Неизвестная команда.")
         return
     
     data = load_data()
-    master = None
-    for m in data.get("masters", []):
-        if m.get("telegram_id") == user_id:
-            master = m
-            break
+    master = get_master_by_tid(user_id)
     
     if not master:
         await query.edit_message_text("Мастер не найден.")
         return
     
-    bookings = master.get("bookings", [])
-    if booking_index >= len(bookings):
+    booking = find_master_booking(master, booking_ref)
+    if booking is None:
         await query.edit_message_text("Запись не найдена.")
         return
     
-    booking = bookings[booking_index]
+    # Повторное нажатие или старая кнопка: запись уже подтверждена/отклонена
+    if booking.get("status") != "pending":
+        await query.edit_message_text("Эта запись уже обработана.")
+        return
+    
     client_id = booking.get("client_id")
     client_name = booking.get("client_name", "Гость")
-    slot_text = f"{format_date_for_user(booking.get('slot_date', ''))} с {booking.get('slot_start_time')} до {booking.get('slot_end_time')}"
+    master_name = master.get("name")
+    slot_date = booking.get("slot_date", "")
+    slot_start_time = booking.get("slot_start_time")
+    slot_text = f"{format_date_for_user(slot_date)} с {slot_start_time} до {booking.get('slot_end_time')}"
     
     if action == "confirm":
         # Подтверждаем запись
         booking["status"] = "confirmed"
-        save_data(data)
+        mark_data_dirty(data)
         
         await query.edit_message_text(
             f"✅ Запись подтверждена!\n\n"
@@ -788,38 +1096,38 @@ async def handle_booking_response(update: Update, context: ContextTypes.DEFAULT_
         try:
             confirmation_message = (
                 f"✅ **Запись подтверждена!**\n\n"
-                f"🐙 Мастер: {master.get('name')}\n"
+                f"🐙 Мастер: {master_name}\n"
                 f"📅 Время: {slot_text}\n"
                 f"📍 Место: {booking.get('location', 'Заповедник')}\n\n"
                 f"Осьминог ждёт тебя! Приходи вовремя 🌊✨"
             )
             
-            await application_instance.bot.send_message(
-                chat_id=client_id,
-                text=confirmation_message,
-                parse_mode='Markdown'
+            await send_message_limited(
+                application_instance.bot,
+                client_id,
+                confirmation_message,
+                parse_mode=markdown_parse_mode(confirmation_message)
             )
             
-            # Устанавливаем напоминание за 15 минут до сеанса
-            slot_datetime = datetime.fromisoformat(f"{booking.get('slot_date')} {booking.get('slot_start_time')}:00")
-            reminder_time = slot_datetime - timedelta(minutes=15)
+            # Устанавливаем напоминание за 15 минут до сеанса (время начала сохранено при создании записи)
+            start_ts = booking_start_epoch(booking)
+            reminder_time = datetime.fromtimestamp(start_ts) - timedelta(minutes=15) if start_ts is not None else None
             
-            if reminder_time > datetime.now():
+            if reminder_time and reminder_time > datetime.now():
+                # Одна задача напоминает и мастеру, и клиенту
                 scheduler.add_job(
-                    send_reminder,
+                    send_reminder_pair,
                     'date',
                     run_date=reminder_time,
-                    args=[client_id, f"⏰ Напоминание: через 15 минут у тебя сеанс с {master.get('name')}!"],
-                    id=f"reminder_client_{client_id}_{booking_index}"
-                )
-                
-                # Напоминание мастеру
-                scheduler.add_job(
-                    send_reminder,
-                    'date',
-                    run_date=reminder_time,
-                    args=[user_id, f"⏰ Напоминание: через 15 минут у тебя сеанс с {client_name}!"],
-                    id=f"reminder_master_{user_id}_{booking_index}"
+                    args=[
+                        user_id, f"⏰ Напоминание: через 15 минут у тебя сеанс с {client_name}!",
+                        client_id, f"⏰ Напоминание: через 15 минут у тебя сеанс с {master_name}!"
+                    ],
+                    # Ключ по самой записи, а не по индексу: индексы сдвигаются после удаления записей
+                    id=f"reminder_pair_{user_id}_{client_id}_{slot_date}_{slot_start_time}",
+                    replace_existing=True,
+                    # Опоздавшее больше чем на 15 минут напоминание уже после начала сеанса
+                    misfire_grace_time=15 * 60
                 )
             
         except Exception as e:
@@ -827,7 +1135,7 @@ async def handle_booking_response(update: Update, context: ContextTypes.DEFAULT_
     
     elif action == "decline":
         # Запрашиваем причину отклонения
-        user_states[user_id] = {"role": "master", "awaiting": f"decline_reason_{booking_index}"}
+        user_states[user_id] = {"role": "master", "awaiting": f"decline_reason_{booking_ref}"}
         
         await query.edit_message_text(
             f"❌ Укажи причину отклонения записи для гостя {client_name}:\n"
@@ -845,44 +1153,56 @@ async def delete_slot(query, master: dict, slot_index: int, data: dict):
     
     slot = slots[slot_index]
     
-    # Проверяем есть ли бронирование
+    # Все активные записи на слот: подтвержденная и ожидающие подтверждения
     bookings = master.get("bookings", [])
-    slot_booking = None
-    for booking in bookings:
-        if (booking.get("slot_date") == slot['date'] and 
-            booking.get("slot_start_time") == slot['start_time'] and
-            booking.get("status") == "confirmed"):
-            slot_booking = booking
-            break
+    slot_bookings = [
+        booking for booking in bookings
+        if booking.get("slot_date") == slot['date']
+        and booking.get("slot_start_time") == slot['start_time']
+        and booking.get("status") in ACTIVE_BOOKING_STATUSES
+    ]
     
-    if slot_booking:
-        # Уведомляем клиента об отмене
-        client_id = slot_booking.get("client_id")
-        if client_id:
-            cancel_message = generate_cancellation_message(
-                master["name"], 
-                slot_booking.get("client_name", "Гость"),
-                f"{slot['date']} с {slot['start_time']} до {slot['end_time']}",
+    if slot_bookings:
+        # Уведомляем всех клиентов об отмене параллельно
+        slot_time = f"{slot['date']} с {slot['start_time']} до {slot['end_time']}"
+        notifications = [
+            (booking["client_id"], generate_cancellation_message(
+                master["name"],
+                booking.get("client_name", "Гость"),
+                slot_time,
                 slot.get('location', 'заповедник'),
                 "Мастер удалил этот слот"
+            ))
+            for booking in slot_bookings if booking.get("client_id")
+        ]
+        
+        if application_instance and notifications:
+            results = await asyncio.gather(
+                *(send_message_limited(application_instance.bot, client_id, message)
+                  for client_id, message in notifications),
+                return_exceptions=True
             )
-            
-            try:
-                if application_instance:
-                    await application_instance.bot.send_message(chat_id=client_id, text=cancel_message)
-            except Exception as e:
-                logger.error(f"Ошибка отправки уведомления клиенту {client_id}: {e}")
+            for (client_id, _), result in zip(notifications, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Ошибка отправки уведомления клиенту {client_id}: {result}")
         
-        # Удаляем бронирование
-        master["bookings"] = [b for b in bookings if b != slot_booking]
+        # Удаляем бронирования на месте (сравнение по identity, без сравнения словарей)
+        removed_ids = {id(booking) for booking in slot_bookings}
+        bookings[:] = [b for b in bookings if id(b) not in removed_ids]
     
     # Удаляем слот
     master["time_slots"].pop(slot_index)
-    save_data(data)
+    mark_data_dirty(data)
+    
+    notified_text = ""
+    if len(slot_bookings) == 1:
+        notified_text = "Клиент уведомлен об отмене."
+    elif slot_bookings:
+        notified_text = "Клиенты уведомлены об отмене."
     
     await query.edit_message_text(
         f"✅ Слот удален: {slot['date']} с {slot['start_time']} до {slot['end_time']}\n"
-        + ("Клиент уведомлен об отмене." if slot_booking else "")
+        + notified_text
     )
 
 async def cancel_booking(query, master: dict, slot_index: int, data: dict):
@@ -897,13 +1217,7 @@ async def cancel_booking(query, master: dict, slot_index: int, data: dict):
     
     # Находим и удаляем бронирование
     bookings = master.get("bookings", [])
-    slot_booking = None
-    for booking in bookings:
-        if (booking.get("slot_date") == slot['date'] and 
-            booking.get("slot_start_time") == slot['start_time'] and
-            booking.get("status") == "confirmed"):
-            slot_booking = booking
-            break
+    slot_booking = get_confirmed_booking(master, slot)
     
     if slot_booking:
         client_id = slot_booking.get("client_id")
@@ -918,13 +1232,16 @@ async def cancel_booking(query, master: dict, slot_index: int, data: dict):
             
             try:
                 if application_instance:
-                    await application_instance.bot.send_message(chat_id=client_id, text=cancel_message)
+                    await send_message_limited(application_instance.bot, client_id, cancel_message)
             except Exception as e:
                 logger.error(f"Ошибка отправки уведомления клиенту {client_id}: {e}")
         
-        # Удаляем бронирование
-        master["bookings"] = [b for b in bookings if b != slot_booking]
-        save_data(data)
+        # Удаляем бронирование на месте, без копирования списка
+        try:
+            bookings.remove(slot_booking)
+        except ValueError:
+            pass
+        mark_data_dirty(data)
         
         await query.edit_message_text(
             f"✅ Запись отменена: {slot['date']} с {slot['start_time']} до {slot['end_time']}\n"
@@ -997,7 +1314,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if health_checker:
         health_checker.update_last_activity()
     
-    logger.info(f"Получено сообщение от {user_id}: '{text}', состояние: {user_state}")
+    # Полный текст и состояние — только на уровне DEBUG; форматирование ленивое
+    logger.debug("Получено сообщение от %s: '%s', состояние: %s", user_id, text, user_state)
     
     # Обрабатываем выбор роли
     if text == MASTER_ROLE:
@@ -1007,39 +1325,28 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         user_full_name = update.effective_user.full_name or ""
         
         # 1. Ищем по реальному ID (уже привязанные)
-        logger.info(f"DEBUG: Ищем user_id={user_id} (тип: {type(user_id)}) среди мастеров...")
-        for i, master in enumerate(data.get("masters", [])):
-            master_id = master.get("telegram_id")
-            logger.info(f"DEBUG: Мастер {i}: {master.get('name')} ID={master_id} (тип: {type(master_id)})")
-            if master.get("telegram_id") == user_id:
-                existing_master = master
-                logger.info(f"DEBUG: НАЙДЕН мастер по ID: {master.get('name')}")
-                break
+        existing_master = get_master_by_tid(user_id)
+        if existing_master:
+            logger.debug("Найден мастер по ID: %s", existing_master.get('name'))
         
         # 2. Если не найден, ищем по username (импортированные)
         if not existing_master and user_handle:
-            for master in data.get("masters", []):
-                if master.get("telegram_handle") == user_handle:
-                    existing_master = master
-                    # Привязываем реальный telegram_id к профилю
-                    master["telegram_id"] = user_id
-                    master["verified_at"] = datetime.now().isoformat()
-                    save_data(data)
-                    logger.info(f"Привязан telegram_id {user_id} к мастеру {master['name']} ({user_handle})")
-                    break
+            master = get_master_by_handle(user_handle)
+            if master:
+                existing_master = master
+                # Привязываем реальный telegram_id к профилю
+                master["telegram_id"] = user_id
+                master["verified_at"] = datetime.now().isoformat()
+                mark_data_dirty(data)
+                logger.info(f"Привязан telegram_id {user_id} к мастеру {master['name']} ({user_handle})")
         
         # 3. Если не найден, ищем по частичному совпадению имени
         potential_masters = []
         if not existing_master and user_full_name:
-            for master in data.get("masters", []):
-                master_name = master.get("name", "").lower()
-                user_name_lower = user_full_name.lower()
-                
-                # Проверяем fake ID (не цифровой или короткий)
-                telegram_id = master.get("telegram_id", "")
-                is_fake_id = not (telegram_id.isdigit() and len(telegram_id) >= 8)
-                
-                if is_fake_id and (master_name in user_name_lower or user_name_lower in master_name):
+            # Имена мастеров с fake ID уже приведены к нижнему регистру в кэше менеджера
+            user_name_lower = user_full_name.lower()
+            for master_name, master in get_safe_data_manager().get_unverified_master_names():
+                if master_name in user_name_lower or user_name_lower in master_name:
                     potential_masters.append(master)
         
         if existing_master:
@@ -1068,7 +1375,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 f"обратись к администратору @ivanslyozkin"
             )
             
-            await update.message.reply_text(message, parse_mode='Markdown', reply_markup=ReplyKeyboardRemove())
+            await update.message.reply_text(message, parse_mode=markdown_parse_mode(message), reply_markup=ReplyKeyboardRemove())
             user_state["role"] = "master"
             user_state["awaiting"] = "select_existing_master"
             user_state["potential_masters"] = potential_masters
@@ -1093,7 +1400,10 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         # Проверяем, является ли пользователь владельцем девайса
         user_handle = f"@{update.effective_user.username}" if update.effective_user.username else None
-        is_device_owner = user_handle == "@fshubin"  # Пока только Фил
+        is_device_owner = (
+            user_id in _DEVICE_OWNER_ID_SET
+            or (bool(user_handle) and user_handle.lower() in _DEVICE_OWNER_HANDLES_LOWER)
+        )
         
         if is_device_owner:
             user_state["is_device_owner"] = True
@@ -1132,10 +1442,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     # ПРИОРИТЕТ: Обрабатываем описание бага ПЕРВЫМ (но сначала проверяем что это не системная кнопка)
     if 'bug_report' in context.user_data:
-        # Список системных кнопок, которые должны работать даже во время багрепорта
-        system_buttons = [CHANGE_ROLE, BACK_TO_MENU, MASTER_ROLE, CLIENT_ROLE]
-        
-        if text not in system_buttons:
+        # Системные кнопки должны работать даже во время багрепорта
+        if text not in SYSTEM_BUTTONS:
             await bug_reporter.handle_bug_description(update, context)
             return
         else:
@@ -1196,7 +1504,9 @@ async def process_master_profile(update: Update, context: ContextTypes.DEFAULT_T
     
     # Используем GPT для анализа профиля и создания фэнтези-описания
     try:
-        extracted_data, fantasy_description = gpt_service.process_master_profile(profile_text)
+        extracted_data, fantasy_description = await run_gpt(
+            gpt_service.process_master_profile, profile_text
+        )
         
         # Обновляем имя, если GPT извлек его из профиля
         if extracted_data.get("name"):
@@ -1228,7 +1538,7 @@ async def process_master_profile(update: Update, context: ContextTypes.DEFAULT_T
     if "masters" not in data:
         data["masters"] = []
     data["masters"].append(new_master)
-    save_data(data)
+    mark_data_dirty(data)
     
     response_text = (
         f"🌊 Глубины раскрыли мне твою суть, {master_name}!\n\n"
@@ -1241,7 +1551,7 @@ async def process_master_profile(update: Update, context: ContextTypes.DEFAULT_T
     await update.message.reply_text(
         response_text,
         reply_markup=get_master_keyboard(),
-        parse_mode='Markdown'
+        parse_mode=markdown_parse_mode(response_text)
     )
     
     # Сбрасываем состояние ожидания
@@ -1258,7 +1568,7 @@ async def process_select_existing_master(update: Update, context: ContextTypes.D
     
     potential_masters = user_state.get("potential_masters", [])
     
-    if text in ['1', '2', '3'] and text.isdigit():
+    if text in MASTER_CHOICE_ANSWERS:
         choice_index = int(text) - 1
         
         if 0 <= choice_index < len(potential_masters):
@@ -1271,7 +1581,7 @@ async def process_select_existing_master(update: Update, context: ContextTypes.D
                     master["telegram_id"] = user_id
                     master["verified_at"] = datetime.now().isoformat()
                     master["verification_method"] = "name_match"
-                    save_data(data)
+                    mark_data_dirty(data)
                     break
             
             await update.message.reply_text(
@@ -1288,7 +1598,7 @@ async def process_select_existing_master(update: Update, context: ContextTypes.D
             logger.info(f"Мастер {selected_master['name']} привязан к {user_id} через выбор из списка")
             return
     
-    elif text in ['новый', 'новая', 'new']:
+    elif text in NEW_PROFILE_ANSWERS:
         await update.message.reply_text(
             "Великолепно! Расскажи о себе в одном сообщении: имя, опыт, услуги "
             "и свободное время.",
@@ -1298,7 +1608,7 @@ async def process_select_existing_master(update: Update, context: ContextTypes.D
         user_state.pop("potential_masters", None)
         return
     
-    elif text in ['нет', 'не я', 'no']:
+    elif text in NOT_ME_ANSWERS:
         await update.message.reply_text(
             "Понятно! Тогда обратись к администратору @ivanslyozkin для "
             "ручной привязки твоего профиля или создай новый профиль, написав 'новый'.",
@@ -1319,7 +1629,7 @@ async def process_new_or_existing_master(update: Update, context: ContextTypes.D
     user_id = str(update.effective_user.id)
     user_state = get_user_state(user_id)
     
-    if text in ['новый', 'новая', 'new', '1']:
+    if text in NEW_PROFILE_ANSWERS or text == '1':
         await update.message.reply_text(
             "Великолепно! Расскажи о себе в одном сообщении: имя, опыт, услуги "
             "и свободное время.",
@@ -1328,7 +1638,7 @@ async def process_new_or_existing_master(update: Update, context: ContextTypes.D
         user_state["awaiting"] = "master_profile"
         return
     
-    elif text in ['админ', 'администратор', 'помощь', 'admin', '2']:
+    elif text in ADMIN_ANSWERS or text == '2':
         await update.message.reply_text(
             "💬 **Обратись к администратору:**\n\n"
             "Напиши @ivanslyozkin и укажи:\n"
@@ -1346,144 +1656,131 @@ async def process_new_or_existing_master(update: Update, context: ContextTypes.D
             "Напиши 'новый' для создания нового профиля или 'админ' для обращения к администратору."
         )
 
-async def handle_master_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Обрабатывает кнопки мастера."""
-    text = update.message.text
-    user_id = str(update.effective_user.id)
-    
-    if text == MY_PROFILE:
-        data = load_data()
-        master = None
-        for m in data.get("masters", []):
-            if m.get("telegram_id") == user_id:
-                master = m
-                break
-        
-        if master:
-            response = (
-                f"👤 **Твой профиль, {master['name']}:**\n\n"
-                f"🎭 **Фэнтези-описание:**\n{master['fantasy_description']}\n\n"
-                f"📝 **Твои оригинальные слова:**\n{master['original_description']}\n\n"
-                f"🛠 **Услуги:** {', '.join(master.get('services', []))}\n"
-                f"⏰ **Слотов создано:** {len(master.get('time_slots', []))}"
-            )
-            await update.message.reply_text(response, parse_mode='Markdown')
-        else:
-            await update.message.reply_text("Профиль не найден.")
-    
-    elif text == MY_SLOTS:
-        data = load_data()
-        master = None
-        for m in data.get("masters", []):
-            if m.get("telegram_id") == user_id:
-                master = m
-                break
-        
-        if master and master.get("time_slots"):
-            await show_slots_with_management(update, context, master)
-        else:
-            await update.message.reply_text("У тебя пока нет слотов. Используй 'Добавить слоты'.")
+# === КНОПКИ ГЛАВНОГО МЕНЮ ===
+# Обработчики кнопок меню; имена функций ниже по файлу разрешаются в момент вызова.
+
+async def _btn_my_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    master = get_master_by_tid(str(update.effective_user.id))
     
-    elif text == ADD_SLOTS:
-        user_states[user_id] = {"role": "master", "awaiting": "add_slots"}
-        await update.message.reply_text(
-            "🐙 Расскажи, какие новые слоты хочешь добавить? Например:\n\n"
-            "• 'Завтра с 14:00 до 18:00 в бане, каждый слот по 1 часу с перерывом по 10 минут между слотами'\n"
-            "• 'В субботу в 18:00 на час в глэмпинге'\n"
-            "• 'В понедельник с 12 до 15 в спасалке'\n\n"
-            "Я пойму твой текст и создам нужные слоты! ✨"
+    if master:
+        response = (
+            f"👤 **Твой профиль, {master['name']}:**\n\n"
+            f"🎭 **Фэнтези-описание:**\n{master['fantasy_description']}\n\n"
+            f"📝 **Твои оригинальные слова:**\n{master['original_description']}\n\n"
+            f"🛠 **Услуги:** {', '.join(master.get('services', []))}\n"
+            f"⏰ **Слотов создано:** {len(master.get('time_slots', []))}"
         )
+        await update.message.reply_text(response, parse_mode=markdown_parse_mode(response))
+    else:
+        await update.message.reply_text("Профиль не найден.")
+
+async def _btn_my_slots(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    master = get_master_by_tid(str(update.effective_user.id))
     
-    elif text == EDIT_PROFILE:
-        await edit_profile_request(update, context)
-    
-    elif text == VIEW_MASTERS:
-        await show_masters_list(update, context)
-    
-    elif text == BACK_TO_MENU:
-        await update.message.reply_text("Главное меню мастера:", reply_markup=get_master_keyboard())
-    
-    elif text == CHANGE_ROLE:
-        await start(update, context)
-    
-    elif text == REPORT_BUG:
-        await bug_reporter.handle_bug_report_start(update, context)
-    
-    elif text == MY_VIBRO_CHAIR:
-        await show_vibro_chair_bookings(update, context)
-    
+    if master and master.get("time_slots"):
+        await show_slots_with_management(update, context, master)
+    else:
+        await update.message.reply_text("У тебя пока нет слотов. Используй 'Добавить слоты'.")
+
+async def _btn_add_slots(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_states[str(update.effective_user.id)] = {"role": "master", "awaiting": "add_slots"}
+    await update.message.reply_text(
+        "🐙 Расскажи, какие новые слоты хочешь добавить? Например:\n\n"
+        "• 'Завтра с 14:00 до 18:00 в бане, каждый слот по 1 часу с перерывом по 10 минут между слотами'\n"
+        "• 'В субботу в 18:00 на час в глэмпинге'\n"
+        "• 'В понедельник с 12 до 15 в спасалке'\n\n"
+        "Я пойму твой текст и создам нужные слоты! ✨"
+    )
+
+async def _btn_edit_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await edit_profile_request(update, context)
+
+async def _btn_view_masters(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_masters_list(update, context)
+
+async def _btn_view_devices(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_devices_list(update, context)
+
+async def _btn_view_free_slots(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_free_slots_menu(update, context)
+
+async def _btn_my_bookings(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_client_bookings(update, context)
+
+async def _btn_master_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text("Главное меню мастера:", reply_markup=get_master_keyboard())
+
+async def _btn_client_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text("Главное меню гостя:", reply_markup=get_client_keyboard())
+
+async def _btn_change_role(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await start(update, context)
+
+async def _btn_report_bug(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await bug_reporter.handle_bug_report_start(update, context)
+
+async def _btn_vibro_chair(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_vibro_chair_bookings(update, context)
+
+# Текст кнопки -> обработчик
+_MASTER_BUTTON_HANDLERS = {
+    MY_PROFILE: _btn_my_profile,
+    MY_SLOTS: _btn_my_slots,
+    ADD_SLOTS: _btn_add_slots,
+    EDIT_PROFILE: _btn_edit_profile,
+    VIEW_MASTERS: _btn_view_masters,
+    BACK_TO_MENU: _btn_master_menu,
+    CHANGE_ROLE: _btn_change_role,
+    REPORT_BUG: _btn_report_bug,
+    MY_VIBRO_CHAIR: _btn_vibro_chair,
+}
+
+_CLIENT_BUTTON_HANDLERS = {
+    VIEW_MASTERS: _btn_view_masters,
+    VIEW_DEVICES: _btn_view_devices,
+    VIEW_FREE_SLOTS: _btn_view_free_slots,
+    MY_BOOKINGS: _btn_my_bookings,
+    BACK_TO_MENU: _btn_client_menu,
+    CHANGE_ROLE: _btn_change_role,
+    REPORT_BUG: _btn_report_bug,
+    MY_VIBRO_CHAIR: _btn_vibro_chair,
+}
+
+async def handle_master_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обрабатывает кнопки мастера."""
+    handler = _MASTER_BUTTON_HANDLERS.get(update.message.text)
+    if handler:
+        await handler(update, context)
     else:
         await update.message.reply_text("Используй кнопки меню для навигации.")
 
 async def handle_client_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обрабатывает кнопки гостя."""
-    text = update.message.text
-    
-    if text == VIEW_MASTERS:
-        await show_masters_list(update, context)
-    
-    elif text == VIEW_DEVICES:
-        await show_devices_list(update, context)
-    
-    elif text == VIEW_FREE_SLOTS:
-        await show_free_slots_menu(update, context)
-    
-    elif text == MY_BOOKINGS:
-        await show_client_bookings(update, context)
-    
-    elif text == BACK_TO_MENU:
-        await update.message.reply_text("Главное меню гостя:", reply_markup=get_client_keyboard())
-    
-    elif text == CHANGE_ROLE:
-        await start(update, context)
-    
-    elif text == REPORT_BUG:
-        await bug_reporter.handle_bug_report_start(update, context)
-    
-    elif text == MY_VIBRO_CHAIR:
-        await show_vibro_chair_bookings(update, context)
-    
+    handler = _CLIENT_BUTTON_HANDLERS.get(update.message.text)
+    if handler:
+        await handler(update, context)
     else:
         await update.message.reply_text("Используй кнопки меню для навигации.")
 
-def count_available_slots(master: dict) -> int:
+def count_available_slots(master: dict, now_ts: float = None) -> int:
     """Подсчитывает количество доступных слотов мастера (только будущие)."""
-    from datetime import datetime
-    
-    slots = master.get("time_slots", [])
-    bookings = master.get("bookings", [])
-    
-    # Получаем текущее время
-    now = datetime.now()
+    # Занятые слоты собираем один раз, а не перебираем записи для каждого слота
+    booked_keys = {
+        (booking.get("slot_date"), booking.get("slot_start_time"))
+        for booking in master.get("bookings", [])
+        if booking.get("status") in ACTIVE_BOOKING_STATUSES
+    }
     
+    if now_ts is None:
+        now_ts = time.time()
     available_count = 0
-    for slot in slots:
-        slot_date = slot.get("date")
-        slot_start_time = slot.get("start_time")
-        
-        if not slot_date or not slot_start_time:
-            continue
-            
-        try:
-            # Создаем datetime объект для сравнения
-            slot_datetime = datetime.strptime(f"{slot_date} {slot_start_time}", "%Y-%m-%d %H:%M")
-            
-            # Показываем только будущие слоты (включая запас 30 минут)
-            if slot_datetime <= now:
-                continue
-                
-        except ValueError:
-            # Если не можем распарсить время, пропускаем слот
+    for slot in master.get("time_slots", []):
+        # Время начала разбирается один раз и кэшируется в слоте; битые слоты пропускаем
+        start_ts = slot_start_epoch(slot)
+        if start_ts is None or start_ts <= now_ts:
             continue
-            
-        # Проверяем, не забронирован ли слот
-        is_booked = any(
-            booking.get("slot_date") == slot.get("date") and
-            booking.get("slot_start_time") == slot.get("start_time") and
-            booking.get("status") in ["pending", "confirmed"]
-            for booking in bookings
-        )
-        if not is_booked:
+        
+        if (slot.get("date"), slot.get("start_time")) not in booked_keys:
             available_count += 1
     
     return available_count
@@ -1491,26 +1788,21 @@ def count_available_slots(master: dict) -> int:
 async def show_client_bookings(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показывает записи клиента к мастерам."""
     user_id = str(update.effective_user.id)
-    data = load_data()
-    masters = data.get("masters", [])
-    
     client_bookings = []
     
-    # Ищем все записи клиента во всех мастерах
-    for master in masters:
-        for booking in master.get("bookings", []):
-            if booking.get("client_id") == user_id:
-                booking_info = {
-                    "master_name": master.get("name", "Мастер"),
-                    "master_id": master.get("telegram_id"),
-                    "date": booking.get("slot_date"),
-                    "start_time": booking.get("slot_start_time"),
-                    "end_time": booking.get("slot_end_time"),
-                    "location": booking.get("location"),
-                    "status": booking.get("status"),
-                    "booking": booking
-                }
-                client_bookings.append(booking_info)
+    # Все записи клиента во всех мастерах берем из индекса по client_id
+    for master, booking in get_safe_data_manager().get_client_bookings(user_id):
+        booking_info = {
+            "master_name": master.get("name", "Мастер"),
+            "master_id": master.get("telegram_id"),
+            "date": booking.get("slot_date"),
+            "start_time": booking.get("slot_start_time"),
+            "end_time": booking.get("slot_end_time"),
+            "location": booking.get("location"),
+            "status": booking.get("status"),
+            "booking": booking
+        }
+        client_bookings.append(booking_info)
     
     if not client_bookings:
         await update.message.reply_text(
@@ -1524,24 +1816,15 @@ async def show_client_bookings(update: Update, context: ContextTypes.DEFAULT_TYP
     # Сортируем по дате и времени
     client_bookings.sort(key=lambda x: (x["date"], x["start_time"]))
     
-    response = "📅 **Твои записи:**\n\n"
+    parts = ["📅 **Твои записи:**\n\n"]
     
     for booking_info in client_bookings:
-        status_icon = {
-            "pending": "🕐",
-            "confirmed": "✅", 
-            "declined": "❌"
-        }.get(booking_info["status"], "❓")
-        
-        status_text = {
-            "pending": "Ожидает подтверждения",
-            "confirmed": "Подтверждена", 
-            "declined": "Отклонена"
-        }.get(booking_info["status"], "Неизвестно")
+        status_icon = STATUS_ICONS.get(booking_info["status"], "❓")
+        status_text = STATUS_TEXTS.get(booking_info["status"], "Неизвестно")
         
         slot_text = f"{format_date_for_user(booking_info['date'])} с {booking_info['start_time']} до {booking_info['end_time']}"
         
-        response += (
+        parts.append(
             f"{status_icon} **{booking_info['master_name']}**\n"
             f"📅 Время: {slot_text}\n"
             f"📍 Место: {booking_info['location']}\n"
@@ -1551,12 +1834,13 @@ async def show_client_bookings(update: Update, context: ContextTypes.DEFAULT_TYP
         # Если запись отклонена, показываем причину
         if booking_info["status"] == "declined":
             reason = booking_info["booking"].get("decline_reason", "Не указана")
-            response += f"💬 Причина: {reason}\n\n"
+            parts.append(f"💬 Причина: {reason}\n\n")
     
+    response = "".join(parts)
     await update.message.reply_text(
         response,
         reply_markup=get_client_keyboard(),
-        parse_mode='Markdown'
+        parse_mode=markdown_parse_mode(response)
     )
 
 async def show_masters_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1585,10 +1869,12 @@ async def show_masters_list(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     # Создаем inline кнопки для выбора мастера
     keyboard = []
+    # Один момент времени на весь список: мастера сравниваются с одним и тем же "сейчас"
+    now_ts = time.time()
     for master in masters:
         master_name = master.get('name', 'Мастер')
         # Подсчитываем доступные слоты
-        available_slots = count_available_slots(master)
+        available_slots = count_available_slots(master, now_ts)
         
         if available_slots > 0:  # Показываем только мастеров с доступными слотами
             button_text = f"{master_name} ({available_slots} слотов)"
@@ -1616,12 +1902,7 @@ async def show_master_details(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     await query.answer()
     
-    data = load_data()
-    master = None
-    for m in data.get("masters", []):
-        if m.get("telegram_id") == master_id:
-            master = m
-            break
+    master = get_master_by_tid(master_id)
     
     if not master:
         await query.edit_message_text("Мастер не найден.")
@@ -1636,46 +1917,32 @@ async def show_master_details(update: Update, context: ContextTypes.DEFAULT_TYPE
         f"📅 **Доступные слоты:**"
     )
     
-    await query.edit_message_text(info_text, parse_mode='Markdown')
+    await query.edit_message_text(info_text, parse_mode=markdown_parse_mode(info_text))
     
     # Показываем доступные слоты
-    from datetime import datetime
     slots = master.get("time_slots", [])
-    bookings = master.get("bookings", [])
-    now = datetime.now()
+    # Занятые слоты мастера собираем один раз вместо перебора записей для каждого слота
+    booked_keys = {
+        (booking.get("slot_date"), booking.get("slot_start_time"))
+        for booking in master.get("bookings", [])
+        if booking.get("status") in ACTIVE_BOOKING_STATUSES
+    }
+    now_ts = time.time()
     
     available_slots = []
     for i, slot in enumerate(slots):
-        # Проверяем, что слот еще не прошел по времени
-        slot_date = slot.get("date")
-        slot_start_time = slot.get("start_time")
-        
-        if not slot_date or not slot_start_time:
-            continue
-            
-        try:
-            slot_datetime = datetime.strptime(f"{slot_date} {slot_start_time}", "%Y-%m-%d %H:%M")
-            if slot_datetime <= now:
-                continue  # Пропускаем прошедшие слоты
-        except ValueError:
+        # Пропускаем прошедшие и некорректные слоты (время начала кэшируется в слоте)
+        start_ts = slot_start_epoch(slot)
+        if start_ts is None or start_ts <= now_ts:
             continue
         
-        # Проверяем, не забронирован ли слот
-        is_booked = any(
-            booking.get("slot_date") == slot.get("date") and
-            booking.get("slot_start_time") == slot.get("start_time") and
-            booking.get("status") in ["pending", "confirmed"]
-            for booking in bookings
-        )
-        if not is_booked:
+        if (slot.get("date"), slot.get("start_time")) not in booked_keys:
             available_slots.append((i, slot))
     
     if not available_slots:
         await update.effective_chat.send_message(
             "😔 У этого мастера нет свободных слотов.",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("🔙 К списку мастеров", callback_data="back_to_masters")
-            ]])
+            reply_markup=BACK_TO_MASTERS_MARKUP
         )
         return
     
@@ -1703,11 +1970,7 @@ async def process_booking_request(update: Update, context: ContextTypes.DEFAULT_
     client_name = update.effective_user.first_name or "Гость"
     
     data = load_data()
-    master = None
-    for m in data.get("masters", []):
-        if m.get("telegram_id") == master_id:
-            master = m
-            break
+    master = get_master_by_tid(master_id)
     
     if not master:
         await query.edit_message_text("Мастер не найден.")
@@ -1725,23 +1988,19 @@ async def process_booking_request(update: Update, context: ContextTypes.DEFAULT_
         return
     
     # Проверяем ограничение: не более 2 записей к одному мастеру
-    client_bookings_count = 0
-    for booking in master.get("bookings", []):
-        if booking.get("client_id") == client_id and booking.get("status") == "confirmed":
-            client_bookings_count += 1
+    client_bookings_count = get_safe_data_manager().count_confirmed_client_bookings(master, client_id)
     
     if client_bookings_count >= 2:
         await query.edit_message_text(
             f"🚫 Осьминог мудро ограничивает: к мастеру {master.get('name')} можно записаться не более 2 раз за мероприятие.\n\n"
             f"Ты уже записан {client_bookings_count} раз(а). Попробуй других мастеров! 🐙",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("🔙 К списку мастеров", callback_data="back_to_masters")
-            ]])
+            reply_markup=BACK_TO_MASTERS_MARKUP
         )
         return
     
-    # Создаем заявку на бронирование
+    # Создаем заявку на бронирование; стабильный id нужен для кнопок подтверждения
     booking = {
+        "id": str(uuid.uuid4())[:8],
         "client_id": client_id,
         "client_name": client_name,
         "master_id": master_id,
@@ -1749,6 +2008,7 @@ async def process_booking_request(update: Update, context: ContextTypes.DEFAULT_
         "slot_date": slot.get("date"),
         "slot_start_time": slot.get("start_time"),
         "slot_end_time": slot.get("end_time"),
+        "slot_start_ts": slot_start_epoch(slot),
         "location": slot.get("location"),
         "status": "pending",
         "created_at": datetime.now().isoformat()
@@ -1759,7 +2019,7 @@ async def process_booking_request(update: Update, context: ContextTypes.DEFAULT_
         master["bookings"] = []
     master["bookings"].append(booking)
     
-    save_data(data)
+    await save_data_async(data)
     
     # Уведомляем клиента
     slot_text = format_slot_for_user(slot)
@@ -1768,9 +2028,7 @@ async def process_booking_request(update: Update, context: ContextTypes.DEFAULT_
         f"🐙 Мастер: {master.get('name')}\n"
         f"📅 Время: {slot_text}\n\n"
         f"Осьминог передал твою просьбу мастеру. Ожидай подтверждения! 🌊",
-        reply_markup=InlineKeyboardMarkup([[
-            InlineKeyboardButton("🔙 К списку мастеров", callback_data="back_to_masters")
-        ]])
+        reply_markup=BACK_TO_MASTERS_MARKUP
     )
     
     # Уведомляем мастера
@@ -1784,105 +2042,99 @@ async def process_booking_request(update: Update, context: ContextTypes.DEFAULT_
         
         keyboard = [
             [
-                InlineKeyboardButton("✅ Принять", callback_data=f"confirm_booking_{len(master['bookings'])-1}"),
-                InlineKeyboardButton("❌ Отклонить", callback_data=f"decline_booking_{len(master['bookings'])-1}")
+                InlineKeyboardButton("✅ Принять", callback_data=f"confirm_booking_{booking['id']}"),
+                InlineKeyboardButton("❌ Отклонить", callback_data=f"decline_booking_{booking['id']}")
             ]
         ]
         
-        await application_instance.bot.send_message(
-            chat_id=master_id,
+        await send_message_limited(
+            application_instance.bot, master_id,
             text=booking_notification,
             reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+            parse_mode=markdown_parse_mode(booking_notification)
         )
         
     except Exception as e:
         logger.error(f"Ошибка отправки уведомления мастеру {master_id}: {e}")
 
-def start_simple_webhook_server(telegram_app, port, main_loop=None):
-    """Запускает простой HTTP сервер для webhook и health check"""
-    from http.server import HTTPServer, BaseHTTPRequestHandler
-    import threading
-    import json
-    from datetime import datetime
-    
-    class WebhookHandler(BaseHTTPRequestHandler):
-        event_loop = main_loop  # Сохраняем reference на main event loop
-        def do_GET(self):
-            if self.path == '/health':
-                # Простой и быстрый healthcheck без внешних API вызовов
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                response = {
-                    "status": "ok", 
-                    "timestamp": datetime.now().isoformat(),
-                    "service": "mintoctopus_bot"
-                }
-                self.wfile.write(json.dumps(response).encode('utf-8'))
-                logger.info("✅ Health check запрос обработан")
-            else:
-                self.send_response(404)
-                self.end_headers()
-        
-        def do_POST(self):
-            if self.path == '/webhook':
-                try:
-                    content_length = int(self.headers.get('Content-Length', 0))
-                    post_data = self.rfile.read(content_length)
-                    update_data = json.loads(post_data.decode('utf-8'))
-                    
-                    # Обрабатываем webhook
-                    from telegram import Update
-                    update = Update.de_json(update_data, telegram_app.bot)
-                    
-                    # Запускаем async функцию из другого thread
-                    import asyncio
-                    import threading
-                    
-                    # Запускаем coroutine в main loop из thread
-                    if self.event_loop:
-                        future = asyncio.run_coroutine_threadsafe(
-                            telegram_app.process_update(update), 
-                            self.event_loop
-                        )
-                        # Можно дождаться результата (опционально)
-                        # future.result(timeout=5.0)
-                    else:
-                        logger.error("❌ Main event loop недоступен!")
-                    
-                    self.send_response(200)
-                    self.end_headers()
-                    self.wfile.write(b'OK')
-                    logger.info("✅ Webhook запрос обработан")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Ошибка webhook: {e}")
-                    self.send_response(500)
-                    self.end_headers()
-            else:
-                self.send_response(404)
-                self.end_headers()
-        
-        def log_message(self, format, *args):
-            pass  # Отключаем стандартные логи
-    
-    def run_server():
-        server = HTTPServer(('0.0.0.0', port), WebhookHandler)
-        server.timeout = 30  # Добавляем timeout для предотвращения зависаний
-        logger.info(f"🌐 HTTP сервер запущен на порту {port}")
+async def _update_worker(telegram_app):
+    """Разбирает очередь входящих обновлений webhook."""
+    while True:
+        update = await _update_queue.get()
         try:
-            server.serve_forever()
+            await telegram_app.process_update(update)
         except Exception as e:
-            logger.error(f"❌ HTTP сервер ошибка: {e}")
-            # Автоматический перезапуск сервера при ошибке
-            run_server()
-    
-    # ДИАГНОСТИКА: Делаем thread НЕ daemon чтобы он держал процесс
-    thread = threading.Thread(target=run_server, daemon=False)
-    thread.start()
-    logger.info(f"🚀 HTTP сервер поток запущен на порту {port} (НЕ daemon)")
-    logger.info("🔍 HTTP thread будет держать процесс живым!")
+            logger.error(f"❌ Ошибка обработки обновления {update.update_id}: {e}")
+        finally:
+            _update_queue.task_done()
+
+async def start_simple_webhook_server(telegram_app, port):
+    """Запускает HTTP сервер для webhook и health check в том же event loop, что и бот"""
+    from aiohttp import web
+    global webhook_runner, _update_queue
+    
+    _update_queue = asyncio.Queue(maxsize=UPDATE_QUEUE_MAXSIZE)
+    for _ in range(UPDATE_WORKERS):
+        _update_workers.append(asyncio.create_task(_update_worker(telegram_app)))
+    
+    async def health(request):
+        # Простой и быстрый healthcheck без внешних API вызовов
+        response = {
+            "status": "ok", 
+            "timestamp": datetime.now().isoformat(),
+            "service": "mintoctopus_bot"
+        }
+        logger.info("✅ Health check запрос обработан")
+        return web.Response(body=dump_json_bytes(response), content_type='application/json')
+    
+    async def webhook(request):
+        # Запросы без верного секрета отбрасываем до чтения и разбора тела
+        # Сравнение байтов за постоянное время; не-ASCII заголовок не роняет обработчик
+        received_secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if WEBHOOK_SECRET and not hmac.compare_digest(
+                received_secret.encode("utf-8", "surrogateescape"), WEBHOOK_SECRET.encode("utf-8")):
+            logger.debug("Webhook запрос с неверным секретом отклонен")
+            return web.Response(status=401)
+        try:
+            # orjson разбирает байты напрямую, без промежуточного decode
+            update_data = loads_json(await request.read())
+            update = Update.de_json(update_data, telegram_app.bot)
+            
+            # Telegram получает ответ сразу, обновление разберут обработчики очереди
+            try:
+                _update_queue.put_nowait(update)
+            except asyncio.QueueFull:
+                logger.warning("⚠️ Очередь обновлений переполнена, просим Telegram повторить позже")
+                return web.Response(status=429)
+            logger.info("✅ Webhook запрос обработан")
+            return web.Response(text='OK')
+        except Exception as e:
+            logger.error(f"❌ Ошибка webhook: {e}")
+            return web.Response(status=500)
+    
+    app = web.Application()
+    app.router.add_get('/health', health)
+    app.router.add_post('/webhook', webhook)
+    
+    webhook_runner = web.AppRunner(app, access_log=None)
+    await webhook_runner.setup()
+    site = web.TCPSite(webhook_runner, '0.0.0.0', port)
+    await site.start()
+    logger.info(f"🌐 HTTP сервер запущен на порту {port}")
+    return webhook_runner
+
+async def stop_simple_webhook_server():
+    """Останавливает HTTP сервер webhook и обработчики очереди обновлений, если они были запущены"""
+    global webhook_runner, _update_queue
+    if webhook_runner is not None:
+        await webhook_runner.cleanup()
+        webhook_runner = None
+        logger.info("🌐 HTTP сервер остановлен")
+    for task in _update_workers:
+        task.cancel()
+    await asyncio.gather(*_update_workers, return_exceptions=True)
+    _update_workers.clear()
+    _update_queue = None
 
 def main() -> None:
     """Запускает бота."""
@@ -1896,7 +2148,8 @@ def main() -> None:
     # Инициализируем health checker
     health_checker = init_health_checker(telegram_token)
     
-    application = Application.builder().token(telegram_token).build()
+    # HTTP/2 (если доступен) мультиплексирует запросы к Bot API в одном соединении
+    application = Application.builder().token(telegram_token).http_version(TELEGRAM_HTTP_VERSION).build()
     application_instance = application  # Сохраняем для использования в напоминаниях
 
     # Добавляем обработчики
@@ -1913,8 +2166,7 @@ def main() -> None:
     # Простая проверка админа по user_id
     def is_admin_user(user_id: int) -> bool:
         """Проверяет является ли пользователь админом"""
-        admin_ids = [78273571]  # Твой user_id
-        return user_id in admin_ids
+        return user_id in _ADMIN_IDS
     
     # Debug команда для проверки environment variables
     async def debug_env_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -2034,19 +2286,16 @@ GPT_SERVICE: {gpt_status}
     
     async def post_init(application):
         """Инициализация после запуска event loop."""
-        scheduler.start()
-        logger.info("📅 Планировщик напоминаний запущен!")
+        if start_scheduler():
+            logger.info("📅 Планировщик напоминаний запущен!")
+        start_send_workers()
         
         # Запускаем aiohttp сервер для webhook и health check
         if os.getenv("ENVIRONMENT") == "production":
             port = int(os.getenv("PORT", 8080))
             logger.info(f"🌐 Запускаем простой HTTP сервер на порту {port}...")
             try:
-                # Получаем текущий event loop
-                current_loop = asyncio.get_running_loop()
-                start_simple_webhook_server(application, port, current_loop)
-                # Ждем чтобы сервер успел запуститься
-                await asyncio.sleep(1)
+                await start_simple_webhook_server(application, port)
                 logger.info(f"✅ Простой HTTP сервер запущен на порту {port}!")
             except Exception as e:
                 logger.error(f"❌ КРИТИЧЕСКАЯ ОШИБКА запуска HTTP сервера: {e}")
@@ -2057,8 +2306,12 @@ GPT_SERVICE: {gpt_status}
     
     async def post_stop(application):
         """Очистка при остановке."""
-        scheduler.shutdown()
-        logger.info("📅 Планировщик напоминаний остановлен.")
+        if scheduler.running:
+            scheduler.shutdown()
+            logger.info("📅 Планировщик напоминаний остановлен.")
+        await stop_simple_webhook_server()
+        await stop_send_workers()
+        get_safe_data_manager().flush_pending()
     
     application.post_init = post_init
     application.post_stop = post_stop
@@ -2092,7 +2345,7 @@ GPT_SERVICE: {gpt_status}
                 try:
                     port = int(os.getenv("PORT", 8080))
                     logger.info(f"🚀 ШАГ 1: Запуск HTTP сервера на порту {port}...")
-                    start_simple_webhook_server(application, port, asyncio.get_running_loop())
+                    await start_simple_webhook_server(application, port)
                     logger.info(f"✅ ШАГ 1: HTTP сервер запущен успешно!")
                 except Exception as e:
                     logger.error(f"💥 ШАГ 1 ПРОВАЛЕН: HTTP сервер - {e}")
@@ -2125,7 +2378,8 @@ GPT_SERVICE: {gpt_status}
                 # Шаг 4: Планировщик
                 try:
                     logger.info("📅 ШАГ 4: Запуск планировщика...")
-                    scheduler.start()
+                    start_scheduler()
+                    start_send_workers()
                     logger.info("✅ ШАГ 4: Планировщик запущен успешно!")
                 except Exception as e:
                     logger.error(f"💥 ШАГ 4 ПРОВАЛЕН: Планировщик - {e}")
@@ -2144,6 +2398,9 @@ GPT_SERVICE: {gpt_status}
                     raise
                 
             finally:
+                await stop_simple_webhook_server()
+                await stop_send_workers()
+                get_safe_data_manager().flush_pending()
                 await application.stop()
                 await application.shutdown()
         
@@ -2158,9 +2415,6 @@ GPT_SERVICE: {gpt_status}
 
 async def show_free_slots_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показывает меню выбора даты для просмотра свободных слотов."""
-    from datetime import datetime, timedelta
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    
     today = datetime.now().date()
     
     keyboard = [
@@ -2168,7 +2422,7 @@ async def show_free_slots_menu(update: Update, context: ContextTypes.DEFAULT_TYP
         [InlineKeyboardButton("🌄 Завтра", callback_data=f"slots_date_{today + timedelta(days=1)}")],
         [InlineKeyboardButton("📅 Послезавтра", callback_data=f"slots_date_{today + timedelta(days=2)}")],
         [InlineKeyboardButton("📆 Выбрать дату", callback_data="slots_custom_date")],
-        [InlineKeyboardButton("⬅️ Назад", callback_data="back_to_client_menu")]
+        BACK_TO_CLIENT_ROW
     ]
     
     await update.message.reply_text(
@@ -2180,50 +2434,32 @@ async def show_free_slots_menu(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def show_slots_by_date(update: Update, context: ContextTypes.DEFAULT_TYPE, selected_date: str) -> None:
     """Показывает все свободные слоты на выбранную дату."""
-    from datetime import datetime
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    from collections import defaultdict
-    
-    data = load_data()
-    masters = data.get("masters", [])
-    bookings = data.get("bookings", [])
+    # Занятые слоты берем из индекса менеджера данных (строится один раз до следующего изменения)
+    is_slot_booked = get_safe_data_manager().is_slot_booked
+    now_ts = time.time()
     
     # Группируем слоты по времени
     slots_by_time = defaultdict(list)
     
-    for master in masters:
+    # Слоты на дату берем из индекса, а не перебираем слоты всех мастеров
+    for master, slot in get_safe_data_manager().get_slots_on_date(selected_date):
         if not master.get("is_active", True):
             continue
-            
-        for slot in master.get("time_slots", []):
-            if slot.get("date") != selected_date:
-                continue
-            
-            # Проверяем, что слот еще не прошел (для сегодняшней даты)
-            slot_start_time = slot.get("start_time")
-            if slot_start_time:
-                try:
-                    slot_datetime = datetime.strptime(f"{selected_date} {slot_start_time}", "%Y-%m-%d %H:%M")
-                    if slot_datetime <= datetime.now():
-                        continue  # Пропускаем прошедшие слоты
-                except ValueError:
-                    continue
-            
-            # Проверяем, не занят ли слот
-            is_booked = any(
-                booking.get("slot_date") == slot.get("date") and
-                booking.get("slot_start_time") == slot.get("start_time") and
-                booking.get("master_id") == master.get("telegram_id") and
-                booking.get("status") in ["pending", "confirmed"]
-                for booking in bookings
-            )
-            
-            if not is_booked:
-                time_key = f"{slot.get('start_time')}-{slot.get('end_time')}"
-                slots_by_time[time_key].append({
-                    'master': master,
-                    'slot': slot
-                })
+        
+        # Проверяем, что слот еще не прошел (для сегодняшней даты)
+        slot_start_time = slot.get("start_time")
+        if slot_start_time:
+            start_ts = slot_start_epoch(slot)
+            if start_ts is None or start_ts <= now_ts:
+                continue  # Пропускаем прошедшие и некорректные слоты
+        
+        # Проверяем, не занят ли слот
+        if not is_slot_booked(master.get("telegram_id"), selected_date, slot_start_time):
+            time_key = f"{slot.get('start_time')}-{slot.get('end_time')}"
+            slots_by_time[time_key].append({
+                'master': master,
+                'slot': slot
+            })
     
     if not slots_by_time:
         await update.callback_query.edit_message_text(
@@ -2236,19 +2472,15 @@ async def show_slots_by_date(update: Update, context: ContextTypes.DEFAULT_TYPE,
         return
     
     # Форматируем дату для отображения
-    try:
-        date_obj = datetime.strptime(selected_date, '%Y-%m-%d')
-        formatted_date = date_obj.strftime('%A %d %B').replace('Monday', 'Понедельник').replace('Tuesday', 'Вторник').replace('Wednesday', 'Среда').replace('Thursday', 'Четверг').replace('Friday', 'Пятница').replace('Saturday', 'Суббота').replace('Sunday', 'Воскресенье')
-    except:
-        formatted_date = selected_date
+    formatted_date = format_date_for_user(selected_date)
     
-    message = f"📅 **{formatted_date}**\n\n"
+    parts = [f"📅 **{formatted_date}**\n\n"]
     keyboard = []
     
     # Сортируем по времени
     for time_range in sorted(slots_by_time.keys()):
         slots = slots_by_time[time_range]
-        message += f"⏰ **{time_range}**\n"
+        parts.append(f"⏰ **{time_range}**\n")
         
         for slot_info in slots:
             master = slot_info['master']
@@ -2264,7 +2496,7 @@ async def show_slots_by_date(update: Update, context: ContextTypes.DEFAULT_TYPE,
                 name = master.get('name', 'Мастер')
             
             location = slot.get('location', 'Локация не указана')
-            message += f"  {icon} {name} • {location}\n"
+            parts.append(f"  {icon} {name} • {location}\n")
             
             # Добавляем кнопку для бронирования
             callback_data = f"book_time_{master.get('telegram_id')}_{slot.get('start_time')}_{selected_date}"
@@ -2273,58 +2505,40 @@ async def show_slots_by_date(update: Update, context: ContextTypes.DEFAULT_TYPE,
                 callback_data=callback_data
             )])
         
-        message += "\n"
+        parts.append("\n")
     
+    message = "".join(parts)
     keyboard.append([InlineKeyboardButton("📅 Другая дата", callback_data="slots_menu")])
-    keyboard.append([InlineKeyboardButton("⬅️ Назад", callback_data="back_to_client_menu")])
+    keyboard.append(BACK_TO_CLIENT_ROW)
     
     await update.callback_query.edit_message_text(
         message,
         reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode='Markdown'
+        parse_mode=markdown_parse_mode(message)
     )
 
 async def process_time_booking_request(update: Update, context: ContextTypes.DEFAULT_TYPE, master_id: str, slot_time: str, slot_date: str) -> None:
     """Обрабатывает запрос на бронирование через выбор времени."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    import uuid
-    
     query = update.callback_query
     user_id = str(query.from_user.id)
     data = load_data()
     
     # Находим мастера/оборудование
-    master = None
-    for m in data.get("masters", []):
-        if m.get("telegram_id") == master_id:
-            master = m
-            break
+    master = get_master_by_tid(master_id)
     
     if not master:
         await query.edit_message_text("❌ Мастер или оборудование не найдено.")
         return
     
     # Находим конкретный слот
-    target_slot = None
-    for slot in master.get("time_slots", []):
-        if (slot.get("date") == slot_date and 
-            slot.get("start_time") == slot_time):
-            target_slot = slot
-            break
+    target_slot = get_safe_data_manager().find_slot(master, slot_date, slot_time)
     
     if not target_slot:
         await query.edit_message_text("❌ Слот не найден.")
         return
     
     # Проверяем, не занят ли слот
-    bookings = data.get("bookings", [])
-    is_booked = any(
-        booking.get("slot_date") == slot_date and
-        booking.get("slot_start_time") == slot_time and
-        booking.get("master_id") == master_id and
-        booking.get("status") in ["pending", "confirmed"]
-        for booking in bookings
-    )
+    is_booked = get_safe_data_manager().is_slot_booked(master_id, slot_date, slot_time)
     
     if is_booked:
         await query.edit_message_text(
@@ -2348,23 +2562,22 @@ async def process_time_booking_request(update: Update, context: ContextTypes.DEF
         "slot_date": slot_date,
         "slot_start_time": slot_time,
         "slot_end_time": target_slot.get("end_time"),
+        "slot_start_ts": slot_start_epoch(target_slot),
         "slot_location": target_slot.get("location", "Локация не указана"),
-        "status": "pending",
+        # Оборудование подтверждается сразу, без ответа мастера
+        "status": "confirmed" if master.get("is_equipment") else "pending",
         "created_at": datetime.now().isoformat(),
         "is_equipment": master.get("is_equipment", False)
     }
     
     data["bookings"].append(booking)
-    save_data(data)
+    await save_data_async(data)
     
     # Определяем тип брони
     if master.get("is_equipment"):
         icon = "🪑"
         type_text = "оборудования"
         confirmation_text = "Твоя запись подтверждена автоматически!"
-        # Для оборудования сразу подтверждаем
-        booking["status"] = "confirmed"
-        save_data(data)
     else:
         icon = "👤"
         type_text = "мастера"
@@ -2381,18 +2594,22 @@ async def process_time_booking_request(update: Update, context: ContextTypes.DEF
                     ]
                 ])
                 
-                await context.bot.send_message(
-                    chat_id=int(master_telegram_id),
-                    text=(
-                        f"🔔 **Новая запись!**\n\n"
-                        f"👤 Гость: {booking['client_name']}\n"
-                        f"📅 Дата: {booking['slot_date']}\n"
-                        f"⏰ Время: {booking['slot_start_time']} - {booking['slot_end_time']}\n"
-                        f"📍 Локация: {booking['slot_location']}\n\n"
-                        f"Подтвердить запись?"
+                # Уведомление отправляется в фоне: клиент получает ответ, не дожидаясь Telegram API
+                context.application.create_task(
+                    send_notification(
+                        context.bot, int(master_telegram_id),
+                        (
+                            f"🔔 **Новая запись!**\n\n"
+                            f"👤 Гость: {booking['client_name']}\n"
+                            f"📅 Дата: {booking['slot_date']}\n"
+                            f"⏰ Время: {booking['slot_start_time']} - {booking['slot_end_time']}\n"
+                            f"📍 Локация: {booking['slot_location']}\n\n"
+                            f"Подтвердить запись?"
+                        ),
+                        reply_markup=confirmation_keyboard,
+                        parse_mode='Markdown'
                     ),
-                    reply_markup=confirmation_keyboard,
-                    parse_mode='Markdown'
+                    update=update
                 )
         except Exception as e:
             logger.error(f"Ошибка отправки уведомления мастеру: {e}")
@@ -2414,14 +2631,12 @@ async def process_time_booking_request(update: Update, context: ContextTypes.DEF
     
     # Если это оборудование, планируем напоминание
     if master.get("is_equipment"):
-        schedule_reminder(booking, is_equipment=True)
+        await schedule_reminder(booking, is_equipment=True)
 
 # === ФУНКЦИИ ДЛЯ ДЕВАЙСОВ ЗАПОВЕДНИКА ===
 
 async def show_devices_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показывает список девайсов заповедника."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    
     data = load_data()
     devices = data.get("devices", [])
     
@@ -2438,10 +2653,11 @@ async def show_devices_list(update: Update, context: ContextTypes.DEFAULT_TYPE)
             )
         return
     
-    message = "🔬 **Девайсы заповедника**\n\n"
-    message += "Выбери устройство чтобы узнать подробности и забронировать:\n\n"
+    parts = ["🔬 **Девайсы заповедника**\n\n"]
+    parts.append("Выбери устройство чтобы узнать подробности и забронировать:\n\n")
     
     keyboard = []
+    count_free_device_slots = get_safe_data_manager().count_free_device_slots
     
     for device in devices:
         if not device.get("is_active", True):
@@ -2451,10 +2667,8 @@ async def show_devices_list(update: Update, context: ContextTypes.DEFAULT_TYPE)
         name = device.get("name", "Устройство")
         location = device.get("location", "Заповедник")
         
-        # Подсчитываем доступные слоты
-        total_slots = len(device.get("time_slots", []))
-        booked_slots = sum(1 for slot in device.get("time_slots", []) if slot.get("is_booked", False))
-        available_slots = total_slots - booked_slots
+        # Доступные слоты считаются один раз до следующего изменения данных
+        available_slots = count_free_device_slots(device)
         
         button_text = f"{icon} {name} • {location} ({available_slots} слотов)"
         callback_data = f"device_info_{device.get('id')}"
@@ -2462,45 +2676,30 @@ async def show_devices_list(update: Update, context: ContextTypes.DEFAULT_TYPE)
         keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
         
         # Добавляем краткое описание в сообщение
-        message += f"{icon} **{name}**\n"
-        message += f"📍 {location}\n"
-        message += f"⏰ Доступно слотов: {available_slots}\n\n"
+        parts.append(f"{icon} **{name}**\n")
+        parts.append(f"📍 {location}\n")
+        parts.append(f"⏰ Доступно слотов: {available_slots}\n\n")
+    
+    message = "".join(parts)
     
-    keyboard.append([InlineKeyboardButton("⬅️ Назад", callback_data="back_to_client_menu")])
+    keyboard.append(BACK_TO_CLIENT_ROW)
     
     # Для callback queries используем edit_message_text
     if update.callback_query:
         await update.callback_query.edit_message_text(
             message,
             reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+            parse_mode=markdown_parse_mode(message)
         )
     else:
         await update.message.reply_text(
             message,
             reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+            parse_mode=markdown_parse_mode(message)
         )
 
-async def show_device_details(update: Update, context: ContextTypes.DEFAULT_TYPE, device_id: str) -> None:
-    """Показывает подробную информацию о девайсе."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    
-    data = load_data()
-    devices = data.get("devices", [])
-    
-    device = None
-    for d in devices:
-        if d.get("id") == device_id:
-            device = d
-            break
-    
-    if not device:
-        # Детальное логирование для отладки
-        logger.error(f"Device not found in show_device_details - device_id: '{device_id}', available devices: {[d.get('id') for d in devices]}")
-        await update.callback_query.edit_message_text("❌ Устройство не найдено. Попробуй обновить список.")
-        return
-    
+def build_device_info_text(device: dict) -> str:
+    """Собирает текст карточки девайса (описание, инструкции, предупреждения)."""
     icon = device.get("icon", "🔧")
     name = device.get("name", "Устройство")
     location = device.get("location", "Заповедник")
@@ -2516,69 +2715,78 @@ async def show_device_details(update: Update, context: ContextTypes.DEFAULT_TYPE
     session_duration = device.get("session_duration", 60)
     
     # Собираем сообщение
-    message = f"{icon} **{name}**\n"
-    message += f"📍 **Локация:** {location}\n"
-    message += f"{time_info}\n"
-    message += f"⏱️ **Длительность сеанса:** {session_duration} мин\n\n"
+    parts = [f"{icon} **{name}**\n"]
+    parts.append(f"📍 **Локация:** {location}\n")
+    parts.append(f"{time_info}\n")
+    parts.append(f"⏱️ **Длительность сеанса:** {session_duration} мин\n\n")
     
-    message += f"📖 **Описание:**\n{description}\n\n"
+    parts.append(f"📖 **Описание:**\n{description}\n\n")
     
     # Инструкции
     instructions = device.get("instructions", [])
     if instructions:
-        message += "📋 **Как пользоваться:**\n"
+        parts.append("📋 **Как пользоваться:**\n")
         for i, instruction in enumerate(instructions, 1):
-            message += f"{i}. {instruction}\n"
-        message += "\n"
+            parts.append(f"{i}. {instruction}\n")
+        parts.append("\n")
     
     # Информация о локации (для кресла)
     location_info = device.get("location_info")
     if location_info:
-        message += "📍 **О локации:**\n"
-        message += f"{location_info}\n\n"
+        parts.append("📍 **О локации:**\n")
+        parts.append(f"{location_info}\n\n")
     
     # После использования (для других девайсов)
     after_use = device.get("after_use", [])
     if after_use:
-        message += "✅ **После сеанса:**\n"
+        parts.append("✅ **После сеанса:**\n")
         for instruction in after_use:
-            message += f"• {instruction}\n"
-        message += "\n"
+            parts.append(f"• {instruction}\n")
+        parts.append("\n")
     
     # Предупреждения
     warnings = device.get("warnings", [])
     if warnings:
-        message += "⚠️ **Внимание:**\n"
+        parts.append("⚠️ **Внимание:**\n")
         for warning in warnings:
-            message += f"• {warning}\n"
-        message += "\n"
+            parts.append(f"• {warning}\n")
+        parts.append("\n")
+    
+    return "".join(parts)
+
+async def show_device_details(update: Update, context: ContextTypes.DEFAULT_TYPE, device_id: str) -> None:
+    """Показывает подробную информацию о девайсе."""
+    device = get_device_by_id(device_id)
+    
+    if not device:
+        # Детальное логирование для отладки: список устройств собираем только при ошибке
+        devices = load_data().get("devices", [])
+        logger.error(f"Device not found in show_device_details - device_id: '{device_id}', available devices: {[d.get('id') for d in devices]}")
+        await update.callback_query.edit_message_text("❌ Устройство не найдено. Попробуй обновить список.")
+        return
+    
+    # Карточка собирается из статичных полей устройства, поэтому кэшируется менеджером данных
+    message = get_safe_data_manager().get_device_info_text(device, build_device_info_text)
     
     # Кнопки
     keyboard = [
         [InlineKeyboardButton("📅 Забронировать", callback_data=f"book_device_{device_id}")],
-        [InlineKeyboardButton("⬅️ К списку девайсов", callback_data="devices_list")]
+        BACK_TO_DEVICES_LIST_ROW
     ]
     
     await update.callback_query.edit_message_text(
         message,
         reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode='Markdown'
+        parse_mode=markdown_parse_mode(message)
     )
 
 async def show_device_booking_slots(update: Update, context: ContextTypes.DEFAULT_TYPE, device_id: str) -> None:
     """Показывает доступные слоты для бронирования девайса."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    from datetime import datetime, timedelta
+    # Слоты по дням и занятые слоты устройства берем из индексов менеджера данных
+    manager = get_safe_data_manager()
+    is_device_slot_booked = manager.is_device_slot_booked
     
-    data = load_data()
-    devices = data.get("devices", [])
-    device_bookings = data.get("device_bookings", [])
-    
-    device = None
-    for d in devices:
-        if d.get("id") == device_id:
-            device = d
-            break
+    device = get_device_by_id(device_id)
     
     if not device:
         logger.error(f"Device not found - device_id: '{device_id}', function: show_device_booking_slots")
@@ -2590,7 +2798,7 @@ async def show_device_booking_slots(update: Update, context: ContextTypes.DEFAUL
     
     # Показываем слоты на ближайшие дни
     today = datetime.now().date()
-    message = f"{icon} **{name}**\n\n📅 Выбери удобное время:\n\n"
+    parts = [f"{icon} **{name}**\n\n📅 Выбери удобное время:\n\n"]
     
     keyboard = []
     slots_found = False
@@ -2600,20 +2808,12 @@ async def show_device_booking_slots(update: Update, context: ContextTypes.DEFAUL
         check_date = today + timedelta(days=day_offset)
         date_str = check_date.strftime('%Y-%m-%d')
         
-        day_slots = []
-        for slot in device.get("time_slots", []):
-            if slot.get("date") == date_str and not slot.get("is_booked", False):
-                # Проверяем что слот не забронирован в device_bookings
-                is_booked_in_bookings = any(
-                    booking.get("device_id") == device_id and
-                    booking.get("slot_date") == date_str and
-                    booking.get("slot_start_time") == slot.get("start_time") and
-                    booking.get("status") in ["pending", "confirmed"]
-                    for booking in device_bookings
-                )
-                
-                if not is_booked_in_bookings:
-                    day_slots.append(slot)
+        # Свободные слоты дня, не забронированные в device_bookings
+        day_slots = [
+            slot for slot in manager.get_device_slots_on_date(device, date_str)
+            if not slot.get("is_booked", False)
+            and not is_device_slot_booked(device_id, date_str, slot.get("start_time"))
+        ]
         
         if day_slots:
             # Название дня
@@ -2622,7 +2822,7 @@ async def show_device_booking_slots(update: Update, context: ContextTypes.DEFAUL
             elif day_offset == 1:
                 day_name = "Завтра"
             else:
-                day_name = check_date.strftime('%A').replace('Monday', 'Понедельник').replace('Tuesday', 'Вторник').replace('Wednesday', 'Среда').replace('Thursday', 'Четверг').replace('Friday', 'Пятница').replace('Saturday', 'Суббота').replace('Sunday', 'Воскресенье')
+                day_name = WEEKDAYS_RU[check_date.weekday()]
             
             keyboard.append([InlineKeyboardButton(
                 f"📅 {day_name} ({len(day_slots)} слотов)",
@@ -2631,32 +2831,26 @@ async def show_device_booking_slots(update: Update, context: ContextTypes.DEFAUL
             slots_found = True
     
     if not slots_found:
-        message += "😔 Нет доступных слотов на ближайшие дни.\n"
-        message += "Попробуй позже или выбери другое устройство."
+        parts.append("😔 Нет доступных слотов на ближайшие дни.\n")
+        parts.append("Попробуй позже или выбери другое устройство.")
+    
+    message = "".join(parts)
     
     keyboard.append([InlineKeyboardButton("⬅️ Назад к устройству", callback_data=f"device_info_{device_id}")])
     
     await update.callback_query.edit_message_text(
         message,
         reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode='Markdown'
+        parse_mode=markdown_parse_mode(message)
     )
 
 async def show_device_day_slots(update: Update, context: ContextTypes.DEFAULT_TYPE, device_id: str, date_str: str) -> None:
     """Показывает слоты девайса на конкретный день."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    from datetime import datetime
-    import uuid
-    
-    data = load_data()
-    devices = data.get("devices", [])
-    device_bookings = data.get("device_bookings", [])
+    # Слоты по дням и занятые слоты устройства берем из индексов менеджера данных
+    manager = get_safe_data_manager()
+    is_device_slot_booked = manager.is_device_slot_booked
     
-    device = None
-    for d in devices:
-        if d.get("id") == device_id:
-            device = d
-            break
+    device = get_device_by_id(device_id)
     
     if not device:
         logger.error(f"Device not found - device_id: '{device_id}', function: show_device_booking_slots")
@@ -2667,74 +2861,55 @@ async def show_device_day_slots(update: Update, context: ContextTypes.DEFAULT_TY
     name = device.get("name", "Устройство")
     
     # Форматируем дату
-    try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        formatted_date = date_obj.strftime('%A %d %B').replace('Monday', 'Понедельник').replace('Tuesday', 'Вторник').replace('Wednesday', 'Среда').replace('Thursday', 'Четверг').replace('Friday', 'Пятница').replace('Saturday', 'Суббота').replace('Sunday', 'Воскресенье')
-    except:
-        formatted_date = date_str
+    formatted_date = format_date_for_user(date_str)
     
-    message = f"{icon} **{name}**\n📅 **{formatted_date}**\n\n"
+    parts = [f"{icon} **{name}**\n📅 **{formatted_date}**\n\n"]
     
     # Находим свободные слоты на этот день
-    available_slots = []
-    for slot in device.get("time_slots", []):
-        if slot.get("date") == date_str and not slot.get("is_booked", False):
-            # Проверяем что слот не забронирован в device_bookings
-            is_booked_in_bookings = any(
-                booking.get("device_id") == device_id and
-                booking.get("slot_date") == date_str and
-                booking.get("slot_start_time") == slot.get("start_time") and
-                booking.get("status") in ["pending", "confirmed"]
-                for booking in device_bookings
-            )
-            
-            if not is_booked_in_bookings:
-                available_slots.append(slot)
+    available_slots = [
+        slot for slot in manager.get_device_slots_on_date(device, date_str)
+        if not slot.get("is_booked", False)
+        # Проверяем что слот не забронирован в device_bookings
+        and not is_device_slot_booked(device_id, date_str, slot.get("start_time"))
+    ]
     
+    back_row = [InlineKeyboardButton("⬅️ Выбрать другой день", callback_data=f"book_device_{device_id}")]
     if not available_slots:
-        message += "😔 Нет свободных слотов на этот день."
-        keyboard = [[InlineKeyboardButton("⬅️ Выбрать другой день", callback_data=f"book_device_{device_id}")]]
+        parts.append("😔 Нет свободных слотов на этот день.")
+        keyboard = [back_row]
     else:
-        message += "⏰ Доступные слоты:\n\n"
+        parts.append("⏰ Доступные слоты:\n\n")
+        # Общая часть callback_data одинакова для всех слотов дня
+        callback_prefix = f"confirm_device_booking_{device_id}_{date_str}_"
         keyboard = []
         
-        for slot in sorted(available_slots, key=lambda x: x.get("start_time", "")):
+        # Слоты устройства упорядочены по времени при загрузке данных
+        for slot in available_slots:
             start_time = slot.get("start_time", "")
             end_time = slot.get("end_time", "")
             
-            button_text = f"🕐 {start_time} - {end_time}"
-            callback_data = f"confirm_device_booking_{device_id}_{date_str}_{start_time}"
-            
-            keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
-            message += f"• {start_time} - {end_time}\n"
+            keyboard.append([InlineKeyboardButton(f"🕐 {start_time} - {end_time}", callback_data=callback_prefix + start_time)])
+            parts.append(f"• {start_time} - {end_time}\n")
         
-        keyboard.append([InlineKeyboardButton("⬅️ Выбрать другой день", callback_data=f"book_device_{device_id}")])
+        keyboard.append(back_row)
+    
+    message = "".join(parts)
     
     await update.callback_query.edit_message_text(
         message,
         reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode='Markdown'
+        parse_mode=markdown_parse_mode(message)
     )
 
 async def process_device_booking(update: Update, context: ContextTypes.DEFAULT_TYPE, device_id: str, date_str: str, start_time: str) -> None:
     """Обрабатывает бронирование девайса."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    import uuid
-    from datetime import datetime
-    
     query = update.callback_query
     user_id = str(query.from_user.id)
     
     data = load_data()
-    devices = data.get("devices", [])
-    device_bookings = data.get("device_bookings", [])
     
     # Находим девайс
-    device = None
-    for d in devices:
-        if d.get("id") == device_id:
-            device = d
-            break
+    device = get_device_by_id(device_id)
     
     if not device:
         logger.error(f"Device not found - device_id: '{device_id}', function: process_device_booking")
@@ -2742,25 +2917,14 @@ async def process_device_booking(update: Update, context: ContextTypes.DEFAULT_T
         return
     
     # Находим конкретный слот
-    target_slot = None
-    for slot in device.get("time_slots", []):
-        if (slot.get("date") == date_str and 
-            slot.get("start_time") == start_time):
-            target_slot = slot
-            break
+    target_slot = get_safe_data_manager().find_slot(device, date_str, start_time)
     
     if not target_slot:
         await query.edit_message_text("❌ Слот не найден.")
         return
     
     # Проверяем, не занят ли слот
-    is_booked = any(
-        booking.get("device_id") == device_id and
-        booking.get("slot_date") == date_str and
-        booking.get("slot_start_time") == start_time and
-        booking.get("status") in ["pending", "confirmed"]
-        for booking in device_bookings
-    )
+    is_booked = get_safe_data_manager().is_device_slot_booked(device_id, date_str, start_time)
     
     if is_booked:
         await query.edit_message_text(
@@ -2784,6 +2948,7 @@ async def process_device_booking(update: Update, context: ContextTypes.DEFAULT_T
         "slot_date": date_str,
         "slot_start_time": start_time,
         "slot_end_time": target_slot.get("end_time"),
+        "slot_start_ts": slot_start_epoch(target_slot),
         "slot_location": device.get("location", "Заповедник"),
         "status": "confirmed",  # Девайсы автоподтверждаются
         "created_at": datetime.now().isoformat(),
@@ -2797,13 +2962,9 @@ async def process_device_booking(update: Update, context: ContextTypes.DEFAULT_T
     data["device_bookings"].append(device_booking)
     
     # Помечаем слот как забронированный
-    for slot in device.get("time_slots", []):
-        if (slot.get("date") == date_str and 
-            slot.get("start_time") == start_time):
-            slot["is_booked"] = True
-            break
+    target_slot["is_booked"] = True
     
-    save_data(data)
+    await save_data_async(data)
     
     icon = device.get("icon", "🔧")
     session_duration = device.get("session_duration", 60)
@@ -2827,11 +2988,11 @@ async def process_device_booking(update: Update, context: ContextTypes.DEFAULT_T
     )
     
     # Планируем напоминание для девайса
-    schedule_reminder(device_booking, is_equipment=True)
+    await schedule_reminder(device_booking, is_equipment=True)
     
     # Уведомляем Фила о новой записи на виброкресло
     if device_id == "vibro_chair":
-        await notify_device_owner_about_booking(context, device_booking)
+        context.application.create_task(notify_device_owner_about_booking(context, device_booking), update=update)
 
 if __name__ == "__main__":
     # 🚨 CRITICAL HOTFIX - ПРИНУДИТЕЛЬНАЯ ПЕРЕЗАПИСЬ  
@@ -2859,19 +3020,12 @@ if __name__ == "__main__":
 
 async def show_vibro_chair_bookings(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Показывает все записи на виброкресло для владельца (Фила)."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    from datetime import datetime, timedelta
+    # Записи на виброкресло берем из индекса по устройствам и группируем по дням
+    bookings_by_date = defaultdict(list)
+    for booking in get_safe_data_manager().get_device_bookings("vibro_chair"):
+        bookings_by_date[booking.get("slot_date")].append(booking)
     
-    data = load_data()
-    device_bookings = data.get("device_bookings", [])
-    
-    # Фильтруем записи только на виброкресло
-    vibro_bookings = [
-        booking for booking in device_bookings 
-        if booking.get("device_id") == "vibro_chair"
-    ]
-    
-    if not vibro_bookings:
+    if not bookings_by_date:
         await update.message.reply_text(
             "🪑 **Мое виброкресло**\n\n"
             "📅 Пока нет записей на виброкресло.\n"
@@ -2881,47 +3035,39 @@ async def show_vibro_chair_bookings(update: Update, context: ContextTypes.DEFAUL
         )
         return
     
-    # Группируем записи по дням
     today = datetime.now().date()
-    bookings_by_date = {}
-    
-    for booking in vibro_bookings:
-        booking_date = booking.get("slot_date")
-        if booking_date not in bookings_by_date:
-            bookings_by_date[booking_date] = []
-        bookings_by_date[booking_date].append(booking)
+    tomorrow = today + timedelta(days=1)
+    total_bookings = sum(len(date_bookings) for date_bookings in bookings_by_date.values())
     
     # Формируем сообщение
-    message = "🪑 **Мое виброкресло**\n\n"
-    message += f"📅 Всего записей: {len(vibro_bookings)}\n\n"
-    
-    # Сортируем по датам
-    sorted_dates = sorted(bookings_by_date.keys())
+    parts = ["🪑 **Мое виброкресло**\n\n"]
+    parts.append(f"📅 Всего записей: {total_bookings}\n\n")
     
     keyboard = []
     
-    for date_str in sorted_dates:
-        date_bookings = bookings_by_date[date_str]
+    # Сортируем по датам
+    for date_str, date_bookings in sorted(bookings_by_date.items()):
         # Парсим дату
         try:
             booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
             if booking_date == today:
                 day_label = "Сегодня"
-            elif booking_date == today + timedelta(days=1):
+            elif booking_date == tomorrow:
                 day_label = "Завтра"
             else:
                 day_label = booking_date.strftime("%d.%m")
         except:
             day_label = date_str
         
-        message += f"📅 **{day_label} ({date_str})** - {len(date_bookings)} записей:\n"
+        parts.append(f"📅 **{day_label} ({date_str})** - {len(date_bookings)} записей:\n")
         
-        for booking in sorted(date_bookings, key=lambda x: x.get("slot_start_time", "")):
+        # Индекс уже упорядочен по времени, группы по дням сохраняют этот порядок
+        for booking in date_bookings:
             start_time = booking.get("slot_start_time", "")
             end_time = booking.get("slot_end_time", "")
             guest_name = booking.get("guest_username", "") or booking.get("guest_name", "Гость")
             
-            message += f"🕐 {start_time}-{end_time} — {guest_name}\n"
+            parts.append(f"🕐 {start_time}-{end_time} — {guest_name}\n")
             
             # Добавляем кнопку отмены для каждой записи
             booking_id = booking.get("id", "")
@@ -2933,39 +3079,32 @@ async def show_vibro_chair_bookings(update: Update, context: ContextTypes.DEFAUL
                     )
                 ])
         
-        message += "\n"
+        parts.append("\n")
+    
+    message = "".join(parts)
     
     # Добавляем кнопку "Назад"
-    keyboard.append([InlineKeyboardButton("⬅️ Назад", callback_data="back_to_device_menu")])
+    keyboard.append(BACK_TO_DEVICE_MENU_ROW)
     
     await update.message.reply_text(
         message,
-        parse_mode='Markdown',
+        parse_mode=markdown_parse_mode(message),
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
 async def handle_vibro_booking_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE, booking_id: str) -> None:
     """Обрабатывает отмену записи на виброкресло."""
-    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-    
     query = update.callback_query
     await query.answer()
     
     # Находим запись по ID
-    data = load_data()
-    device_bookings = data.get("device_bookings", [])
-    
-    booking = None
-    for b in device_bookings:
-        if b.get("id") == booking_id:
-            booking = b
-            break
+    booking = get_safe_data_manager().get_device_booking_by_id(booking_id)
     
     if not booking:
         await query.edit_message_text(
             "❌ Запись не найдена. Возможно, она уже была отменена.",
             reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("⬅️ Назад", callback_data="back_to_device_menu")]
+                BACK_TO_DEVICE_MENU_ROW
             ])
         )
         return
@@ -3016,15 +3155,7 @@ async def process_vibro_cancel_reason(update: Update, context: ContextTypes.DEFA
     
     # Находим и отменяем запись
     data = load_data()
-    device_bookings = data.get("device_bookings", [])
-    
-    booking = None
-    booking_index = None
-    for i, b in enumerate(device_bookings):
-        if b.get("id") == booking_id:
-            booking = b
-            booking_index = i
-            break
+    booking = get_safe_data_manager().get_device_booking_by_id(booking_id)
     
     if not booking:
         await update.message.reply_text(
@@ -3042,39 +3173,35 @@ async def process_vibro_cancel_reason(update: Update, context: ContextTypes.DEFA
     device_name = "Виброакустическое кресло"
     
     # Удаляем запись из device_bookings
-    device_bookings.pop(booking_index)
+    get_safe_data_manager().remove_device_booking(booking_id)
     
     # Освобождаем слот в устройстве
-    devices = data.get("devices", [])
-    for device in devices:
-        if device.get("id") == "vibro_chair":
-            for slot in device.get("time_slots", []):
-                if (slot.get("date") == slot_date and 
-                    slot.get("start_time") == start_time):
-                    slot["is_booked"] = False
-                    break
-            break
+    device = get_device_by_id("vibro_chair")
+    if device:
+        slot = get_safe_data_manager().find_slot(device, slot_date, start_time)
+        if slot:
+            slot["is_booked"] = False
     
-    save_data(data)
+    mark_data_dirty(data)
     
     # Очищаем состояние пользователя
     user_states[user_id] = {"role": "client", "is_device_owner": True}
     
-    # Уведомляем клиента об отмене
+    # Уведомляем клиента об отмене (в фоне, ответ Филу не ждет Telegram API)
     if guest_id:
-        try:
-            await context.bot.send_message(
-                chat_id=guest_id,
-                text=f"❌ **Запись отменена**\n\n"
-                     f"🪑 **{device_name}**\n"
-                     f"📅 Дата: {slot_date}\n"
-                     f"🕐 Время: {start_time}-{end_time}\n\n"
-                     f"📝 **Причина отмены:**\n{cancel_reason}\n\n"
-                     f"Извини за неудобства! Ты можешь записаться на другое время.",
+        context.application.create_task(
+            send_notification(
+                context.bot, guest_id,
+                f"❌ **Запись отменена**\n\n"
+                f"🪑 **{device_name}**\n"
+                f"📅 Дата: {slot_date}\n"
+                f"🕐 Время: {start_time}-{end_time}\n\n"
+                f"📝 **Причина отмены:**\n{cancel_reason}\n\n"
+                f"Извини за неудобства! Ты можешь записаться на другое время.",
                 parse_mode='Markdown'
-            )
-        except Exception as e:
-            logger.error(f"Не удалось отправить уведомление об отмене клиенту {guest_id}: {e}")
+            ),
+            update=update
+        )
     
     # Подтверждаем отмену Филу
     await update.message.reply_text(
@@ -3093,28 +3220,14 @@ async def notify_device_owner_about_booking(context: ContextTypes.DEFAULT_TYPE,
     """Уведомляет владельца девайса о новой записи."""
     device_id = device_booking.get("device_id")
     
-    # Пока только для виброкресла Фила
-    if device_id != "vibro_chair":
+    # Уведомляем только девайсы с владельцем (пока это виброкресло Фила)
+    if device_id not in DEVICE_OWNER_HANDLES:
         return
     
-    # ID Фила @fshubin - нужно будет получить из реальной системы
-    phil_id = None
-    
-    # Находим Фила в базе данных
-    data = load_data()
-    masters = data.get("masters", [])
-    
-    # Ищем @fshubin среди мастеров или пользователей
-    for master in masters:
-        if master.get("telegram_handle") == "@fshubin":
-            phil_id = master.get("telegram_id")
-            break
-    
-    # Если не нашли среди мастеров, можно использовать hardcoded ID
-    # Это временное решение, пока Фил не зарегистрируется через бота
+    # Пока Фил не зарегистрировался через бота, его ID можно задать в PHIL_TG_ID
+    phil_id = resolve_device_owner_id(device_id)
     if not phil_id:
-        # Здесь можно добавить hardcoded telegram_id Фила если известен
-        logger.warning("Не найден telegram_id для @fshubin, уведомление не отправлено")
+        logger.warning(f"Не найден telegram_id для {DEVICE_OWNER_HANDLES[device_id]}, уведомление не отправлено")
         return
     
     # Формируем уведомление
@@ -3124,13 +3237,12 @@ async def notify_device_owner_about_booking(context: ContextTypes.DEFAULT_TYPE,
     slot_date = device_booking.get("slot_date", "")
     
     try:
-        await context.bot.send_message(
-            chat_id=phil_id,
-            text=f"🪑 **Новая запись на виброкресло!**\n\n"
-                 f"👤 **Клиент:** {guest_name}\n"
-                 f"📅 **Дата:** {slot_date}\n"
-                 f"🕐 **Время:** {start_time}-{end_time}\n\n"
-                 f"📋 Для управления записями используй кнопку 'Мое виброкресло 🪑' в боте.",
+        await send_message_limited(
+            context.bot, phil_id,
+            # Имя гостя вводит пользователь: "_" или "*" в нем сломали бы разбор Markdown
+            text=VIBRO_BOOKING_NOTICE_TEMPLATE.format(
+                guest=escape_markdown(guest_name, version=1), date=slot_date, start=start_time, end=end_time
+            ),
             parse_mode='Markdown'
         )
         logger.info(f"Уведомление о записи на виброкресло отправлено Филу (ID: {phil_id})")